@@ -1,388 +1,775 @@
 # backend/app.py
-import os, shutil, uuid, re, json
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+import os, uuid, re, json, gzip, hashlib, time, unicodedata, asyncio, logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from sqlalchemy import insert, update, bindparam
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from docx import Document
 from dotenv import load_dotenv
-from datetime import datetime
-import re, json
 from placeholder_hints import generate_hint
 
-from db import Base, engine, SessionLocal
+from db import SessionLocal, get_db, migrate
 from models import Session as Sess, Document as DocModel, Placeholder, Message, Suggestion
-from docx_parser import find_placeholders, fill_placeholders
 from placeholder_engine import normalize_key
-from render_service import docx_to_html
+from ingest import CHUNK
+from workers import run_cpu, ingest_task, fill_task, materialize_task, preview_task, pool_size, shutdown_pool, new_job, start_job, jobs_full, JOBS
+from template_index import cached_index, index_path_for
+from render_service import render_preview_slots, slot_html, pack_preview, unpack_preview, restamp_preview
+from cache import LRUCache, SingleFlight, WriteBehind
+from batch import parse_rows, row_mappings, stream_zip, member_names
+import blob_store
+from session_lock import session_lock, remove_lock
+from prompt_builder import build_prompt
+from json_stream import ObjectStream
+from extraction import extract, extract_json_object, fallback_values, normalize_money, normalize_date_phrase
+from llm_client import get_client, close_client, unless_disconnected, ClientDisconnected
+import metrics
 
 load_dotenv()
+log = logging.getLogger("lexsy")
 os.makedirs("data", exist_ok=True)
-Base.metadata.create_all(bind=engine)
+migrate()
 
-from groq import Groq
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-GROQ_MODEL = "llama-3.1-8b-instant"
+def _collect_blobs_once():
+    with SessionLocal() as db:
+        return blob_store.collect_garbage(db)
 
-app = FastAPI(title="Lexsy Legal Doc Assistant API")
+async def collect_blobs():
+    """Startup and periodic blob GC, so released templates go even if no other session is deleted."""
+    while True:
+        try:
+            dead = await asyncio.to_thread(_collect_blobs_once)
+            if dead: log.info("collected %d unreferenced template blobs", len(dead))
+        except Exception:
+            log.exception("blob garbage collection failed")
+        if blob_store.GC_INTERVAL <= 0: return
+        await asyncio.sleep(blob_store.GC_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    gc = asyncio.create_task(collect_blobs())
+    yield
+    gc.cancel()
+    await RENDERS.flush_all()
+    shutdown_pool()
+    await close_client()
+
+app = FastAPI(title="Lexsy Legal Doc Assistant API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"],
 )
-
-def db_sess():
-    db = SessionLocal()
-    try: yield db
-    finally: db.close()
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+# JSON responses; the stored preview is already gzip'd and DOCX / ZIP bodies are already deflated
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("LEXSY_GZIP_MIN_BYTES", "1000")),
+                   compresslevel=int(os.getenv("LEXSY_GZIP_LEVEL", "6")),
+                   exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + (DOCX_MIME,))
+app.add_middleware(metrics.TimingMiddleware)   # outermost: Server-Timing covers the whole request
+
+@app.exception_handler(OperationalError)
+async def database_busy(request: Request, exc: OperationalError):
+    """Another connection held the SQLite write lock past busy_timeout: a retryable 503, not a 500."""
+    if "database is locked" not in str(exc.orig): raise exc
+    return JSONResponse({"detail": "Database busy; retry later"}, status_code=503, headers={"Retry-After": "1"})
 
 # ---------- helpers ----------
+# SQLAlchemy calls block (up to busy_timeout on a locked SQLite file), so async routes run
+# them with asyncio.to_thread and the event loop keeps serving other requests
 def placeholder_type_guess(key: str) -> str:
-    k = normalize_key(key)
-    if "date" in k: return "DATE"
-    if any(t in k for t in ["amount","price","cap","valuation","purchase","principal","dollar"]): return "MONEY"
-    if any(t in k for t in ["company","corporation","inc","llc"]): return "COMPANY"
-    if any(t in k for t in ["investor","name","title"]): return "PERSON"
-    if any(t in k for t in ["state","jurisdiction","country","address","city"]): return "TEXT"
+    # whole words: "inc" must not match Incorporation, nor "cap" Capital
+    words = set(re.findall(r"[a-z]+", normalize_key(key).lower()))
+    if "date" in words: return "DATE"
+    if words & {"address","state","jurisdiction","country","city"}: return "TEXT"   # [Principal Office Address]
+    if words & {"amount","price","cap","valuation","purchase","principal","dollar"}: return "MONEY"
+    if words & {"company","corporation","inc","llc"}: return "COMPANY"
+    if words & {"investor","name","title"}: return "PERSON"
     return "TEXT"
 
-def make_preview(doc: DocModel):
-    doc.html_preview = docx_to_html(doc.working_docx_path)
+async def apply_fill(doc: DocModel, mapping: dict) -> tuple[str, list | None]:
+    """
+    The document's preview (html, slots) for the given values. The working DOCX is the
+    read-only template; the filled file only exists when /api/download builds it.
+    """
+    index = cached_index(index_path_for(doc.working_docx_path))
+    if index is None:
+        # Legacy session without a compiled template: rewrite the working copy in the pool
+        return await run_cpu(fill_task, doc.original_docx_path, doc.working_docx_path, mapping), None
+    if "preview" in index:
+        # Slot template from upload: substitute values instead of re-running mammoth
+        return render_preview_slots(index["preview"], mapping)
+    return await run_cpu(preview_task, doc.working_docx_path, mapping), None
+
+async def render_session(session_id: str):
+    """
+    Write-behind job: refresh the previews for the session's latest stored values. Only
+    documents containing a key set since their last render are rendered, concurrently;
+    the others are just restamped with the new version. Runs under the cross-process
+    session lock, so renders of one session never interleave and each one starts from
+    what the previous one committed.
+    """
+    async with session_lock(session_id):
+        with SessionLocal() as db:
+            plan = await asyncio.to_thread(_render_plan, db, session_id)
+            if plan is None: return   # deleted, or already current
+            stale, values = plan
+            rendered = await asyncio.gather(*(apply_fill(doc, doc_mapping(doc, values)) for doc, _ in stale))
+            for (doc, version), (html, slots) in zip(stale, rendered):
+                doc.preview_gz, doc.rendered_version = pack_preview(html, version, slots), version
+            await asyncio.to_thread(db.commit)
+
+def _render_plan(db, session_id: str) -> tuple[list, dict] | None:
+    """
+    ([(doc, version), ...] to render, {normalized_key: value}) for render_session; documents
+    none of whose keys changed are restamped in place. None when nothing is behind.
+    """
+    docs = [d for d in session_docs(db, session_id) if d.rendered_version < d.version]
+    if not docs: return None
+    versions = [d.version for d in docs]   # read before the values: a racing fill only makes this conservative
+    rows = db.query(Placeholder.normalized_key, Placeholder.value, Placeholder.is_filled, Placeholder.version).filter(
+        Placeholder.session_id==session_id).all()
+    values = {nk: v for nk, v, filled, _ in rows if filled and v}
+    stale = []
+    for doc, version in zip(docs, versions):
+        keys = doc_keys(doc)
+        nks = {normalize_key(k) for k in keys} if keys is not None else None
+        if nks is None or any(ver > doc.rendered_version and nk in nks for nk, _, _, ver in rows):
+            stale.append((doc, version))
+        else:
+            doc.preview_gz, doc.rendered_version = restamp_preview(doc.preview_gz, version), version
+    return stale, values
 
-def extract_json_safe(text: str) -> dict:
-    try: return json.loads(text)
-    except: pass
-    m = re.search(r"\{(?:[^{}]|(?R))*\}", text, flags=re.S)
-    if m:
-        try: return json.loads(m.group(0))
-        except: return {}
-    return {}
+# Fills only store values and mark the session; one debounced render serves a burst of
+# edits, and /api/render and /api/download flush it first
+RENDERS = WriteBehind(render_session, delay=float(os.getenv("LEXSY_RENDER_DEBOUNCE_MS", "150")) / 1000)
 
-# ---------- routes ----------
-@app.post("/api/upload")
-def upload_doc(file: UploadFile = File(...)):
-    if not file.filename.lower().endswith(".docx"):
-        raise HTTPException(status_code=400, detail="Only .docx supported")
-    session_id = str(uuid.uuid4())
-    db = next(db_sess())
-    db.add(Sess(id=session_id, original_filename=file.filename)); db.commit()
+def session_docs(db, session_id: str) -> list[DocModel]:
+    """The session's bundle, in upload order."""
+    return db.query(DocModel).filter(DocModel.session_id==session_id).order_by(DocModel.position).all()
 
-    original_path = f"data/{session_id}_orig.docx"
-    with open(original_path, "wb") as f: shutil.copyfileobj(file.file, f)
-    working_path = f"data/{session_id}_work.docx"; shutil.copyfile(original_path, working_path)
-    d = Document(working_path); d.save(working_path)
+def doc_keys(doc: DocModel) -> list[str] | None:
+    return json.loads(doc.keys) if doc.keys is not None else None
 
-    placeholders = find_placeholders(working_path)
-    doc_rec = DocModel(id=str(uuid.uuid4()), session_id=session_id,
-                       original_docx_path=original_path, working_docx_path=working_path)
-    db.add(doc_rec); db.commit(); make_preview(doc_rec); db.commit()
+def doc_mapping(doc: DocModel, values: dict) -> dict:
+    """{key: value} in the document's own spelling of each key, from {normalized_key: value}."""
+    keys = doc_keys(doc)
+    if keys is None:   # unknown keys: offer every value under its normalized form
+        return dict(values)
+    return {k: values[nk] for k in keys if (nk := normalize_key(k)) in values}
 
+async def current_doc(db, session_id: str, document_id: str | None = None) -> DocModel:
+    """
+    A document of the session (the first one unless `document_id` is given) with its
+    preview (and legacy working copy) caught up with the values.
+    """
+    await RENDERS.flush(session_id)
+    query = db.query(DocModel).filter(DocModel.session_id==session_id)
+    doc = await asyncio.to_thread((query.filter(DocModel.id==document_id) if document_id else query.order_by(DocModel.position)).first)
+    if not doc: raise HTTPException(404, "Document not found" if document_id else "Session not found")
+    if doc.rendered_version < doc.version:   # marked in another worker process
+        await render_session(session_id)
+        await asyncio.to_thread(db.refresh, doc)
+    return doc
+
+def parse_if_match(value: str | None) -> int | None:
+    """Document version from an If-Match header ("3", '"3"', 'W/"3"'); None when absent or "*"."""
+    if value is None or value.strip() == "*": return None
+    v = value.strip().removeprefix("W/").strip('"')
+    if not v.isdigit(): raise HTTPException(400, "If-Match must be a document version")
+    return int(v)
+
+def bump_version(db, session_id: str, expected: int | None = None) -> int:
+    """
+    Take the session's next document version in the caller's transaction, before any other
+    write: the conditional UPDATE is the If-Match check, and the row lock it holds until
+    commit serializes concurrent fills of the session in the database. The documents of a
+    bundle move in lockstep, so the version is the session's. Blocks while another writer
+    holds the lock: call it off the event loop.
+    """
+    stmt = update(DocModel.__table__).where(DocModel.session_id==session_id)
+    if expected is not None: stmt = stmt.where(DocModel.version==expected)
+    version = db.execute(stmt.values(version=DocModel.version + 1).returning(DocModel.version)).scalar()
+    if version is None:
+        db.rollback()
+        if expected is not None and db.query(DocModel.id).filter(DocModel.session_id==session_id).first():
+            raise HTTPException(412, "Document changed; reload and retry")
+        raise HTTPException(404, "Session not found")
+    return version
+
+def versioned(body: dict, version: int) -> JSONResponse:
+    return JSONResponse(body, headers={"ETag": f'"{version}"'})
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def preview_response(doc: DocModel, accept_encoding: str | None) -> Response:
+    """The stored /api/render body: the gzip bytes as they are when the client takes gzip, else inflated."""
+    headers = {"ETag": f'"{doc.rendered_version}"', "Vary": "Accept-Encoding"}
+    if accepts_gzip(accept_encoding):
+        return Response(doc.preview_gz, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(gzip.decompress(doc.preview_gz), media_type="application/json", headers=headers)
+
+def etag_matches(if_none_match: str | None, version: int) -> bool:
+    """True if an If-None-Match header ('"3"', 'W/"3", "4"', "*") names this document version."""
+    if if_none_match is None: return False
+    tags = {t.strip().removeprefix("W/").strip('"') for t in if_none_match.split(",")}
+    return "*" in tags or str(version) in tags
+
+def filled_values(db, session_id: str) -> dict:
+    """{normalized_key: value} for the session's filled placeholders."""
+    rows = db.query(Placeholder.normalized_key, Placeholder.value).filter(
+        Placeholder.session_id==session_id, Placeholder.is_filled.is_(True), Placeholder.value.isnot(None), Placeholder.value != "")
+    return dict(rows.all())
+
+PLACEHOLDER_SET = (update(Placeholder.__table__)
+                   .where(Placeholder.session_id==bindparam("sid"), Placeholder.normalized_key==bindparam("nk"))
+                   .values(value=bindparam("val"), is_filled=True, version=bindparam("ver")))
+
+def set_values(db, session_id: str, mapping: dict, version: int) -> int:
+    """
+    Fill placeholders by key in one executemany UPDATE over the (session_id, normalized_key)
+    index; exact keys and their normalized forms match the same rows, which are stamped
+    with the document `version` for /api/render/delta. Returns the rows changed (0 if no
+    key matched).
+    """
+    by_norm = {normalize_key(k): v for k, v in mapping.items()}
+    if not by_norm:
+        return 0
+    res = db.execute(PLACEHOLDER_SET, [{"sid": session_id, "nk": nk, "val": v, "ver": version} for nk, v in by_norm.items()])
+    return res.rowcount
+
+DOWNLOAD_CACHE = LRUCache(max_items=128, max_bytes=int(os.getenv("LEXSY_DOWNLOAD_CACHE_BYTES", 64 << 20)))
+
+async def read_upload(file: UploadFile) -> tuple[bytes, str]:
+    """The upload's bytes and their sha256, hashed chunk by chunk as they are read."""
+    h, chunks = hashlib.sha256(), []
+    while chunk := await file.read(CHUNK):
+        h.update(chunk); chunks.append(chunk)
+    return b"".join(chunks), h.hexdigest()
+
+async def ingest_blob(db, raw: bytes, sha: str, job: dict | None = None) -> dict:
+    """
+    Content-addressed ingest: identical bytes (by their sha256, from read_upload) are
+    parsed once and shared. Returns the blob's meta, with a reference taken on the blob
+    for the new session.
+    """
+    t0 = time.perf_counter()
+    meta = await asyncio.to_thread(blob_store.acquire, db, sha)
+    if meta is not None:
+        return {**meta, "cached": True, "timings": {"lookup": round((time.perf_counter() - t0) * 1000, 2)}}
+
+    if job: job["stage"] = "processing"
+    tmp, orig_tmp, template_tmp = blob_store.stage_blob(sha)
+    try:
+        # One read, one parse, one save: see ingest.py for the stages
+        ing = await run_cpu(ingest_task, raw, sha, orig_tmp, template_tmp)
+    except Exception:
+        blob_store.discard_blob(tmp); raise
+    meta = blob_store.commit_blob(sha, tmp, {"keys": ing["keys"], "html": ing["html"], "slots": ing["slots"], "size": ing["size"]})
+    await asyncio.to_thread(blob_store.register, db, sha, ing["size"])
+    return {**meta, "cached": False, "timings": ing["timings"]}
+
+def store_upload(db, session_id: str, original_path: str, working_path: str, ing: dict, filename: str | None = None) -> dict:
+    """
+    Add the document to the session's bundle. Its placeholders join the session's namespace
+    by normalized key: keys the bundle already has keep their row (and value); the caller
+    marks a joined bundle so the document renders with those values in the background.
+    """
+    placeholders = ing["keys"]
+    metrics.DOCUMENTS.inc(); metrics.DOCUMENT_BYTES.inc(ing["size"]); metrics.PLACEHOLDERS.inc(len(placeholders))
+    position = db.query(DocModel).filter(DocModel.session_id==session_id).count()
+    # joining a bundle is a change to the session: take its version (and row lock) like a fill
+    version = bump_version(db, session_id) if position else 0
+    doc_rec = DocModel(id=str(uuid.uuid4()), session_id=session_id, original_docx_path=original_path,
+                       working_docx_path=working_path, filename=filename, position=position, keys=json.dumps(placeholders),
+                       version=version, preview_gz=pack_preview(ing["html"], 0, ing.get("slots")))
+    db.add(doc_rec)
+
+    known = {nk for (nk,) in db.query(Placeholder.normalized_key).filter(Placeholder.session_id==session_id)}
+    shared, rows = [], []
     for k in placeholders:
-        db.add(Placeholder(session_id=session_id, key=k,
-               normalized_key=normalize_key(k), is_filled=False))
+        nk = normalize_key(k)
+        if nk in known:
+            shared.append(k)
+        else:
+            known.add(nk)
+            rows.append({"session_id": session_id, "key": k, "normalized_key": nk, "is_filled": False})
+    if rows:
+        db.execute(insert(Placeholder), rows)
     db.commit()
 
-    return {"session_id": session_id,
-            "placeholders": [{"key": k, "type": placeholder_type_guess(k)} for k in placeholders]}
+    return {"session_id": session_id, "document_id": doc_rec.id,
+            "placeholders": [{"key": k, "type": placeholder_type_guess(k)} for k in placeholders],
+            "shared": shared, "cached": ing.get("cached", False), "timings": ing["timings"]}
+
+EXTRACT_CACHE = LRUCache(max_items=int(os.getenv("LEXSY_EXTRACT_CACHE_ITEMS", "2048")),
+                         ttl=float(os.getenv("LEXSY_EXTRACT_CACHE_TTL", "600")))
+EXTRACT_FLIGHTS = SingleFlight()
+EXTRACT_STATS = {"saved_seconds": 0.0, "prompts": 0, "prompt_tokens": 0, "deterministic": 0}
+
+def extraction_key(system: str, pending_list: list[dict], message: str) -> str:
+    """Cache key for an extraction: system prompt hash, pending key/type/hint set, normalized message."""
+    pending = sorted((p["key"], p["type"], p["hint"]) for p in pending_list)
+    norm = " ".join(unicodedata.normalize("NFKC", message).split())
+    payload = json.dumps([hashlib.sha256(system.encode()).hexdigest(), pending, norm], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# ---------- routes ----------
+@app.post("/api/upload")
+async def upload_doc(file: UploadFile = File(...), session_id: str | None = Form(None), background: bool = False,
+                     db: Session = Depends(get_db)):
+    """
+    Parse the upload in the worker pool. Without session_id it starts a new session; with
+    one the document joins that session's bundle. With ?background=true the call returns
+    202 and a job id right away; poll /api/jobs/{job_id} for the stage and the final result.
+    """
+    if not file.filename.lower().endswith(".docx"):
+        raise HTTPException(status_code=400, detail="Only .docx supported")
+    if background and jobs_full():
+        raise HTTPException(503, "Too many background jobs; retry later", headers={"Retry-After": "5"})
+    joined = session_id is not None
+    if not joined:
+        session_id = str(uuid.uuid4())
+        db.add(Sess(id=session_id, original_filename=file.filename)); await asyncio.to_thread(db.commit)
+    elif not await asyncio.to_thread(db.get, Sess, session_id):
+        raise HTTPException(404, "Session not found")
+
+    raw, sha = await read_upload(file)
+
+    async def process(job: dict | None = None):
+        with SessionLocal() as db:
+            ing = await ingest_blob(db, raw, sha, job)
+            if job: job["stage"] = "storing"
+            # Sessions point at the shared template; fills never write to it
+            original_path, working_path = blob_store.blob_paths(sha)
+            res = await asyncio.to_thread(store_upload, db, session_id, original_path, working_path, ing, file.filename)
+        if joined: RENDERS.mark(session_id)
+        return res
+
+    if not background:
+        return await process()
+    job = new_job("upload", session_id=session_id)
+    start_job(job, process(job))
+    return JSONResponse({"job_id": job["id"], "session_id": session_id, "status": job["status"]}, status_code=202)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus text format: stage / route latency histograms and upload counters."""
+    return Response(metrics.exposition(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/jobs/{job_id}")
+def job_status(job_id: str):
+    job = JOBS.get(job_id)
+    if not job: raise HTTPException(404, "Job not found")
+    return {k: job.get(k) for k in ("id", "kind", "session_id", "status", "stage", "result", "error")}
+
+@app.delete("/api/session")
+def delete_session(session_id: str, db: Session = Depends(get_db)):
+    """Drop a session, its private files and its reference on the shared template."""
+    docs = db.query(DocModel).filter(DocModel.session_id==session_id).all()
+    if not docs and not db.get(Sess, session_id): raise HTTPException(404, "Session not found")
+    for d in docs:
+        for path in (d.original_docx_path, d.working_docx_path):
+            if path and not blob_store.sha_for_path(path):
+                for p in (path, index_path_for(path)):
+                    if os.path.exists(p): os.remove(p)
+        blob_store.release(db, blob_store.sha_for_path(d.original_docx_path))
+    for model in (Placeholder, Message, Suggestion, DocModel):
+        db.query(model).filter(model.session_id==session_id).delete(synchronize_session=False)
+    db.query(Sess).filter(Sess.id==session_id).delete(synchronize_session=False)
+    db.commit()
+    remove_lock(session_id)
+    blob_store.collect_garbage(db)
+    return {"ok": True}
 
 @app.get("/api/placeholders")
-def list_placeholders(session_id: str):
-    db = next(db_sess())
+def list_placeholders(session_id: str, db: Session = Depends(get_db)):
+    """The session's placeholders, one per normalized key, with the documents that contain each."""
     rows = db.query(Placeholder).filter(Placeholder.session_id==session_id).all()
-    return [{"key": r.key, "is_filled": r.is_filled, "value": r.value, "type": placeholder_type_guess(r.key)} for r in rows]
+    in_docs = {}
+    for doc in session_docs(db, session_id):
+        for nk in {normalize_key(k) for k in doc_keys(doc) or ()}:
+            in_docs.setdefault(nk, []).append(doc.id)
+    return [{"key": r.key, "is_filled": r.is_filled, "value": r.value, "type": placeholder_type_guess(r.key),
+             "documents": in_docs.get(r.normalized_key, [])} for r in rows]
+
+@app.get("/api/documents")
+def list_documents(session_id: str, db: Session = Depends(get_db)):
+    """The session's bundle in order; document ids select one for /api/render and /api/download."""
+    docs = session_docs(db, session_id)
+    if not docs and not db.get(Sess, session_id): raise HTTPException(404, "Session not found")
+    return [{"id": d.id, "filename": d.filename, "position": d.position, "placeholders": len(doc_keys(d) or ())}
+            for d in docs]
 
 @app.get("/api/render")
-def render(session_id: str):
-    db = next(db_sess())
-    doc = db.query(DocModel).filter(DocModel.session_id==session_id).first()
-    if not doc: raise HTTPException(404, "Session not found")
-    return JSONResponse({"html": doc.html_preview})
+async def render(session_id: str, document_id: str | None = None, if_none_match: str | None = Header(None),
+                 accept_encoding: str | None = Header(None), db: Session = Depends(get_db)):
+    """The preview of a document (the first by default); 304 when If-None-Match already names its version."""
+    doc = await current_doc(db, session_id, document_id)
+    if etag_matches(if_none_match, doc.rendered_version):
+        return Response(status_code=304, headers={"ETag": f'"{doc.rendered_version}"'})
+    return preview_response(doc, accept_encoding)
+
+@app.get("/api/render/delta")
+async def render_delta(session_id: str, since: int, document_id: str | None = None,
+                       accept_encoding: str | None = Header(None), db: Session = Depends(get_db)):
+    """
+    What changed in the preview since version `since`: {"version", "changes": {key: html}}
+    with the new fragment of every slot whose value was set after it. The client splices
+    each fragment over that key's [start, end) slots from its last full render, right to
+    left. Falls back to the full /api/render body (no "changes") when `since` can't be patched.
+    """
+    doc = await current_doc(db, session_id, document_id)
+    version = doc.rendered_version
+    slots = unpack_preview(doc.preview_gz)["slots"] if 0 <= since < version else None
+    if not 0 <= since <= version or (since < version and slots is None):
+        return preview_response(doc, accept_encoding)
+    changes = {}
+    if since < version:
+        rows = db.query(Placeholder.normalized_key, Placeholder.value, Placeholder.is_filled).filter(
+            Placeholder.session_id==session_id, Placeholder.version > since)
+        changed = {nk: v if filled else None for nk, v, filled in await asyncio.to_thread(rows.all)}
+        changes = {k: slot_html(k, changed[nk]) for k in {k for k, _, _ in slots} if (nk := normalize_key(k)) in changed}
+    return versioned({"version": version, "changes": changes}, version)
+
+async def filled_docx(doc: DocModel, mapping: dict) -> tuple[bytes, str]:
+    """
+    (DOCX bytes, digest) built in memory from the template and the values, cached by a hash
+    of (template, mapping) so repeated downloads of an unchanged document are free.
+    """
+    digest = hashlib.sha256(json.dumps([doc.working_docx_path, sorted(mapping.items())]).encode()).hexdigest()
+    data = DOWNLOAD_CACHE.get(digest)
+    if data is None:
+        if cached_index(index_path_for(doc.working_docx_path)) is None:   # legacy: the render job wrote it
+            with open(doc.working_docx_path, "rb") as f: data = f.read()
+        else:
+            data = await run_cpu(materialize_task, doc.working_docx_path, mapping)
+        DOWNLOAD_CACHE.set(digest, data, size=len(data))
+    return data, digest
 
 @app.get("/api/download")
-def download(session_id: str):
-    db = next(db_sess())
-    doc = db.query(DocModel).filter(DocModel.session_id==session_id).first()
-    if not doc: raise HTTPException(404, "Session not found")
-    return FileResponse(path=doc.working_docx_path, filename="completed.docx",
-                        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+async def download(session_id: str, document_id: str | None = None, db: Session = Depends(get_db)):
+    """
+    The filled DOCX; for a bundle (unless document_id picks one) a ZIP with every filled
+    document, built concurrently in the worker pool and streamed in bundle order.
+    """
+    doc = await current_doc(db, session_id, document_id)   # legacy sessions write the working copy in the render job
+    docs = [doc] if document_id else await asyncio.to_thread(session_docs, db, session_id)
+    values = await asyncio.to_thread(filled_values, db, session_id)
+    if len(docs) > 1:
+        if any(d.rendered_version < d.version for d in docs):
+            await render_session(session_id)
+        names = member_names([d.filename for d in docs])
 
-@app.post("/api/fill")
-def fill(session_id: str = Form(...), key: str = Form(...), value: str = Form(...)):
-    db = next(db_sess())
-    doc = db.query(DocModel).filter(DocModel.session_id==session_id).first()
-    if not doc: raise HTTPException(404, "Session not found")
+        async def build(d: DocModel) -> bytes:
+            return (await filled_docx(d, doc_mapping(d, values)))[0]
 
-    rows = db.query(Placeholder).filter(Placeholder.session_id==session_id).all()
-    target = None
-    for r in rows:
-        if r.key == key or r.normalized_key == normalize_key(key):
-            target = r; break
-    if not target: raise HTTPException(404, "Placeholder not found")
-    target.value = value; target.is_filled = True; db.commit()
-    mapping = {r.key: r.value for r in rows if r.is_filled and r.value}
-    fill_placeholders(doc.original_docx_path, doc.working_docx_path, mapping); make_preview(doc); db.commit()
-    return {"ok": True}
+        return StreamingResponse(stream_zip(list(zip(names, docs)), build, window=max(2, 2 * pool_size())),
+                                 media_type="application/zip", headers={"Content-Disposition": 'attachment; filename="bundle.zip"'})
+
+    if cached_index(index_path_for(doc.working_docx_path)) is None:
+        return FileResponse(path=doc.working_docx_path, filename="completed.docx", media_type=DOCX_MIME)
+    data, digest = await filled_docx(doc, doc_mapping(doc, values))
+
+    chunks = (data[i:i + 65536] for i in range(0, len(data), 65536))
+    return StreamingResponse(chunks, media_type=DOCX_MIME, headers={
+        "Content-Disposition": 'attachment; filename="completed.docx"',
+        "Content-Length": str(len(data)), "ETag": f'"{digest[:32]}"'})
+
+@app.post("/api/fill")
+async def fill(session_id: str = Form(...), key: str = Form(...), value: str = Form(...),
+               if_match: str | None = Header(None), db: Session = Depends(get_db)):
+    """Set one value. With If-Match: <version> the write only happens if nobody changed the session since (else 412)."""
+    expected = parse_if_match(if_match)
+    def write() -> int:
+        version = bump_version(db, session_id, expected)
+        if not set_values(db, session_id, {key: value}, version):
+            db.rollback(); raise HTTPException(404, "Placeholder not found")
+        db.commit()
+        return version
+    version = await asyncio.to_thread(write)
+    RENDERS.mark(session_id)
+    return versioned({"ok": True}, version)
 
 @app.post("/api/fill-bulk")
-def fill_bulk(session_id: str = Form(...), mapping_json: str = Form(...)):
-    db = next(db_sess())
-    doc = db.query(DocModel).filter(DocModel.session_id==session_id).first()
-    if not doc: raise HTTPException(404, "Session not found")
-    mapping = json.loads(mapping_json)
-    rows = db.query(Placeholder).filter(Placeholder.session_id==session_id).all()
-    for r in rows:
-        for k,v in mapping.items():
-            if r.key == k or r.normalized_key == normalize_key(k):
-                r.value = v; r.is_filled = True
-    db.commit()
-    eff = {r.key: r.value for r in rows if r.is_filled and r.value}
-    fill_placeholders(doc.original_docx_path, doc.working_docx_path, eff); make_preview(doc); db.commit()
-    return {"ok": True}
+async def fill_bulk(session_id: str = Form(...), mapping_json: str = Form(...),
+                    if_match: str | None = Header(None), db: Session = Depends(get_db)):
+    mapping, expected = json.loads(mapping_json), parse_if_match(if_match)
+    def write() -> int:
+        version = bump_version(db, session_id, expected)
+        set_values(db, session_id, mapping, version); db.commit()
+        return version
+    version = await asyncio.to_thread(write)
+    RENDERS.mark(session_id)
+    return versioned({"ok": True}, version)
+
+@app.post("/api/batch")
+async def batch_generate(session_id: str = Form(...), rows: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Fill the session's template once per CSV/JSONL row and stream back a ZIP of DOCX files.
+    For a bundle every document is filled per row, one ZIP folder per document
+    ({document}/{row file}). Nothing is written to data/ and no previews are rendered.
+    """
+    if not rows.filename.lower().endswith((".csv", ".jsonl", ".json")):
+        raise HTTPException(400, "Rows must be .csv or .jsonl")
+    docs = await asyncio.to_thread(session_docs, db, session_id)
+    if not docs: raise HTTPException(404, "Session not found")
+    if any(cached_index(index_path_for(d.working_docx_path)) is None for d in docs): raise HTTPException(409, "Session has no compiled template; upload it again")
+    try:
+        parsed = parse_rows(await rows.read(), rows.filename)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(400, f"Invalid rows file: {e}")
+
+    ph = await asyncio.to_thread(db.query(Placeholder).filter(Placeholder.session_id==session_id).all)
+    base = {r.key: r.value for r in ph if r.is_filled and r.value}
+    row_jobs = row_mappings(parsed, [r.key for r in ph], base)
+    if len(docs) == 1:
+        jobs = [(name, (0, mapping)) for name, mapping in row_jobs]
+    else:
+        folders = [os.path.splitext(n)[0] for n in member_names([d.filename for d in docs])]
+        jobs = [(f"{folder}/{name}", (i, mapping)) for i, folder in enumerate(folders) for name, mapping in row_jobs]
+
+    async def fill(job):
+        i, mapping = job
+        values = {normalize_key(k): v for k, v in mapping.items()}
+        # the worker loads and keeps the template: only its path and the row go over the pipe
+        return await run_cpu(materialize_task, docs[i].working_docx_path, doc_mapping(docs[i], values))
+
+    return StreamingResponse(stream_zip(jobs, fill, window=max(2, 2 * pool_size())), media_type="application/zip",
+                             headers={"Content-Disposition": 'attachment; filename="batch.zip"'})
 
 # ---- Chat (suggest only, do not auto-apply) ----
 @app.get("/api/messages")
-def messages(session_id: str):
-    db = next(db_sess())
+def messages(session_id: str, db: Session = Depends(get_db)):
     msgs = db.query(Message).filter(Message.session_id==session_id).all()
     return [{"role": m.role, "content": m.content} for m in msgs]
 
+@app.get("/api/chat/stats")
+def chat_stats():
+    """Extraction cache hit rate, coalesced in-flight requests, upstream time saved by hits, prompt size,
+    turns answered without the model."""
+    n = EXTRACT_STATS["prompts"]
+    return {**EXTRACT_CACHE.stats(), "coalesced": EXTRACT_FLIGHTS.coalesced,
+            "saved_seconds": round(EXTRACT_STATS["saved_seconds"], 3),
+            "avg_prompt_tokens": round(EXTRACT_STATS["prompt_tokens"] / n, 1) if n else 0.0,
+            "deterministic": EXTRACT_STATS["deterministic"]}
+
 @app.post("/api/chat")
-def chat(session_id: str = Form(...), message: str = Form(...)):
+async def chat(request: Request, session_id: str = Form(...), message: str = Form(...)):
     """
-    Document-agnostic, pending-only extraction using Groq (mixtral-8x7b-instruct),
-    with semantic hints and strong validations. Returns JSON-only suggestions.
+    Document-agnostic, pending-only extraction using the configured LLM backend (Groq by
+    default, see llm_client), with semantic hints and strong validations. Returns
+    JSON-only suggestions. Messages the deterministic extractor fully explains never reach
+    the model. The upstream call is cancelled if the caller disconnects.
     """
-    db = next(db_sess())
+    async def turn():
+        async for event, data in chat_events(session_id, message):
+            result = data   # "done" comes last
+        return result
+    try:
+        return await unless_disconnected(turn(), request.is_disconnected)
+    except ClientDisconnected:
+        return JSONResponse({"detail": "Client disconnected"}, status_code=499)
 
-    # Store user message in history
-    db.add(Message(session_id=session_id, role="user", content=message))
-    db.commit()
+@app.post("/api/chat/stream")
+async def chat_stream(session_id: str = Form(...), message: str = Form(...)):
+    """
+    /api/chat as Server-Sent Events: `token` events forward model output as it arrives,
+    `suggestion` events carry each validated value as soon as its key closes, and `done`
+    (the /api/chat response) follows once the Suggestion rows are stored.
+    """
+    async def events():
+        async for event, data in chat_events(session_id, message, stream=True):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
-    # Load placeholders and determine pending ones
-    all_ph = db.query(Placeholder).filter(Placeholder.session_id == session_id).all()
-    pending = [p for p in all_ph if not p.is_filled]
+async def chat_events(session_id: str, message: str, stream: bool = False):
+    """
+    One chat turn as (event, data) pairs: ("token", {"text"}) while the model streams
+    (stream=True), ("suggestion", {"key", "value"}) per validated value, and finally
+    ("done", response) once everything is persisted.
+    """
+    with SessionLocal() as db:
 
-    if not pending:
-        msg = "All placeholders are already filled 🎉"
-        db.add(Message(session_id=session_id, role="assistant", content=msg))
+        # Store user message in history
+        db.add(Message(session_id=session_id, role="user", content=message))
         db.commit()
-        return {"reply": msg, "suggestions": {}}
-
-    # Build pending list with types + HINTS
-    pending_list = [{"key": p.key, "type": placeholder_type_guess(p.key), "hint": generate_hint(p.key)} for p in pending]
-    pending_keys = set(p["key"] for p in pending_list)
-    type_by_key = {p["key"]: p["type"] for p in pending_list}
-
-    # ---------------------------------------------------------
-    # Helpers: normalization & regex fallbacks
-    # ---------------------------------------------------------
-    current_year = datetime.now().year
-
-    def normalize_money(raw: str) -> str:
-        # Capture forms like "4000 $", "$4000", "4,000", "4k" (we won't expand 4k here)
-        # Strip everything except digits and dots/commas
-        s = raw.strip()
-        # cases like "4000 $" -> put $ first
-        s = re.sub(r"^(\d[\d,\.]*)\s*\$$", r"$\1", s)
-        # extract numeric core
-        m = re.search(r"(\d[\d,\.]*)", s)
-        if not m:
-            return raw
-        num = m.group(1).replace(",", "")
-        try:
-            val = float(num)
-            return f"${val:,.0f}" if val.is_integer() else f"${val:,.2f}"
-        except:
-            return f"${m.group(1)}"
-
-    MONTHS = {
-        "jan": "January", "feb": "February", "mar": "March", "apr": "April", "may": "May", "jun": "June",
-        "jul": "July", "aug": "August", "sep": "September", "oct": "October", "nov": "November", "dec": "December"
-    }
-
-    def normalize_date_phrase(text: str) -> str:
-        t = text.lower().strip()
-        current_year = datetime.now().year
-        year = current_year
-
-        if "last year" in t:
-            year -= 1
-            t = t.replace("last year", "")
-        elif "next year" in t:
-            year += 1
-            t = t.replace("next year", "")
-        elif "this year" in t:
-            t = t.replace("this year", "")
-        else:
-            # If no relative year term, keep current year by default
-            pass
-
-        # D Mon  →  1 jan
-        m = re.search(r"(\d{1,2})(?:st|nd|rd|th)?\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\b", t)
-        if m:
-            day = int(m.group(1))
-            month = MONTHS[m.group(2)]
-            return f"{month} {day}, {year}"
-
-        # Mon D  →  jan 1
-        m = re.search(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+(\d{1,2})(?:st|nd|rd|th)?\b", t)
-        if m:
-            month = MONTHS[m.group(1)]
-            day = int(m.group(2))
-            return f"{month} {day}, {year}"
-
-        # 01/02 or 1-2-25 type
-        m = re.search(r"\b(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?\b", t)
-        if m:
-            m1, d1, y = int(m.group(1)), int(m.group(2)), m.group(3)
-            y = int(y) if y else year
-            if y < 100:
-                y += 2000
-            month_name = list(MONTHS.values())[m1-1] if 1 <= m1 <= 12 else "January"
-            return f"{month_name} {d1}, {y}"
-
-        # If nothing matched, return original
-        return text
-
-    # Fallback REGEX extractors (only applied if LLM returns nothing)
-    def fallback_extract_money(msg: str) -> str | None:
-        # Find $4,000 or 4000 $ or 4000
-        m = re.search(r"(\$\s*\d[\d,\.]*|\d[\d,\.]*\s*\$|\b\d[\d,\.]*\b)", msg)
-        if not m: return None
-        return normalize_money(m.group(1))
-
-    def fallback_extract_date(msg: str) -> str | None:
-        # Try phrase normalization
-        out = normalize_date_phrase(msg)
-        return out if out != msg else None
-
-    # ---------------------------------------------------------
-    # Build strict system & user prompts
-    # ---------------------------------------------------------
-    system = (
-        "You are a legal placeholder extraction assistant for Future equity investment agreement document.\n"
-        "You must return ONLY a JSON object.\n"
-        "You may ONLY include keys from the pending placeholder list provided.\n"
-        "For each key, use the 'hint' to decide if the user message provides that value.\n"
-        "If the user message does not clearly provide a value for a placeholder, return null for that key, or omit it.\n"
-        "NEVER invent data. NEVER output extra keys. No explanations.\n"
-        "Formatting:\n"
-        "- COMPANY → UPPERCASE (add ', INC.' ONLY if explicitly stated)\n"
-        "- PERSON → Proper Case (Jane Doe)\n"
-        "- DATE → Month D, YYYY (honor 'this year', 'last year', 'current year')\n"
-        "- MONEY → $X,XXX or $X,XXX,XXX (prefix with $)\n"
-    )
-
-    user = (
-        "Pending placeholders (key, type, hint):\n"
-        f"{json.dumps(pending_list, indent=2)}\n\n"
-        f"User message:\n{message}\n\n"
-        "Return ONLY a JSON mapping for the pending keys where the message clearly provides the value.\n"
-        "If the message doesn't provide a value for a pending key, omit that key or set it to null."
-    )
-
-    ai_mapping = {}
-    try:
-        if groq_client:
-            resp = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                temperature=0.2,
-                max_tokens=512,
-                messages=[{"role":"system","content":system},{"role":"user","content":user}],
-            )
-            raw = (resp.choices[0].message.content or "").strip()
-            ai_mapping = extract_json_safe(raw)
+
+        # Load placeholders and determine pending ones
+        all_ph = db.query(Placeholder).filter(Placeholder.session_id == session_id).all()
+        pending = [p for p in all_ph if not p.is_filled]
+
+        if not pending:
+            msg = "All placeholders are already filled 🎉"
+            db.add(Message(session_id=session_id, role="assistant", content=msg))
+            db.commit()
+            yield "done", {"reply": msg, "suggestions": {}}
+            return
+
+        # Build pending list with types + HINTS
+        pending_list = [{"key": p.key, "type": placeholder_type_guess(p.key), "hint": generate_hint(p.key)} for p in pending]
+        pending_keys = set(p["key"] for p in pending_list)
+        type_by_key = {p["key"]: p["type"] for p in pending_list}
+
+        # Deterministic pass first (money/date/name/company tokens, explicit `[Key]: value`);
+        # the model is only asked when something in the message could not be placed
+        found = extract(message, pending_list)
+        emitted = set()
+        if found.values and not found.ambiguous:
+            clean = dict(found.values)
+            EXTRACT_STATS["deterministic"] += 1
+            prompt_meta = {"tokens": 0, "candidates": 0, "pending": len(pending_list)}
         else:
-            ai_mapping = {}
-    except Exception as e:
-        print("Groq error:", e)
-        ai_mapping = {}
-
-    # Keep only pending keys and non-null values
-    clean = {}
-    for k, v in (ai_mapping or {}).items():
-        if k in pending_keys and v not in [None, "", "null"]:
-            clean[k] = str(v).strip()
-
-    # Post-format by expected type (money/date polish)
-    for k, v in list(clean.items()):
-        t = type_by_key.get(k, "TEXT")
-        if t == "MONEY":
-            clean[k] = normalize_money(v)
-        elif t == "DATE":
-            clean[k] = normalize_date_phrase(v)
-
-    # If LLM returned nothing, try regex fallbacks for single-intent messages
-    if not clean:
-        # If any MONEY pending and message contains a numeric currency — extract
-        money_keys = [k for k in pending_keys if type_by_key.get(k) == "MONEY"]
-        if money_keys:
-            mval = fallback_extract_money(message)
-            if mval:
-                # If only one money field, assign directly
-                if len(money_keys) == 1:
-                    clean[money_keys[0]] = mval
-                else:
-                    def score_money_key(k: str) -> int:
-                        lk = k.lower()
-                        hk = generate_hint(k).lower()
-                        tokens = ["purchase", "price", "amount", "consideration", "principal", "cap", "valuation"]
-                        return sum(t in lk for t in tokens) + sum(t in hk for t in tokens)
-                    best = sorted(money_keys, key=score_money_key, reverse=True)[0]
-                    clean[best] = mval
-
-
-        # If any DATE pending and message looks like a date
-        date_keys = [k for k in pending_keys if type_by_key.get(k) == "DATE"]
-        if date_keys:
-            dval = fallback_extract_date(message)
-            if dval:
-                clean[date_keys[0]] = dval  # safe default: first pending date
-
-    if not clean:
-        msg = "No valid placeholder values detected."
-        db.add(Message(session_id=session_id, role="assistant", content=msg))
+            # Compact key | type | hint table, pre-filtered to what the message can answer
+            system, user, prompt_meta = build_prompt(pending_list, message)
+            EXTRACT_STATS["prompts"] += 1
+            EXTRACT_STATS["prompt_tokens"] += prompt_meta["tokens"]
+
+            def accept(k, v) -> str | None:
+                """Pending-only, non-null, type-polished value for a model-proposed pair (None = drop)."""
+                if k not in pending_keys or v in [None, "", "null"]:
+                    return None
+                v = str(v).strip()
+                t = type_by_key.get(k, "TEXT")
+                if t == "MONEY":
+                    return normalize_money(v)
+                if t == "DATE":
+                    return normalize_date_phrase(v)
+                return v
+
+            def fallbacks() -> dict:
+                """Used when the LLM returned nothing: partial deterministic values, else the regex fallbacks."""
+                return dict(found.values) or fallback_values(message, pending_list)
+
+            # Same prompt + pending set + message => same extraction: serve it from the cache,
+            # and let identical requests in flight share one upstream call
+            llm = get_client()
+            cache_key = extraction_key(system, pending_list, message)
+            messages = [{"role":"system","content":system},{"role":"user","content":user}]
+
+            async def run_extraction() -> dict:
+                t0, ok, ai_mapping = time.perf_counter(), True, {}
+                try:
+                    if llm:
+                        ai_mapping = extract_json_object(await llm.complete(messages, temperature=0.2, max_tokens=512))
+                except Exception:
+                    log.exception("LLM extraction failed; using fallbacks")
+                    ok, ai_mapping = False, {}
+                clean = {}
+                for k, v in ai_mapping.items():
+                    v = accept(k, v)
+                    if v is not None:
+                        clean[k] = v
+                clean = clean or fallbacks()
+                if ok:  # never cache a failed upstream call
+                    EXTRACT_CACHE.set(cache_key, (clean, time.perf_counter() - t0))
+                return clean
+
+            cached = EXTRACT_CACHE.get(cache_key)
+            if cached is not None:
+                clean = dict(cached[0])
+                EXTRACT_STATS["saved_seconds"] += cached[1]
+            elif stream and llm:
+                # Forward tokens as they arrive; each pair is validated the moment its value closes
+                t0, ok, clean, parser = time.perf_counter(), True, {}, ObjectStream()
+                try:
+                    async for delta in llm.stream(messages, temperature=0.2, max_tokens=512):
+                        yield "token", {"text": delta}
+                        for k, v in parser.feed(delta):
+                            v = accept(k, v)
+                            if v is not None and k not in clean:
+                                clean[k] = v
+                                emitted.add(k)
+                                yield "suggestion", {"key": k, "value": v}
+                except Exception:
+                    log.exception("LLM stream failed; using fallbacks")
+                    ok = False
+                if not clean:
+                    clean = fallbacks()
+                if ok:
+                    EXTRACT_CACHE.set(cache_key, (dict(clean), time.perf_counter() - t0))
+            else:
+                clean = dict(await EXTRACT_FLIGHTS.do(cache_key, run_extraction))
+
+        for k, v in clean.items():
+            if k not in emitted:
+                yield "suggestion", {"key": k, "value": v}
+
+        if not clean:
+            msg = "No valid placeholder values detected."
+            db.add(Message(session_id=session_id, role="assistant", content=msg))
+            db.commit()
+            yield "done", {"reply": msg, "suggestions": {}, "prompt": prompt_meta}
+            return
+
+        # Store as 'pending' suggestions for approval
+        for k, v in clean.items():
+            db.add(Suggestion(session_id=session_id, key=k, value=v, status="pending"))
         db.commit()
-        return {"reply": msg, "suggestions": {}}
 
-    # Store as 'pending' suggestions for approval
-    for k, v in clean.items():
-        db.add(Suggestion(session_id=session_id, key=k, value=v, status="pending"))
-    db.commit()
-
-    assistant_msg = f"Suggested values: {json.dumps(clean, indent=2)}"
-    db.add(Message(session_id=session_id, role="assistant", content=assistant_msg))
-    db.commit()
+        assistant_msg = f"Suggested values: {json.dumps(clean, indent=2)}"
+        db.add(Message(session_id=session_id, role="assistant", content=assistant_msg))
+        db.commit()
 
-    return {"reply": assistant_msg, "suggestions": clean}
+        yield "done", {"reply": assistant_msg, "suggestions": clean, "prompt": prompt_meta}
 
 @app.post("/api/apply-suggestion")
-def apply_suggestion(session_id: str = Form(...), key: str = Form(...), value: str = Form(...)):
-    db = next(db_sess())
-    doc = db.query(DocModel).filter(DocModel.session_id==session_id).first()
-    if not doc: raise HTTPException(404, "Session not found")
+async def apply_suggestion(session_id: str = Form(...), key: str = Form(...), value: str = Form(...),
+                           if_match: str | None = Header(None), db: Session = Depends(get_db)):
+    expected = parse_if_match(if_match)
+    def write() -> int:
+        version = bump_version(db, session_id, expected)
+
+        # mark suggestion accepted
+        sug = db.query(Suggestion).filter(Suggestion.session_id==session_id, Suggestion.key==key, Suggestion.value==value, Suggestion.status=="pending").first()
+        if sug: sug.status = "accepted"
+
+        # set placeholder
+        if not set_values(db, session_id, {key: value}, version):
+            db.rollback(); raise HTTPException(404, "Placeholder not found")
+        db.commit()
+        return version
+    version = await asyncio.to_thread(write)
+    RENDERS.mark(session_id)
+    return versioned({"ok": True}, version)
 
-    # mark suggestion accepted
-    sug = db.query(Suggestion).filter(Suggestion.session_id==session_id, Suggestion.key==key, Suggestion.value==value, Suggestion.status=="pending").first()
-    if sug: sug.status = "accepted"
-
-    # set placeholder
-    r = db.query(Placeholder).filter(Placeholder.session_id==session_id).all()
-    target = None
-    for p in r:
-        if p.key == key or p.normalized_key == normalize_key(key):
-            target = p; break
-    if not target: raise HTTPException(404, "Placeholder not found")
-    target.value = value; target.is_filled = True; db.commit()
-
-    mapping = {x.key: x.value for x in r if x.is_filled and x.value}
-    fill_placeholders(doc.original_docx_path, doc.working_docx_path, mapping); make_preview(doc); db.commit()
-    return {"ok": True}
+@app.post("/api/accept-suggestions")
+async def accept_suggestions(session_id: str = Form(...), if_match: str | None = Header(None), db: Session = Depends(get_db)):
+    """
+    Accept every pending suggestion of the session (the latest per key wins) with one
+    render. Nothing pending leaves the version, and so the ETag, as it was.
+    """
+    expected = parse_if_match(if_match)
+    def write() -> tuple[int, dict]:
+        pending = (db.query(Suggestion).filter(Suggestion.session_id==session_id, Suggestion.status=="pending")
+                   .order_by(Suggestion.created_at, Suggestion.id).all())
+        if not pending:
+            version = db.query(DocModel.version).filter(DocModel.session_id==session_id).limit(1).scalar()
+            if version is None: raise HTTPException(404, "Session not found")
+            if expected is not None and expected != version: raise HTTPException(412, "Document changed; reload and retry")
+            return version, {}
+        version = bump_version(db, session_id, expected)
+        mapping = {}
+        for sug in pending:
+            sug.status = "accepted"
+            mapping[sug.key] = sug.value
+        set_values(db, session_id, mapping, version); db.commit()
+        return version, mapping
+    version, mapping = await asyncio.to_thread(write)
+    if mapping: RENDERS.mark(session_id)
+    return versioned({"ok": True, "accepted": mapping}, version)
 
 @app.post("/api/reject-suggestion")
-def reject_suggestion(session_id: str = Form(...), key: str = Form(...), value: str = Form(...)):
-    db = next(db_sess())
+def reject_suggestion(session_id: str = Form(...), key: str = Form(...), value: str = Form(...), db: Session = Depends(get_db)):
     sug = db.query(Suggestion).filter(Suggestion.session_id==session_id, Suggestion.key==key, Suggestion.value==value, Suggestion.status=="pending").first()
     if sug: sug.status = "rejected"; db.commit()
     return {"ok": True}
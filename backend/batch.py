@@ -0,0 +1,108 @@
+# backend/batch.py
+"""
+Batch generation: one session template x N mapping rows -> ZIP of filled DOCX files
+(for a multi-document session, one folder per document).
+
+Rows come from a CSV (header = placeholder keys) or JSONL (one object per line). Columns
+are matched to placeholders the same way /api/fill-bulk does (exact key or normalize_key);
+a "filename" column that is not a placeholder names the output file. Documents are
+filled in memory in the worker pool and streamed out in row order as they finish.
+"""
+import asyncio, csv, io, json, re, zipfile
+from collections import deque
+
+from placeholder_engine import normalize_key
+
+MAX_ROWS = 5000
+FILENAME_COLUMN = "filename"
+
+def parse_rows(raw: bytes, filename: str) -> list[dict]:
+    text = raw.decode("utf-8-sig")
+    if filename.lower().endswith(".csv"):
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+        if not all(isinstance(r, dict) for r in rows):
+            raise ValueError("Each JSONL line must be a JSON object")
+    if len(rows) > MAX_ROWS:
+        raise ValueError(f"At most {MAX_ROWS} rows per batch")
+    return rows
+
+def row_mappings(rows: list[dict], keys: list[str], base: dict[str, str]) -> list[tuple[str, dict]]:
+    """
+    Resolve each row to (output filename, {placeholder key: value}). Values the row does
+    not provide fall back to `base` (the session's current fills).
+    """
+    by_norm = {}
+    for k in keys:
+        by_norm.setdefault(normalize_key(k), k)
+    exact = set(keys)
+
+    out, used = [], set()
+    for i, row in enumerate(rows, 1):
+        mapping, name = dict(base), None
+        for col, v in row.items():
+            if col is None:
+                continue
+            key = col if col in exact else by_norm.get(normalize_key(col))
+            if key is not None:
+                if v not in (None, ""):
+                    mapping[key] = str(v)
+            elif col.strip().lower() == FILENAME_COLUMN and v:
+                name = str(v)
+        out.append((_unique(_safe_name(name) if name else f"document_{i:03d}.docx", used), mapping))
+    return out
+
+def member_names(names: list[str | None]) -> list[str]:
+    """Safe, unique .docx member names for a ZIP, in order; None gets document_NNN.docx."""
+    used = set()
+    return [_unique(_safe_name(n) if n else f"document_{i:03d}.docx", used) for i, n in enumerate(names, 1)]
+
+def _safe_name(name: str) -> str:
+    name = re.sub(r"[^\w\-. ]+", "_", name).strip(" .") or "document"
+    return name if name.lower().endswith(".docx") else f"{name}.docx"
+
+def _unique(name: str, used: set) -> str:
+    base, n = name, 1
+    while name in used:
+        n += 1
+        name = re.sub(r"\.docx$", f"_{n}.docx", base)
+    used.add(name)
+    return name
+
+class _ZipSink:
+    """Write-only stream for zipfile; we drain it after each member. No tell/seek,
+    so zipfile writes data descriptors and never looks back."""
+    def __init__(self): self.chunks = []
+    def write(self, b): self.chunks.append(bytes(b)); return len(b)
+    def flush(self): pass
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks); self.chunks.clear(); return data
+
+async def stream_zip(jobs: list[tuple[str, object]], fill, window: int):
+    """
+    Async generator of ZIP bytes. `fill(job)` is an awaitable producing DOCX bytes;
+    at most `window` fills are in flight and members are written in row order.
+    DOCX parts are already deflated, so members are stored, not recompressed.
+    """
+    sink = _ZipSink()
+    pending = deque()
+    it = iter(jobs)
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, mapping in it:
+            pending.append((name, asyncio.ensure_future(fill(mapping))))
+            if len(pending) >= window:
+                break
+        try:
+            while pending:
+                name, fut = pending.popleft()
+                data = await fut
+                nxt = next(it, None)
+                if nxt is not None:
+                    pending.append((nxt[0], asyncio.ensure_future(fill(nxt[1]))))
+                zf.writestr(name, data)
+                yield sink.drain()
+        finally:
+            for _, fut in pending:
+                fut.cancel()
+    yield sink.drain()  # central directory
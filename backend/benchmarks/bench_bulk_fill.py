@@ -0,0 +1,57 @@
+# backend/benchmarks/bench_bulk_fill.py
+# Upload-time placeholder inserts and /api/fill-bulk on a large session: the former
+# per-row db.add + Python nested-loop matching vs. bulk INSERT and one executemany
+# UPDATE over the (session_id, normalized_key) index.
+#   cd backend && python benchmarks/bench_bulk_fill.py [n_placeholders] [n_sessions]
+import os, sys, tempfile, time
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))   # app.db of its own
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def legacy_insert(db, sid, keys):
+    from models import Placeholder
+    from placeholder_engine import normalize_key
+    for k in keys:
+        db.add(Placeholder(session_id=sid, key=k, normalized_key=normalize_key(k), is_filled=False))
+    db.commit()
+
+def legacy_fill(db, sid, mapping):
+    from models import Placeholder
+    from placeholder_engine import normalize_key
+    rows = db.query(Placeholder).filter(Placeholder.session_id == sid).all()
+    for r in rows:
+        for k, v in mapping.items():
+            if r.key == k or r.normalized_key == normalize_key(k):
+                r.value = v; r.is_filled = True
+    db.commit()
+    return {r.key: r.value for r in rows if r.is_filled and r.value}
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    from app import set_values, filled_values
+    from db import SessionLocal
+    from models import Placeholder
+    from placeholder_engine import normalize_key
+    from sqlalchemy import insert
+    keys = [f"[Field {i}]" for i in range(n)]
+    mapping = {k.strip("[]"): f"value {i}" for i, k in enumerate(keys)}
+
+    with SessionLocal() as db:   # other sessions' rows, so lookups have something to skip
+        for s in range(sessions):
+            db.execute(insert(Placeholder), [{"session_id": f"other-{s}", "key": k, "normalized_key": normalize_key(k)} for k in keys])
+        db.commit()
+
+        t0 = time.perf_counter(); legacy_insert(db, "legacy", keys); t_ins_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        db.execute(insert(Placeholder), [{"session_id": "bulk", "key": k, "normalized_key": normalize_key(k), "is_filled": False} for k in keys])
+        db.commit(); t_ins_new = time.perf_counter() - t0
+
+        t0 = time.perf_counter(); old = legacy_fill(db, "legacy", mapping); t_fill_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        set_values(db, "bulk", mapping, 1); db.commit(); new = filled_values(db, "bulk")
+        t_fill_new = time.perf_counter() - t0
+    assert {normalize_key(k): v for k, v in old.items()} == new
+    print(f"{n} placeholders, {sessions} other sessions in the table")
+    print(f"  insert    per-row add {t_ins_old*1000:8.1f} ms   bulk insert    {t_ins_new*1000:8.1f} ms")
+    print(f"  fill-bulk nested loop{t_fill_old*1000:8.1f} ms   executemany    {t_fill_new*1000:8.1f} ms")
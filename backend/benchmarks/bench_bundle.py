@@ -0,0 +1,47 @@
+# backend/benchmarks/bench_bundle.py
+# A closing bundle (three corpus documents sharing their named keys): filling the deal
+# terms once in a bundle session vs. once per document in three separate sessions, up
+# to fresh previews of every document, and the ZIP download of the filled bundle.
+#   cd backend && python benchmarks/bench_bundle.py [corpus size]
+import json, os, sys, tempfile, time
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH)); sys.path.insert(0, BENCH)
+from corpus import CORPUS, make_docx, named_keys
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))   # app.db / data/ of its own
+    size = sys.argv[1] if len(sys.argv) > 1 else "medium"
+    from fastapi.testclient import TestClient
+    from app import app
+    spec = CORPUS[size]
+    docs = [make_docx(**{**spec, "seed": spec["seed"] * 10 + i}) for i in range(3)]
+    terms = json.dumps({k: f"value {i}" for i, k in enumerate(named_keys(spec["named"]))})
+
+    def upload(c, raw, sid=None):
+        return c.post("/api/upload", files={"file": (f"doc{len(raw)}.docx", raw, "application/octet-stream")},
+                      data={"session_id": sid} if sid else {}).json()
+
+    with TestClient(app) as c:
+        sids = [upload(c, raw)["session_id"] for raw in docs]
+        t0 = time.perf_counter()
+        for sid in sids:
+            c.post("/api/fill-bulk", data={"session_id": sid, "mapping_json": terms})
+            c.get("/api/render", params={"session_id": sid})
+        t_separate = time.perf_counter() - t0
+
+        bundle = upload(c, docs[0])["session_id"]
+        ids = [upload(c, raw, bundle)["document_id"] for raw in docs[1:]]
+        ids.insert(0, c.get("/api/documents", params={"session_id": bundle}).json()[0]["id"])
+        t0 = time.perf_counter()
+        c.post("/api/fill-bulk", data={"session_id": bundle, "mapping_json": terms})
+        pages = [c.get("/api/render", params={"session_id": bundle, "document_id": d}).json() for d in ids]
+        t_bundle = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        zipped = c.get("/api/download", params={"session_id": bundle})
+        t_zip = time.perf_counter() - t0
+    assert all("value 0" in p["html"] for p in pages) and zipped.headers["content-type"] == "application/zip"
+    print(f"3 x {size} documents, {spec['named']} shared keys")
+    print(f"  separate sessions: 3 fills + 3 renders   {t_separate * 1000:8.1f} ms")
+    print(f"  bundle session:    1 fill + 3 renders    {t_bundle * 1000:8.1f} ms")
+    print(f"  bundle ZIP download ({len(zipped.content) // 1024} KB)  {t_zip * 1000:8.1f} ms")
@@ -0,0 +1,47 @@
+# backend/benchmarks/bench_chat_concurrency.py
+# Concurrent chat completions against the local stub (llm_stub.py, fixed model latency):
+# blocking client in Starlette's request threadpool (the old sync /api/chat) vs. the
+# pooled async client.
+#   cd backend && python benchmarks/bench_chat_concurrency.py [n_chats] [latency_s]
+import asyncio, os, socket, sys, threading, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import anyio, httpx, uvicorn
+import llm_stub
+from llm_client import LLMClient
+
+MESSAGES = [{"role": "user", "content": "User message:\n[Company Name]: Acme"}]
+
+def serve_stub(latency: float) -> str:
+    sock = socket.socket(); sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(llm_stub.create_app(delay=latency), log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{sock.getsockname()[1]}/v1"
+
+async def blocking(base_url: str, n: int) -> float:
+    http = httpx.Client(base_url=base_url, timeout=60)
+    def call():
+        http.post("/chat/completions", json={"model": "stub", "messages": MESSAGES}).raise_for_status()
+    t0 = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(n):
+            tg.start_soon(anyio.to_thread.run_sync, call)  # default limiter: 40 threads, like sync routes
+    http.close()
+    return time.perf_counter() - t0
+
+async def pooled(base_url: str, n: int) -> float:
+    client = LLMClient(base_url, timeout=60, max_concurrency=256)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client.complete(MESSAGES) for _ in range(n)))
+    await client.aclose()
+    return time.perf_counter() - t0
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    base_url = serve_stub(latency)
+    old, new = asyncio.run(blocking(base_url, n)), asyncio.run(pooled(base_url, n))
+    print(f"{n} concurrent chats, {latency*1000:.0f} ms model latency")
+    print(f"  blocking + threadpool : {old:6.2f} s  {n/old:7.1f} chats/s")
+    print(f"  pooled async client   : {new:6.2f} s  {n/new:7.1f} chats/s  {old/new:.1f}x")
@@ -0,0 +1,59 @@
+# backend/benchmarks/bench_chat_stream.py
+# Time to first useful byte for a chat turn: /api/chat (whole completion, then JSON)
+# vs. /api/chat/stream (first `suggestion` event), against the stub model with a
+# realistic first-token latency and token rate.
+#   cd backend && python benchmarks/bench_chat_stream.py [first_token_s] [per_token_s]
+import io, os, sys, tempfile, time
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND); sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import httpx, uvicorn, socket, threading
+from docx import Document
+import llm_stub
+
+def serve(app) -> str:
+    sock = socket.socket(); sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+def template() -> bytes:
+    d = Document()
+    keys = ["Company Name", "Investor Name", "Purchase Amount", "Date of Safe", "State of Incorporation"]
+    for k in keys + [f"Field {i}" for i in range(20)]:
+        d.add_paragraph(f"{k}: [{k}]")
+    out = io.BytesIO(); d.save(out)
+    return out.getvalue()
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))   # app.db / data/ of its own
+    first = float(sys.argv[1]) if len(sys.argv) > 1 else 0.4
+    per_token = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    os.environ["LLM_BASE_URL"] = serve(llm_stub.create_app(delay=first, token_delay=per_token)) + "/v1"
+    from app import app
+    base = serve(app)
+    http = httpx.Client(base_url=base, timeout=60)
+    message = "\n".join(f"[Field {i}]: value number {i}" for i in range(12)) + "\n[Investor Name]: Jane Doe"
+
+    def session() -> str:
+        res = http.post("/api/upload", files={"file": ("t.docx", template(), "application/octet-stream")})
+        return res.json()["session_id"]
+
+    sid_a, sid_b = session(), session()
+    t0 = time.perf_counter()
+    http.post("/api/chat", data={"session_id": sid_a, "message": message}).raise_for_status()
+    blocking = time.perf_counter() - t0
+
+    # a different message so the extraction cache can't answer
+    t0, first_suggestion, done = time.perf_counter(), None, None
+    with http.stream("POST", "/api/chat/stream", data={"session_id": sid_b, "message": message + "\nthanks"}) as res:
+        for line in res.iter_lines():
+            if line == "event: suggestion" and first_suggestion is None:
+                first_suggestion = time.perf_counter() - t0
+            elif line == "event: done":
+                done = time.perf_counter() - t0
+    print(f"stub model: {first*1000:.0f} ms to first token, {per_token*1000:.0f} ms per token")
+    print(f"  /api/chat            response      : {blocking*1000:7.1f} ms")
+    print(f"  /api/chat/stream     1st suggestion: {first_suggestion*1000:7.1f} ms  ({blocking/first_suggestion:.1f}x sooner)")
+    print(f"                       done          : {done*1000:7.1f} ms")
@@ -0,0 +1,70 @@
+# backend/benchmarks/bench_db_concurrency.py
+# Concurrent fill-shaped transactions (read a session's placeholders, update one, commit,
+# plus preview reads) against the former engine (default SQLite settings: rollback
+# journal, FULL sync, default pool) vs. db.make_engine (WAL, NORMAL, mmap, env pool).
+#   cd backend && python benchmarks/bench_db_concurrency.py [threads] [ops_per_thread] [db_url]
+import gzip, os, sys, tempfile, threading, time, uuid
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from db import Base, make_engine
+from models import Session as Sess, Placeholder, Document
+
+def seed(engine, sessions: int, keys: int) -> list[str]:
+    Base.metadata.create_all(engine)
+    ids = [str(uuid.uuid4()) for _ in range(sessions)]
+    with sessionmaker(bind=engine)() as db:
+        for sid in ids:
+            db.add(Sess(id=sid)); db.add(Document(session_id=sid, preview_gz=gzip.compress(b"<p>x</p>" * 500)))
+            db.add_all(Placeholder(session_id=sid, key=f"[K{i}]", normalized_key=f"k{i}") for i in range(keys))
+        db.commit()
+    return ids
+
+def run(engine, threads: int, ops: int) -> tuple[list[float], int]:
+    ids, Session = seed(engine, threads, 40), sessionmaker(bind=engine, autoflush=False)
+    lat, errors, lock = [], [0], threading.Lock()
+
+    def worker(n: int):
+        sid = ids[n]
+        for i in range(ops):
+            t0 = time.perf_counter()
+            try:
+                with Session() as db:
+                    if i % 2:   # fill
+                        rows = db.query(Placeholder).filter(Placeholder.session_id == sid).all()
+                        rows[i % len(rows)].value = f"v{i}"; rows[i % len(rows)].is_filled = True
+                        db.commit()
+                    else:       # render / list
+                        db.query(Document).filter(Document.session_id == sid).first().preview_gz
+                        db.query(Placeholder).filter(Placeholder.session_id == sid).all()
+            except OperationalError:
+                with lock: errors[0] += 1
+            with lock: lat.append(time.perf_counter() - t0)
+
+    ts = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    return sorted(lat), errors[0]
+
+def pct(lat: list[float], p: float) -> float:
+    return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    tmp = tempfile.mkdtemp(prefix="lexsy-bench-")
+    url = sys.argv[3] if len(sys.argv) > 3 else None
+    engines = {
+        "default sqlite": create_engine(url or f"sqlite:///{tmp}/before.db", connect_args={"check_same_thread": False}),
+        "make_engine   ": make_engine(url or f"sqlite:///{tmp}/after.db"),
+    }
+    print(f"{threads} threads x {ops} ops (half fills, half reads)")
+    for name, engine in engines.items():
+        t0 = time.perf_counter()
+        lat, errors = run(engine, threads, ops)
+        wall = time.perf_counter() - t0
+        print(f"  {name}  p50 {pct(lat, .5):7.2f} ms  p99 {pct(lat, .99):8.2f} ms  "
+              f"max {lat[-1]*1000:8.1f} ms  {len(lat)/wall:7.0f} ops/s  errors {errors}")
+        if url:
+            Base.metadata.drop_all(engine)
@@ -0,0 +1,59 @@
+# backend/benchmarks/bench_engine.py
+# Upload scan + fill on a large contract: python-docx object model vs. the lxml engine.
+#   cd backend && python benchmarks/bench_engine.py [n_paragraphs] [n_tables]
+import io, os, sys, time, tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docx import Document
+from docx_parser import rename_placeholders
+from template_index import fill_package as fill_v1
+from legacy_v1 import compile_document
+from ooxml_engine import compile_parts, fill_package, load_parts, rename_parts, save_parts
+
+def contract(n_paragraphs: int, n_tables: int) -> bytes:
+    d = Document()
+    for i in range(n_paragraphs):
+        if i % 10 == 0:
+            d.add_paragraph(f"{i}. The Company shall pay $[_____] (the “Purchase Amount”) to [Investor Name].")
+        else:
+            d.add_paragraph("Each party represents that it has full power and authority to enter into this agreement. " * 2)
+    for t in range(n_tables):
+        tbl = d.add_table(rows=6, cols=4)
+        tbl.cell(0, 0).merge(tbl.cell(0, 3)).text = "[Company Name] signature block"  # merged row
+        for r in range(1, 6):
+            for c in range(4):
+                tbl.cell(r, c).text = "[Signer Name]" if c == 0 else "Date: [____]"
+    out = io.BytesIO(); d.save(out)
+    return out.getvalue()
+
+def old_scan(raw):
+    doc = Document(io.BytesIO(raw)); keys = rename_placeholders(doc)
+    index, _ = compile_document(doc, keys)
+    out = io.BytesIO(); doc.save(out)
+    return out.getvalue(), keys, index
+
+def new_scan(raw):
+    pkg = load_parts(raw); keys = rename_parts(pkg)
+    return save_parts(raw, pkg), keys, compile_parts(pkg, keys)
+
+def measure(fn):
+    # peak covers the Python heap only; lxml's C allocations are not traced
+    tracemalloc.start(); t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0; peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return result, elapsed, peak
+
+if __name__ == "__main__":
+    n_paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    n_tables = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    raw = contract(n_paragraphs, n_tables)
+    print(f"{n_paragraphs} paragraphs, {n_tables} tables, {len(raw) / 1e3:.0f} KB")
+    (w_old, k_old, i_old), t_old, m_old = measure(lambda: old_scan(raw))
+    (w_new, k_new, i_new), t_new, m_new = measure(lambda: new_scan(raw))
+    assert k_old == k_new, (k_old, k_new)
+    print(f"  scan  python-docx : {t_old*1000:8.1f} ms  peak {m_old/1e6:6.1f} MB")
+    print(f"  scan  lxml engine : {t_new*1000:8.1f} ms  peak {m_new/1e6:6.1f} MB  {t_old/t_new:.1f}x")
+    mapping = {k: f"value {i}" for i, k in enumerate(k_new)}
+    _, t_old, m_old = measure(lambda: fill_v1(w_old, i_old, mapping))
+    _, t_new, m_new = measure(lambda: fill_package(w_new, i_new, mapping))
+    print(f"  fill  python-docx : {t_old*1000:8.1f} ms  peak {m_old/1e6:6.1f} MB")
+    print(f"  fill  lxml engine : {t_new*1000:8.1f} ms  peak {m_new/1e6:6.1f} MB  {t_old/t_new:.1f}x")
@@ -0,0 +1,32 @@
+# backend/benchmarks/bench_extraction.py
+# Deterministic extraction ahead of the model: time per message, and which chat turns it
+# answers on its own (no LLM round trip) on a SAFE-like pending set.
+#   cd backend && python benchmarks/bench_extraction.py [iterations]
+import os, sys, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import placeholder_type_guess
+from placeholder_hints import generate_hint
+from extraction import extract
+
+KEYS = ["[Company Name]", "[Investor Name]", "[Purchase Amount]", "[Post-Money Valuation Cap]", "[Date of Safe]",
+        "[State of Incorporation]", "[Signer Title]"] + [f"[Blank]#{i}" for i in range(2, 40)]
+MESSAGES = ["The purchase amount is $250,000 and the valuation cap is $10M",
+            "Company is Acme Robotics, Inc.",
+            "Investor Jane Doe, dated March 3 this year",
+            "Acme Robotics, Inc. and investor Jane Doe: purchase amount $50k, valuation cap 10M, signed 1 jan",
+            "[State of Incorporation]: Delaware\n[Signer Title]: CEO",
+            "$5,000",
+            "incorporated in Delaware, Jane signs as CEO",
+            "ok thanks"]
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pending_list = [{"key": k, "type": placeholder_type_guess(k), "hint": generate_hint(k)} for k in KEYS]
+    print(f"{len(KEYS)} pending placeholders, {n} iterations per message")
+    for msg in MESSAGES:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            values, ambiguous = extract(msg, pending_list)
+        us = (time.perf_counter() - t0) / n * 1e6
+        verdict = "LLM" if ambiguous else f"{len(values)} filled"
+        print(f"  {us:7.1f} us  {verdict:9}  {msg[:60]!r}")
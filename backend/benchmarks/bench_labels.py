@@ -0,0 +1,66 @@
+# backend/benchmarks/bench_labels.py
+# Generic [____] labeling on long paragraphs (signature blocks, schedules) with hundreds of
+# blanks: per-blank prefix re-scan (previous implementation) vs. the one-pass label context.
+#   cd backend && python benchmarks/bench_labels.py [n_blanks ...]
+import os, re, sys, time
+from collections import defaultdict
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docx_parser import (BRACKETED_GENERIC, BRACKETED_NAMED, COMPANY_HINT_TOKENS, DATE_HINT_TOKENS,
+                         INVESTOR_HINT_TOKENS, MONEY_HINT_TOKENS, QUOTE_PAT, placeholder_spans)
+
+def rescan_label(text_before, text_after):
+    """The former _titleish_phrases_around: slices and re-scans the whole prefix per blank."""
+    text_before = re.sub(r"[\$\(\)\[\]]+$", "", text_before.strip())
+    for m in reversed(list(QUOTE_PAT.finditer(text_before))):
+        phrase = m.group(1).strip()
+        if 2 <= len(phrase) <= 60 and not any(ch in phrase for ch in "[]"):
+            return phrase
+    tail = re.sub(r"[\[\]\(\)\$]+", "", text_before[-160:])
+    cand = re.split(r"[.;:\n]", tail)[-1].strip()
+    if any(t in cand.lower() for t in MONEY_HINT_TOKENS + DATE_HINT_TOKENS + COMPANY_HINT_TOKENS + INVESTOR_HINT_TOKENS):
+        words = re.sub(r"\s+", " ", cand).strip(" -:").split()
+        return " ".join(w.capitalize() for w in words) if len(words) > 1 else words[0].capitalize()
+    for qm in QUOTE_PAT.finditer(re.sub(r"[\[\]\(\)\$]+", "", text_after[:120])):
+        phrase = qm.group(1).strip()
+        if 2 <= len(phrase) <= 60 and not any(ch in phrase for ch in "[]"):
+            return phrase
+    combo = (text_before[-200:] + text_after[:200]).lower()
+    for token in MONEY_HINT_TOKENS + DATE_HINT_TOKENS:
+        if token in combo:
+            return token.title()
+    return None
+
+def rescan_spans(text):
+    matches = [m.span() for m in BRACKETED_GENERIC.finditer(text)]
+    matches += [m.span() for m in BRACKETED_NAMED.finditer(text) if not BRACKETED_GENERIC.fullmatch(m.group(0))]
+    spans, dup_counts = [], defaultdict(int)
+    for a, b in sorted(matches):
+        if not BRACKETED_GENERIC.fullmatch(text[a:b]):
+            spans.append((a, b, text[a:b])); continue
+        key = f"[{rescan_label(text[:a], text[b:]) or 'Blank'}]"
+        dup_counts[key] += 1
+        spans.append((a, b, key if dup_counts[key] == 1 else f"{key}#{dup_counts[key]}"))
+    return spans
+
+def paragraph(n_blanks: int) -> str:
+    rows = ["Signature: [________]\tName: [________]\tTitle: [______]",
+            "“Holder {i}” shares: [_____]",
+            "the Investor's address [_______] and [Company Name]",
+            "Date: [____]; Purchase Amount $[______]"]
+    return "\n".join(rows[i % len(rows)].format(i=i) for i in range(0, n_blanks, 2))
+
+def bench(fn, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(text); best = min(best, time.perf_counter() - t0)
+    return best
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or [100, 500, 2000]:
+        text = paragraph(n)
+        assert rescan_spans(text) == placeholder_spans(text)
+        old, new = bench(rescan_spans, text), bench(placeholder_spans, text)
+        blanks = len(BRACKETED_GENERIC.findall(text))
+        print(f"{blanks} blanks, {len(text)} chars")
+        print(f"  prefix re-scan : {old*1000:8.2f} ms")
+        print(f"  label context  : {new*1000:8.2f} ms  {old/new:.1f}x")
@@ -0,0 +1,50 @@
+# backend/benchmarks/bench_metrics_overhead.py
+# Cost of the instrumentation: a @timed call and a stage() block vs. a plain call, and
+# fill + render round trips through the app with LEXSY_METRICS=1 vs. LEXSY_METRICS=0
+# (each mode in its own interpreter, since the switch is read at import).
+#   cd backend && python benchmarks/bench_metrics_overhead.py [requests]
+import io, os, subprocess, sys, tempfile, time, timeit
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+def template() -> bytes:
+    from docx import Document
+    d = Document()
+    for i in range(200):
+        d.add_paragraph(f"{i}. [Company Name] and [Investor Name] agree to clause {i}.")
+    out = io.BytesIO(); d.save(out)
+    return out.getvalue()
+
+def round_trips(n: int) -> float:
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as c:
+        sid = c.post("/api/upload", files={"file": ("t.docx", template(), "application/octet-stream")}).json()["session_id"]
+        t0 = time.perf_counter()
+        for i in range(n):
+            c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": f"ACME {i}"})
+            c.get("/api/render", params={"session_id": sid})
+        return (time.perf_counter() - t0) / n
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--round-trips":
+        print(round_trips(int(sys.argv[2])))
+        sys.exit()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    import metrics
+    def plain(): return 1
+    calls = 200_000
+    t_plain = timeit.timeit(plain, number=calls) / calls
+    t_timed = timeit.timeit(metrics.timed("bench")(plain), number=calls) / calls
+    def block():
+        with metrics.stage("bench"): pass
+    t_stage = timeit.timeit(block, number=calls) / calls
+    print(f"per call: plain {t_plain*1e9:6.0f} ns   @timed {t_timed*1e9:6.0f} ns   stage() {t_stage*1e9:6.0f} ns")
+
+    for flag in ("0", "1"):
+        env = {**os.environ, "LEXSY_METRICS": flag, "PYTHONWARNINGS": "ignore"}
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--round-trips", str(n)],
+                             env=env, capture_output=True, text=True, check=True).stdout.split()[-1]
+        print(f"LEXSY_METRICS={flag}: fill + render round trip {float(out)*1000:6.2f} ms")
@@ -0,0 +1,35 @@
+# backend/benchmarks/bench_preview.py
+# Fill-to-preview latency: mammoth re-render of the filled DOCX vs. the slot template.
+#   cd backend && python benchmarks/bench_preview.py [n_paragraphs] [n_keys]
+import os, sys, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docx import Document
+from render_service import compile_preview, docx_to_html, render_preview_slots
+
+def synthetic_docx(path: str, n_paragraphs: int, n_keys: int) -> list[str]:
+    keys = [f"[Field {i}]" for i in range(n_keys)]
+    d = Document()
+    for j in range(n_paragraphs):
+        text = "The parties agree that the following terms apply to this agreement. " * 2
+        if j % max(1, n_paragraphs // n_keys) == 0:
+            text += keys[j % n_keys]
+        d.add_paragraph(text)
+    d.save(path)
+    return keys
+
+if __name__ == "__main__":
+    n_paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_keys = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    path = os.path.join(tempfile.mkdtemp(), "bench.docx")
+    keys = synthetic_docx(path, n_paragraphs, n_keys)
+    mapping = {k: f"value {i}" for i, k in enumerate(keys[: n_keys // 2])}
+
+    t0 = time.perf_counter(); docx_to_html(path); full = time.perf_counter() - t0
+    t0 = time.perf_counter(); preview = compile_preview(path, keys); build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(20):
+        render_preview_slots(preview, mapping)
+    slot = (time.perf_counter() - t0) / 20
+    print(f"{n_paragraphs} paragraphs, {n_keys} keys")
+    print(f"  mammoth re-render : {full*1000:8.2f} ms")
+    print(f"  slot template     : {slot*1000:8.2f} ms  (one-off compile {build*1000:.2f} ms)  {full/slot:.0f}x")
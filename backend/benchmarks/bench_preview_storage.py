@@ -0,0 +1,56 @@
+# backend/benchmarks/bench_preview_storage.py
+# Preview storage and transfer: app.db with the previews as plain text (the former
+# html_preview column) vs. gzip'd preview_gz, and bytes on the wire per request with and
+# without Accept-Encoding: gzip.
+#   cd backend && python benchmarks/bench_preview_storage.py [sessions] [paragraphs]
+import gzip, io, os, shutil, sqlite3, sys, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docx import Document
+
+def template(paragraphs: int, seed: int) -> bytes:
+    d = Document()
+    for i in range(paragraphs):
+        d.add_paragraph(f"{seed}.{i} The Company shall deliver to [Investor Name] the notice set out in Section {i} "
+                        f"no later than [Date of Safe], at the address of [Company Name] on record.")
+    out = io.BytesIO(); d.save(out)
+    return out.getvalue()
+
+def db_size(path: str) -> int:
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)"); con.execute("VACUUM"); con.close()
+    return os.path.getsize(path)
+
+def as_plain_text(src: str, dst: str):
+    """The same database with previews stored the old way, as uncompressed TEXT."""
+    shutil.copy(src, dst)
+    con = sqlite3.connect(dst)
+    con.create_function("gunzip", 1, lambda b: gzip.decompress(b).decode())
+    con.execute("ALTER TABLE documents ADD COLUMN html_preview TEXT")
+    con.execute("UPDATE documents SET html_preview = gunzip(preview_gz), preview_gz = NULL")
+    con.commit(); con.close()
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))   # app.db / data/ of its own
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    paragraphs = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as c:
+        sids = [c.post("/api/upload", files={"file": ("t.docx", template(paragraphs, n), "application/octet-stream")}).json()["session_id"]
+                for n in range(sessions)]
+        for sid in sids:
+            c.post("/api/fill", data={"session_id": sid, "key": "[Investor Name]", "value": "Jane Doe"})
+        wire = {}
+        for path in ("/api/render", "/api/placeholders"):
+            for enc in ("identity", "gzip"):
+                res = c.get(path, params={"session_id": sids[0]}, headers={"Accept-Encoding": enc})
+                wire[path, enc] = res.num_bytes_downloaded
+    from db import engine
+    engine.dispose()
+    as_plain_text("app.db", "plain.db")
+    before, after = db_size("plain.db"), db_size("app.db")
+    print(f"{sessions} sessions x {paragraphs} paragraphs")
+    print(f"  app.db   html_preview TEXT {before / 1024:9.0f} KB   preview_gz {after / 1024:9.0f} KB  ({before / after:.1f}x smaller)")
+    for path in ("/api/render", "/api/placeholders"):
+        plain, packed = wire[path, "identity"], wire[path, "gzip"]
+        print(f"  {path:18s} identity {plain:9d} B   gzip {packed:9d} B  ({plain / packed:.1f}x fewer bytes)")
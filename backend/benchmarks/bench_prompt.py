@@ -0,0 +1,33 @@
+# backend/benchmarks/bench_prompt.py
+# Chat prompt size on a template with many blanks: the former indented-JSON pending list
+# vs. the compact, pre-filtered table from prompt_builder.
+#   cd backend && python benchmarks/bench_prompt.py [n_blanks]
+import json, os, sys, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import placeholder_type_guess
+from placeholder_hints import generate_hint
+from prompt_builder import SYSTEM_PROMPT, build_prompt, count_tokens
+
+MESSAGES = ["The purchase amount is $250,000 and the valuation cap is $10M",
+            "Company is Acme Robotics, Inc., incorporated in Delaware",
+            "Jane Doe signs as CEO on March 3 this year",
+            "ok thanks"]
+
+def legacy_user(pending_list, message):
+    return (f"Pending placeholders (key, type, hint):\n{json.dumps(pending_list, indent=2)}\n\n"
+            f"User message:\n{message}\n\n"
+            "Return ONLY a JSON mapping for the pending keys where the message clearly provides the value.\n"
+            "If the message doesn't provide a value for a pending key, omit that key or set it to null.")
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    base = ["[Company Name]", "[Investor Name]", "[Purchase Amount]", "[Valuation Cap]", "[Date of Safe]",
+            "[State of Incorporation]", "[Signer Name]", "[Signer Title]", "[Company Address]", "[Effective Date]"]
+    keys = (base + [f"[Blank]#{i}" for i in range(2, n)])[:n]
+    pending_list = [{"key": k, "type": placeholder_type_guess(k), "hint": generate_hint(k)} for k in keys]
+    print(f"{n} pending placeholders (prompt tokens incl. system prompt)")
+    for msg in MESSAGES:
+        old = count_tokens(SYSTEM_PROMPT) + count_tokens(legacy_user(pending_list, msg))
+        t0 = time.perf_counter(); _, _, meta = build_prompt(pending_list, msg); dt = time.perf_counter() - t0
+        print(f"  {msg[:44]:44} legacy {old:5}  compact {meta['tokens']:5} ({meta['candidates']:2} rows, "
+              f"{dt*1000:.2f} ms)  {old/meta['tokens']:.1f}x smaller")
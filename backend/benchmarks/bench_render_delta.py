@@ -0,0 +1,44 @@
+# backend/benchmarks/bench_render_delta.py
+# Preview traffic for one fill on a long agreement: full /api/render vs. a 304 on an
+# unchanged poll vs. /api/render/delta since the client's version.
+#   cd backend && python benchmarks/bench_render_delta.py [paragraphs]
+import io, json, os, sys, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docx import Document
+
+def template(paragraphs: int) -> bytes:
+    d = Document()
+    keys = [f"Field {i}" for i in range(40)]
+    for i in range(paragraphs):
+        d.add_paragraph(f"{i}. The parties agree that [{keys[i % len(keys)]}] shall apply as set out in "
+                        "this Agreement, notwithstanding anything to the contrary herein.")
+    out = io.BytesIO(); d.save(out)
+    return out.getvalue()
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))   # app.db / data/ of its own
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as c:
+        sid = c.post("/api/upload", files={"file": ("t.docx", template(n), "application/octet-stream")}).json()["session_id"]
+        page = c.get("/api/render", params={"session_id": sid})
+        etag, version = page.headers["ETag"], page.json()["version"]
+
+        t0 = time.perf_counter()
+        unchanged = c.get("/api/render", params={"session_id": sid}, headers={"If-None-Match": etag})
+        t_304 = time.perf_counter() - t0
+
+        c.post("/api/fill", data={"session_id": sid, "key": "[Field 7]", "value": "Acme Holdings, Inc."})
+        t0 = time.perf_counter()
+        delta = c.get("/api/render/delta", params={"session_id": sid, "since": version})
+        t_delta = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        full = c.get("/api/render", params={"session_id": sid})
+        t_full = time.perf_counter() - t0
+    assert unchanged.status_code == 304 and json.loads(delta.content)["changes"]
+    print(f"{n} paragraphs, {len(page.json()['slots'])} slots; one key filled")
+    print(f"  full render      {len(full.content):9d} bytes  {t_full*1000:7.1f} ms")
+    print(f"  304 (no change)  {len(unchanged.content):9d} bytes  {t_304*1000:7.1f} ms")
+    print(f"  delta            {len(delta.content):9d} bytes  {t_delta*1000:7.1f} ms  "
+          f"({len(full.content) / len(delta.content):.0f}x smaller)")
@@ -0,0 +1,38 @@
+# backend/benchmarks/bench_write_behind.py
+# A burst of field edits followed by a preview fetch: rendering after every fill (the
+# former behaviour, reproduced by flushing after each fill) vs. the debounced
+# write-behind render. Reports wall time and the number of preview renders.
+#   cd backend && python benchmarks/bench_write_behind.py [n_edits] [n_paragraphs]
+import io, os, sys, tempfile, time
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))   # app.db / data/ of its own
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docx import Document
+
+def template(n_paragraphs: int) -> bytes:
+    d = Document()
+    for j in range(n_paragraphs):
+        d.add_paragraph("The parties agree that the following terms apply. " * 3 + f"[Field {j % 50}]")
+    out = io.BytesIO(); d.save(out)
+    return out.getvalue()
+
+if __name__ == "__main__":
+    n_edits = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    n_paragraphs = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    from fastapi.testclient import TestClient
+    from app import app, RENDERS
+    raw = template(n_paragraphs)
+    with TestClient(app) as c:
+        def run(flush_each: bool) -> tuple[float, int]:
+            sid = c.post("/api/upload", files={"file": ("t.docx", raw, "application/octet-stream")}).json()["session_id"]
+            runs, t0 = RENDERS.runs, time.perf_counter()
+            for i in range(n_edits):
+                c.post("/api/fill", data={"session_id": sid, "key": f"[Field {i % 50}]", "value": f"value {i}"})
+                if flush_each:
+                    c.get("/api/render", params={"session_id": sid})
+            c.get("/api/render", params={"session_id": sid})
+            return time.perf_counter() - t0, RENDERS.runs - runs
+        old, new = run(True), run(False)
+    print(f"{n_edits} fills then a render, {n_paragraphs} paragraphs")
+    print(f"  render per fill : {old[0]*1000:8.1f} ms  {old[1]:3d} renders")
+    print(f"  write-behind    : {new[0]*1000:8.1f} ms  {new[1]:3d} renders")
@@ -0,0 +1,50 @@
+# backend/benchmarks/bench_zip_rewrite.py
+# Fill cost on image-heavy documents: python-docx load/fill/save vs. zip-level rewrite
+# of word/document.xml with every other part copied compressed.
+#   cd backend && python benchmarks/bench_zip_rewrite.py [n_images] [image_kb]
+import io, os, struct, sys, tempfile, time, zlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from docx import Document
+from docx.shared import Inches
+from docx_parser import find_placeholders
+from template_index import fill_package
+from legacy_v1 import compile_template, fill_document
+
+def noise_png(kb: int, seed: int) -> bytes:
+    """Incompressible RGB PNG of roughly `kb` kilobytes (stands in for a scanned letterhead)."""
+    w = 256; h = max(1, kb * 1024 // (w * 3))
+    rows = b"".join(b"\x00" + os.urandom(w * 3) for _ in range(h))
+    chunk = lambda t, d: struct.pack(">I", len(d)) + t + d + struct.pack(">I", zlib.crc32(t + d))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, 1)) + chunk(b"IEND", b""))
+
+def build(path: str, n_images: int, image_kb: int):
+    d = Document()
+    for i in range(n_images):
+        d.add_picture(io.BytesIO(noise_png(image_kb, i)), width=Inches(2))
+        for j in range(20):
+            d.add_paragraph(f"Clause {i}.{j}: [Company Name] shall pay [Investor Name] the amount agreed.")
+    d.save(path)
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t0)
+    return best
+
+if __name__ == "__main__":
+    n_images = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    image_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+    path = os.path.join(tempfile.mkdtemp(), "bench.docx")
+    build(path, n_images, image_kb)
+    index = compile_template(path, find_placeholders(path))
+    mapping = {"[Company Name]": "ACME, INC.", "[Investor Name]": "Jane Doe"}
+
+    def python_docx():
+        doc = Document(path); fill_document(doc, index, mapping); doc.save(io.BytesIO())
+
+    old = best_of(python_docx)
+    new = best_of(lambda: fill_package(path, index, mapping))
+    print(f"{n_images} images x {image_kb} KB, package {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"  python-docx load+save : {old*1000:8.2f} ms")
+    print(f"  zip partial rewrite   : {new*1000:8.2f} ms  {old/new:.1f}x")
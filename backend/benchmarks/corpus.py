@@ -0,0 +1,96 @@
+# backend/benchmarks/corpus.py
+# Synthetic DOCX corpus for the benchmark suite: seeded, so the same spec always gives
+# the same document. Paragraph counts from 1 to 5,000, tables with merged cells, inline
+# PNG images, and 0 to 500 placeholders split between named [Key] ones and [____]
+# blanks (labeled by a quoted phrase, or bare and enumerated).
+#   cd backend && python benchmarks/corpus.py OUT_DIR      writes every CORPUS document
+import io, os, random, struct, sys, zipfile, zlib
+from docx import Document
+from docx.shared import Inches
+
+BASES = ["Company Name", "Investor Name", "Purchase Amount", "Date of Safe", "State of Incorporation",
+         "Valuation Cap", "Governing Law", "Notice Address", "Company Signatory", "Investor Title"]
+WORDS = ("the parties agree that each obligation under this agreement shall survive closing and remain "
+         "binding upon successors and permitted assigns notwithstanding any provision to the contrary herein").split()
+
+# name -> spec; "tiny" is the 1 paragraph / 0 placeholder end of the range (the suite skips
+# its fill cases), "large" the 5,000 paragraph / 500 placeholder end
+CORPUS = {
+    "tiny":   {"paragraphs": 1,    "named": 0,   "blanks": 0,   "tables": 0,  "images": 0,  "seed": 1},
+    "small":  {"paragraphs": 50,   "named": 8,   "blanks": 2,   "tables": 1,  "images": 1,  "seed": 2},
+    "medium": {"paragraphs": 500,  "named": 80,  "blanks": 20,  "tables": 4,  "images": 3,  "seed": 3},
+    "large":  {"paragraphs": 5000, "named": 400, "blanks": 100, "tables": 20, "images": 10, "seed": 4},
+}
+
+def png(w: int = 16, h: int = 16, rgb: tuple = (40, 90, 160)) -> bytes:
+    """A solid-colour RGB PNG, built by hand so the corpus needs nothing beyond python-docx."""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+    rows = b"".join(b"\x00" + bytes(rgb) * w for _ in range(h))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+def named_keys(n: int) -> list[str]:
+    return [f"[{BASES[i]}]" if i < len(BASES) else f"[{BASES[i % len(BASES)]} {i}]" for i in range(n)]
+
+def _blank(i: int) -> str:
+    # every third blank is bare (enumerated by the scanner); the rest carry a quoted label
+    return "[____]" if i % 3 == 2 else f"$[____] (the “Tranche {i} Amount”)"
+
+def _sentence(rng: random.Random, words: int) -> str:
+    s = " ".join(rng.choice(WORDS) for _ in range(words))
+    return s[0].upper() + s[1:] + "."
+
+def make_docx(paragraphs: int, named: int = 0, blanks: int = 0, tables: int = 0, images: int = 0, seed: int = 0) -> bytes:
+    """
+    DOCX bytes for one spec. Placeholders are dealt round-robin over the body paragraphs
+    and the table cells; each table has a merged header row.
+    """
+    rng = random.Random(seed)
+    items = named_keys(named) + [_blank(i) for i in range(blanks)]
+    rng.shuffle(items)
+    d = Document()
+    paras = [d.add_paragraph(_sentence(rng, rng.randint(8, 30))) for _ in range(paragraphs)]
+    cells = []
+    for t in range(tables):
+        anchor = paras[(t + 1) * paragraphs // (tables + 1) - 1] if paragraphs else None
+        tbl = d.add_table(rows=4, cols=3)
+        tbl.cell(0, 0).merge(tbl.cell(0, 2)).text = f"Schedule {t + 1}"
+        tbl.cell(2, 0).merge(tbl.cell(3, 0)).text = "Terms"
+        cells += [tbl.cell(r, c) for r in (1, 2, 3) for c in (1, 2)]
+        if anchor is not None:
+            anchor._p.addnext(tbl._tbl)
+    for i in range(images):
+        run = paras[(i * 7919) % paragraphs].add_run() if paragraphs else d.add_paragraph().add_run()
+        run.add_picture(io.BytesIO(png(rgb=(40 + i * 20 % 200, 90, 160))), width=Inches(0.3))
+    holders = paras + cells
+    for i, item in enumerate(items):
+        target = holders[i % len(holders)] if holders else d.add_paragraph()
+        p = target.paragraphs[-1] if hasattr(target, "paragraphs") else target
+        p.add_run(f" {item} " if p.text else f"{item} ")
+    out = io.BytesIO(); d.save(out)
+    return _pin_timestamps(out.getvalue())
+
+def _pin_timestamps(raw: bytes) -> bytes:
+    # python-docx stamps every entry with the save time; a fixed one keeps the bytes seeded
+    src, out = zipfile.ZipFile(io.BytesIO(raw)), io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as z:
+        for info in src.infolist():
+            z.writestr(zipfile.ZipInfo(info.filename, date_time=(1980, 1, 1, 0, 0, 0)), src.read(info), zipfile.ZIP_DEFLATED)
+    return out.getvalue()
+
+def variant(raw: bytes, n: int) -> bytes:
+    """The same document with different bytes (an unreferenced extra part), to miss the upload cache."""
+    buf = io.BytesIO(raw)
+    with zipfile.ZipFile(buf, "a") as z:
+        z.writestr(f"customXml/bench{n}.txt", str(n))
+    return buf.getvalue()
+
+if __name__ == "__main__":
+    out = sys.argv[1] if len(sys.argv) > 1 else "corpus"
+    os.makedirs(out, exist_ok=True)
+    for name, spec in CORPUS.items():
+        path = os.path.join(out, f"{name}.docx")
+        with open(path, "wb") as f:
+            f.write(make_docx(**spec))
+        print(f"{path}: {spec}")
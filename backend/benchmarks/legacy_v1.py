@@ -0,0 +1,59 @@
+# backend/benchmarks/legacy_v1.py
+# The python-docx template compiler and fill that ooxml_engine replaced, kept for the
+# comparison benchmarks and for writing version 1 indexes in tests. The app only reads
+# such indexes (template_index.fill_package, for templates compiled by older releases).
+from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from placeholder_engine import compile_key_pattern
+from template_index import W_P, fill_element
+
+W_R = qn("w:r")
+W_PPR = qn("w:pPr")
+W_RPR = qn("w:rPr")
+
+def compile_template(docx_path: str, keys: list[str]) -> dict:
+    """Path wrapper around compile_document; saves the file back if it was normalized."""
+    doc = Document(docx_path)
+    index, dirty = compile_document(doc, keys)
+    if dirty:
+        doc.save(docx_path)
+    return index
+
+def compile_document(doc, keys: list[str]) -> tuple[dict, bool]:
+    """
+    Version 1 index: for every paragraph holding a key, its ordinal among all w:p elements,
+    its text and the [start, end, key] slots in it. Indexed paragraphs are collapsed to one
+    plain run, so (index, dirty) says whether the document must be saved.
+    """
+    pat = compile_key_pattern(keys)
+    paragraphs, by_key = [], {}
+    if pat is None:
+        return {"paragraphs": paragraphs, "keys": by_key}, False
+
+    dirty = False
+    for i, p in enumerate(doc.element.body.iter(W_P)):
+        para = Paragraph(p, doc._body)
+        text = para.text
+        if "[" not in text:
+            continue
+        slots = [[m.start(), m.end(), m.group(0)] for m in pat.finditer(text)]
+        if not slots:
+            continue
+        if not _is_plain_single_run(p):
+            para.clear(); para.add_run(text); dirty = True
+        for _, _, k in slots:
+            refs = by_key.setdefault(k, [])
+            if not refs or refs[-1] != len(paragraphs):
+                refs.append(len(paragraphs))
+        paragraphs.append({"p": i, "text": text, "slots": slots})
+
+    return {"paragraphs": paragraphs, "keys": by_key}, dirty
+
+def _is_plain_single_run(p) -> bool:
+    content = [c for c in p if c.tag != W_PPR]
+    return len(content) == 1 and content[0].tag == W_R and content[0].find(W_RPR) is None
+
+def fill_document(doc, index: dict, mapping: dict[str, str], changed=None):
+    """Fill a loaded python-docx Document in place from a version 1 index."""
+    fill_element(doc.element, index, mapping, changed)
@@ -0,0 +1,179 @@
+# backend/benchmarks/suite.py
+# Regression suite over the synthetic corpus (corpus.py): upload, scan, fill, bulk fill,
+# render and chat, both as direct calls into the modules and through the API with
+# TestClient (chat against llm_stub in-process). Each case is its best run after a
+# warm-up, in ms. Results are compared with a JSON baseline, scaled by how fast this
+# machine runs a fixed calibration workload compared with the baseline's; any case
+# slower than that by more than --threshold (relative) and --floor ms fails the run
+# (exit 1), if a second run confirms it. The defaults catch step changes; tighten them
+# on a quiet machine.
+#   cd backend && python benchmarks/suite.py                      quick profile vs. its baseline
+#   cd backend && python benchmarks/suite.py --profile full       adds the 5,000 paragraph document
+#   cd backend && python benchmarks/suite.py --update             (re)write the baseline
+import argparse, io, json, os, platform, re, shutil, sys, tempfile, time, zlib
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH)); sys.path.insert(0, BENCH)
+from corpus import CORPUS, make_docx, variant
+
+PROFILES = {"quick": ["tiny", "small", "medium"], "full": ["tiny", "small", "medium", "large"]}
+BASELINE_DIR = os.path.join(BENCH, "baselines")
+
+def measure(fn, repeat: int, setup=None, budget: float = 0.25) -> float:
+    """
+    Best wall time of fn() / fn(setup(n)) after one warm-up, in ms; setup runs outside the
+    clock. At least `repeat` runs, more for fast cases (up to 50, or `budget` seconds) so
+    they are not one scheduler hiccup away from a false regression.
+    """
+    times, spent, n = [], 0.0, 0
+    while n <= repeat or (spent < budget and n <= 50):
+        arg = setup(n) if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        elapsed = time.perf_counter() - t0
+        if n: times.append(elapsed * 1000); spent += elapsed
+        n += 1
+    return min(times)
+
+def calibrate() -> float:
+    """ms for a fixed mix of interpreter, regex, zlib and XML work: this machine's speed, right now."""
+    from lxml import etree
+    text = " ".join(f"[Field {i}] clause {i} of the agreement" for i in range(4000))
+    xml = "<r>" + "".join(f"<p n='{i}'>{i}</p>" for i in range(4000)) + "</r>"
+    def work():
+        sum(len(m.group(0)) for m in re.finditer(r"\[[^\]]+\]", text))
+        zlib.compress(text.encode(), 6)
+        len(etree.fromstring(xml.encode()).findall("p"))
+        sorted(str(i) for i in range(20000))
+    return measure(work, 10)
+
+def chat_message(keys: list[str]) -> str:
+    # the stub answers "[Key]: value" lines; the trailing remark keeps the deterministic extractor out
+    return "\n".join(f"{k}: value {i}" for i, k in enumerate(keys[:5])) + "\nas agreed with Counsel"
+
+def direct_cases(name: str, raw: bytes, repeat: int, work: str) -> dict:
+    from extraction import extract
+    from ingest import ingest_upload
+    from render_service import docx_to_html, render_preview_slots
+    from ooxml_engine import compile_parts, fill_package, load_parts, rename_parts
+
+    def scan():
+        pkg = load_parts(raw)
+        return compile_parts(pkg, rename_parts(pkg))
+
+    ing = ingest_upload(io.BytesIO(raw), os.path.join(work, f"{name}-orig.docx"), os.path.join(work, f"{name}-work.docx"))
+    keys, working = ing["keys"], os.path.join(work, f"{name}-work.docx")
+    mapping = {k: f"value {i}" for i, k in enumerate(keys)}
+    with open(working, "rb") as f:
+        template = f.read()
+    out = {
+        "ingest": measure(lambda n: ingest_upload(io.BytesIO(raw), os.path.join(work, f"o{n}.docx"), os.path.join(work, f"w{n}.docx")),
+                          repeat, setup=lambda n: n),
+        "scan": measure(scan, repeat),
+        "render": measure(lambda: docx_to_html(working), repeat),
+        "chat": measure(lambda: extract(chat_message(keys), [{"key": k, "type": "TEXT"} for k in keys]), repeat),
+    }
+    if keys:   # a document without placeholders has nothing to fill
+        out["fill"] = measure(lambda: fill_package(template, ing["index"], {keys[0]: "value"}), repeat)
+        out["fill_bulk"] = measure(lambda: fill_package(template, ing["index"], mapping), repeat)
+        if "preview" in ing["index"]:
+            out["render_slots"] = measure(lambda: render_preview_slots(ing["index"]["preview"], mapping), repeat)
+    return {f"direct.{case}.{name}": ms for case, ms in out.items()}
+
+def http_cases(c, name: str, raw: bytes, repeat: int) -> dict:
+    def upload(n: int):
+        res = c.post("/api/upload", files={"file": ("t.docx", variant(raw, n), "application/octet-stream")})
+        res.raise_for_status()
+        return res.json()
+
+    counter = iter(range(10 ** 6, 10 ** 7))
+    t_upload = measure(lambda: upload(next(counter)), repeat)
+    body = upload(0)
+    sid, keys = body["session_id"], [p["key"] for p in body["placeholders"]]
+    mapping = {k: f"value {i}" for i, k in enumerate(keys)}
+    rounds = iter(range(10 ** 6))
+
+    def fill():
+        c.post("/api/fill", data={"session_id": sid, "key": keys[0], "value": f"v{next(rounds)}"}).raise_for_status()
+
+    def fill_bulk():
+        n = next(rounds)
+        c.post("/api/fill-bulk", data={"session_id": sid, "mapping_json": json.dumps({k: f"{v} {n}" for k, v in mapping.items()})}).raise_for_status()
+
+    def render(_):   # a fresh change first, so the render is real work rather than a cache hit
+        c.get("/api/render", params={"session_id": sid}).raise_for_status()
+
+    def chat():
+        c.post("/api/chat", data={"session_id": sid, "message": chat_message(keys) + f" #{next(rounds)}"}).raise_for_status()
+
+    out = {"upload": t_upload, "chat": measure(chat, repeat)}
+    if keys:   # without placeholders a fill changes nothing and the render after it is a restamp
+        out.update({"fill": measure(fill, repeat), "fill_bulk": measure(fill_bulk, repeat),
+                    "render": measure(render, repeat, setup=lambda n: fill_bulk())})
+    return {f"http.{case}.{name}": ms for case, ms in out.items()}
+
+def run(names: list[str], repeat: int) -> dict:
+    import httpx, llm_client, llm_stub
+    from fastapi.testclient import TestClient
+    from app import app
+    llm_client.set_client(llm_client.LLMClient("http://stub/v1", transport=httpx.ASGITransport(app=llm_stub.create_app(delay=0))))
+    docs = {name: make_docx(**CORPUS[name]) for name in names}
+    results, work = {}, tempfile.mkdtemp(prefix="lexsy-suite-")
+    try:
+        for name, raw in docs.items():
+            results.update(direct_cases(name, raw, repeat, work))
+        with TestClient(app) as c:
+            for name, raw in docs.items():
+                results.update(http_cases(c, name, raw, repeat))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {k: round(v, 3) for k, v in results.items()}
+
+def compare(results: dict, baseline: dict, threshold: float, floor: float, scale: float = 1.0) -> list[str]:
+    """Cases slower than baseline * scale by more than `threshold` (relative) and `floor` ms."""
+    return [k for k, ms in results.items()
+            if k in baseline and ms > baseline[k] * scale * (1 + threshold) and ms - baseline[k] * scale > floor]
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark the corpus and compare with a JSON baseline.")
+    ap.add_argument("--profile", choices=PROFILES, default="quick")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown, relative (0.5 = 50%%)")
+    ap.add_argument("--floor", type=float, default=5.0, help="ignore slowdowns under this many ms")
+    ap.add_argument("--baseline", help="baseline JSON (default: baselines/<profile>.json)")
+    ap.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    args = ap.parse_args()
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.profile}.json")
+
+    os.chdir(tempfile.mkdtemp(prefix="lexsy-bench-"))   # app.db / data/ of its own
+    calibration = calibrate()
+    results = run(PROFILES[args.profile], args.repeat)
+    calibration = min(calibration, calibrate())   # before and after: the quieter of the two
+    baseline, scale = {}, 1.0
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        baseline, scale = saved["results"], calibration / saved.get("calibration_ms", calibration)
+
+    slow = compare(results, baseline, args.threshold, args.floor, scale)
+    if slow and not args.update:
+        # confirm on a second run before calling it a regression: noise rarely strikes twice
+        again = run(PROFILES[args.profile], args.repeat)
+        results = {k: min(ms, again.get(k, ms)) for k, ms in results.items()}
+        slow = compare(results, baseline, args.threshold, args.floor, scale)
+    print(f"calibration {calibration:.2f} ms  (x{scale:.2f} the baseline machine)")
+    for k, ms in results.items():
+        base = baseline.get(k)
+        delta = f"{(ms / (base * scale) - 1) * 100:+7.1f}%" if base else "    new"
+        print(f"{'SLOW' if k in slow else '    '} {k:32s} {ms:10.2f} ms  {delta}")
+
+    if args.update:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({"profile": args.profile, "repeat": args.repeat, "python": platform.python_version(),
+                       "machine": platform.machine(), "cpus": os.cpu_count(), "calibration_ms": round(calibration, 3),
+                       "results": results}, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written: {baseline_path}")
+    elif slow:
+        print(f"{len(slow)} case(s) regressed more than {args.threshold:.0%} (and {args.floor} ms) against {baseline_path}")
+        sys.exit(1)
@@ -0,0 +1,121 @@
+# backend/blob_store.py
+"""
+Content-addressed template store. An upload is keyed by the SHA-256 of its bytes and
+processed once into data/blobs/{sha}/:
+
+    orig.docx              the upload as received
+    template.docx          renamed placeholders; read-only, shared by sessions
+    template.index.json    compiled template (template_index / render_service slots)
+    meta.json              {"keys": [...], "html": initial preview, "slots": its slot offsets, "size": n}
+
+Sessions point their original/working paths at the blob; fills never write to it (the
+filled DOCX is built at download time). template_blobs.refcount counts live sessions;
+blobs at zero for longer than the grace period are garbage collected: after a session
+deletion, and by the API process on startup and every LEXSY_BLOB_GC_INTERVAL_SECONDS.
+"""
+import json, os, shutil, uuid
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+
+from models import TemplateBlob
+
+BLOB_ROOT = os.path.join("data", "blobs")
+GC_GRACE = timedelta(seconds=int(os.getenv("LEXSY_BLOB_GRACE_SECONDS", "3600")))
+GC_INTERVAL = float(os.getenv("LEXSY_BLOB_GC_INTERVAL_SECONDS", "900"))   # 0: only on startup and deletions
+
+def blob_dir(sha: str) -> str:
+    return os.path.join(BLOB_ROOT, sha)
+
+def blob_paths(sha: str) -> tuple[str, str]:
+    """(orig.docx, template.docx) for a stored blob."""
+    d = blob_dir(sha)
+    return os.path.join(d, "orig.docx"), os.path.join(d, "template.docx")
+
+def sha_for_path(path: str | None) -> str | None:
+    """The blob a session file points into, or None for per-session files."""
+    if not path:
+        return None
+    parent, _ = os.path.split(os.path.normpath(path))
+    root, sha = os.path.split(parent)
+    return sha if root == os.path.normpath(BLOB_ROOT) else None
+
+def read_meta(sha: str) -> dict | None:
+    try:
+        with open(os.path.join(blob_dir(sha), "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def stage_blob(sha: str) -> tuple[str, str, str]:
+    """Temp directory to build a blob in: (tmp_dir, orig_path, template_path)."""
+    os.makedirs(BLOB_ROOT, exist_ok=True)
+    tmp = os.path.join(BLOB_ROOT, f".{sha}.{uuid.uuid4().hex}")
+    os.makedirs(tmp)
+    return tmp, os.path.join(tmp, "orig.docx"), os.path.join(tmp, "template.docx")
+
+def discard_blob(tmp: str):
+    shutil.rmtree(tmp, ignore_errors=True)
+
+def commit_blob(sha: str, tmp: str, meta: dict) -> dict:
+    """
+    Write meta.json and rename the staged directory into place, so readers never see a
+    half-written blob. If another request stored the same hash meanwhile, its copy wins.
+    """
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    try:
+        os.rename(tmp, blob_dir(sha))
+    except OSError:
+        discard_blob(tmp)
+        existing = read_meta(sha)
+        if existing is None:
+            raise
+        return existing
+    return meta
+
+def acquire(db, sha: str) -> dict | None:
+    """Take a reference on a stored blob and return its meta; None if not stored."""
+    n = (db.query(TemplateBlob).filter(TemplateBlob.sha256 == sha)
+         .update({TemplateBlob.refcount: TemplateBlob.refcount + 1, TemplateBlob.released_at: None},
+                 synchronize_session=False))
+    meta = read_meta(sha) if n else None
+    if n and meta is None:
+        # Row without files (e.g. data/ wiped): forget it and re-ingest
+        db.query(TemplateBlob).filter(TemplateBlob.sha256 == sha).delete(synchronize_session=False)
+        discard_blob(blob_dir(sha))
+    db.commit()
+    return meta
+
+def register(db, sha: str, size: int):
+    """Record a freshly written blob with one reference."""
+    db.add(TemplateBlob(sha256=sha, size=size, refcount=1))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Same template registered concurrently: just take a reference
+        db.rollback()
+        acquire(db, sha)
+
+def release(db, sha: str | None):
+    if not sha:
+        return
+    db.query(TemplateBlob).filter(TemplateBlob.sha256 == sha).update(
+        {TemplateBlob.refcount: TemplateBlob.refcount - 1, TemplateBlob.released_at: datetime.utcnow()},
+        synchronize_session=False)
+    db.commit()
+
+def collect_garbage(db, grace: timedelta = GC_GRACE) -> list[str]:
+    """Delete blobs nobody references anymore (after the grace period). Returns their hashes."""
+    cutoff = datetime.utcnow() - grace
+    candidates = [b.sha256 for b in db.query(TemplateBlob).filter(
+        TemplateBlob.refcount <= 0, TemplateBlob.released_at <= cutoff).all()]
+    dead = []
+    for sha in candidates:
+        # Row first: a concurrent acquire() that loses the race re-ingests instead
+        n = db.query(TemplateBlob).filter(TemplateBlob.sha256 == sha, TemplateBlob.refcount <= 0).delete(
+            synchronize_session=False)
+        db.commit()
+        if n:
+            shutil.rmtree(blob_dir(sha), ignore_errors=True)
+            dead.append(sha)
+    return dead
@@ -0,0 +1,143 @@
+# backend/cache.py
+import asyncio, logging, threading, time
+from collections import OrderedDict
+import metrics
+
+log = logging.getLogger("lexsy")
+
+class LRUCache:
+    """
+    Small thread-safe LRU with optional size budget (bytes) and TTL (seconds).
+    Used for compiled templates and materialized downloads.
+    """
+    def __init__(self, max_items: int = 256, max_bytes: int | None = None, ttl: float | None = None):
+        self.max_items, self.max_bytes, self.ttl = max_items, max_bytes, ttl
+        self._data = OrderedDict()   # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (item[2] is not None and item[2] < time.monotonic()):
+                if item is not None:
+                    self._drop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value, size: int = 0):
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            self._data[key] = (value, size, expires)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_items
+                                  or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self._drop(next(iter(self._data)))
+
+    def _drop(self, key):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"items": len(self._data), "bytes": self._bytes, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls by key: the first caller starts fn(), later callers
+    await the same task. The task is cancelled only once every waiter has gone away.
+    """
+    def __init__(self):
+        self._flights = {}   # key -> [task, waiters]
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        flight = self._flights.get(key)
+        if flight is None or flight[0].done() or flight[0].cancelling():
+            flight = self._flights[key] = [asyncio.ensure_future(fn()), 0]
+            flight[0].add_done_callback(lambda _: self._flights.pop(key, None) if self._flights.get(key) is flight else None)
+        else:
+            self.coalesced += 1
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not flight[0].done():
+                flight[0].cancel()
+
+class WriteBehind:
+    """
+    Debounced per-key background jobs. mark(key) records that key changed and runs
+    job(key) once no further mark has arrived for `delay` seconds; marks landing while
+    the job runs trigger one more run. flush(key) skips the wait and returns once the
+    latest state has been processed. State is per event loop: a mark left behind by a
+    loop that has gone away is run inline by the next flush.
+    """
+    def __init__(self, job, delay: float):
+        self.job, self.delay = job, delay
+        self._pending = {}   # key -> {"loop", "timer", "task", "dirty"}
+        self.marks = self.runs = self.errors = 0
+
+    def mark(self, key):
+        loop = asyncio.get_running_loop()
+        st = self._pending.get(key)
+        if st is None or st["loop"] is not loop:
+            st = self._pending[key] = {"loop": loop, "timer": None, "task": None, "dirty": False}
+        st["dirty"] = True
+        self.marks += 1
+        if st["task"] is None:
+            if st["timer"]:
+                st["timer"].cancel()
+            st["timer"] = loop.call_later(self.delay, self._start, key, st)
+
+    def pending(self, key) -> bool:
+        return key in self._pending
+
+    async def flush_all(self):
+        for key in list(self._pending):
+            await self.flush(key)
+
+    async def flush(self, key):
+        st = self._pending.get(key)
+        if st is None:
+            return
+        if st["loop"] is not asyncio.get_running_loop():
+            if self._pending.pop(key, None) is st and st["dirty"]:
+                self.runs += 1
+                await self.job(key)
+            return
+        if st["timer"]:
+            st["timer"].cancel()
+        if st["task"] is None:
+            self._start(key, st)
+        await asyncio.shield(st["task"])
+
+    def _start(self, key, st):
+        st["timer"] = None
+        st["task"] = st["loop"].create_task(self._drain(key, st))
+
+    async def _drain(self, key, st):
+        try:
+            while st["dirty"]:
+                st["dirty"] = False
+                self.runs += 1
+                try:
+                    await self.job(key)
+                except Exception:
+                    self.errors += 1
+                    metrics.WRITE_BEHIND_ERRORS.inc()
+                    log.exception("write-behind job failed for %s", key)
+        finally:
+            st["task"] = None
+            if self._pending.get(key) is st and not st["dirty"]:
+                del self._pending[key]
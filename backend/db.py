@@ -1,13 +1,85 @@
 # backend/db.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import os, time
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+import metrics
 
-# SQLite for speed; swap to Postgres later if desired
-DATABASE_URL = "sqlite:///./app.db"
+# SQLite by default; any SQLAlchemy URL works (e.g. postgresql+psycopg://user:pw@host/lexsy)
+DATABASE_URL = os.getenv("LEXSY_DATABASE_URL", "sqlite:///./app.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # needed for SQLite in single process
-)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+POOL_SIZE = int(os.getenv("LEXSY_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("LEXSY_DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.getenv("LEXSY_DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("LEXSY_DB_POOL_RECYCLE", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("LEXSY_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_BYTES = int(os.getenv("LEXSY_SQLITE_MMAP_BYTES", str(256 << 20)))
+
+def _sqlite_pragmas(dbapi_conn, _record):
+    """WAL lets readers run alongside the single writer; NORMAL fsyncs only at checkpoints."""
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cur.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.close()
+
+def _before_execute(conn, cursor, statement, params, context, executemany):
+    context._lexsy_t0 = time.perf_counter()
+
+def _after_execute(conn, cursor, statement, params, context, executemany):
+    metrics.record("db_query", time.perf_counter() - context._lexsy_t0)
+
+class TimedSession(Session):
+    """Session whose commits show up as the db_commit stage."""
+    def commit(self):
+        with metrics.stage("db_commit"):
+            super().commit()
+
+def make_engine(url: str = DATABASE_URL, **kw):
+    """
+    Engine with pool sizing from LEXSY_DB_* env vars. File-backed SQLite connections get
+    the WAL / busy_timeout / mmap pragmas; other backends get pre-ping and recycling.
+    """
+    opts = {"pool_size": POOL_SIZE, "max_overflow": MAX_OVERFLOW, "pool_timeout": POOL_TIMEOUT}
+    if url.startswith("sqlite"):
+        memory = url in ("sqlite://", "sqlite:///:memory:")
+        engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+                               **({} if memory else opts), **kw)
+        if not memory:
+            event.listen(engine, "connect", _sqlite_pragmas)
+    else:
+        engine = create_engine(url, pool_pre_ping=True, pool_recycle=POOL_RECYCLE, **opts, **kw)
+    if metrics.ENABLED:
+        event.listen(engine, "before_cursor_execute", _before_execute)
+        event.listen(engine, "after_cursor_execute", _after_execute)
+    return engine
+
+engine = make_engine()
+SessionLocal = sessionmaker(bind=engine, class_=TimedSession if metrics.ENABLED else Session,
+                            autoflush=False, autocommit=False)
 Base = declarative_base()
+
+def get_db():
+    """Request-scoped session for FastAPI `Depends`; closed (connection back to the pool) after the request."""
+    db = SessionLocal()
+    try: yield db
+    finally: db.close()
+
+def migrate(bind=None):
+    """
+    Upgrade the schema to the latest Alembic revision (migrations/). Databases created by
+    create_all before migrations existed are stamped at the baseline first. Serialized
+    across processes, so several uvicorn workers can start at once.
+    """
+    from alembic import command
+    from alembic.config import Config
+    here = os.path.dirname(os.path.abspath(__file__))
+    cfg = Config(os.path.join(here, "alembic.ini"))
+    from session_lock import file_lock
+    with file_lock("migrate", timeout=120), (bind or engine).begin() as conn:   # workers start together
+        cfg.attributes["connection"] = conn
+        names = inspect(conn).get_table_names()
+        if "sessions" in names and "alembic_version" not in names:
+            command.stamp(cfg, "0001")
+        command.upgrade(cfg, "head")
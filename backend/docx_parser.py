@@ -1,7 +1,12 @@
 # backend/docx_parser.py
-import re
+import os, re
+from bisect import bisect_right
 from collections import defaultdict
 from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from placeholder_engine import compile_replacer
+from metrics import stage, timed
 
 # Patterns
 BRACKETED_GENERIC = re.compile(r"\[\s*_{2,}\s*\]")                   # [_________]
@@ -15,31 +20,61 @@ INVESTOR_HINT_TOKENS = ["investor", "purchaser", "buyer", "lender", "holder"]
 
 QUOTE_PAT  = re.compile(r"[“\"]([^”\"]+)[”\"]")   # capture last quoted phrase “like this” or "like this"
 
-def _titleish_phrases_around(text_before: str, text_after: str) -> str | None:
+_HINT_TOKENS = MONEY_HINT_TOKENS + DATE_HINT_TOKENS + COMPANY_HINT_TOKENS + INVESTOR_HINT_TOKENS
+_BRACKETISH = re.compile(r"[\[\]\(\)\$]+")
+_SENTENCE_SPLIT = re.compile(r"[.;:\n]")
+
+def _usable_phrase(phrase: str) -> bool:
+    return 2 <= len(phrase) <= 60 and not any(ch in phrase for ch in "[]")
+
+class _LabelContext:
     """
-    Try to find a meaningful label near the placeholder.
-    Priority:
-      1) Last quoted phrase before (e.g., “Purchase Amount”)
-      2) Capitalized phrase nearby that contains key tokens
-      3) Quoted or capitalized phrase right after
+    One forward pass over a paragraph: where its usable quoted phrases end. Each blank is
+    then labeled from bounded windows around it instead of re-scanning the whole prefix.
     """
-    # Clean weird trailing punctuation
-    text_before = re.sub(r"[\$\(\)\[\]]+$", "", text_before.strip())
-
-    # 1️⃣ Last quoted phrase before placeholder
-    for m in reversed(list(QUOTE_PAT.finditer(text_before))):
-        phrase = m.group(1).strip()
-        if 2 <= len(phrase) <= 60 and not any(ch in phrase for ch in "[]"):
-            return phrase
-
-    # 2️⃣ Capitalized or key-token phrase before
-    tail = text_before[-160:]  # widen context
-    tail = re.sub(r"[\[\]\(\)\$]+", "", tail)
-    chunks = re.split(r"[.;:\n]", tail)
-    if chunks:
-        cand = chunks[-1].strip()
+    def __init__(self, text: str):
+        self.text = text
+        self.lead = len(text) - len(text.lstrip())
+        self.quote_ends, self.quotes = [], []
+        for m in QUOTE_PAT.finditer(text):
+            phrase = m.group(1).strip()
+            if _usable_phrase(phrase):
+                self.quote_ends.append(m.end())
+                self.quotes.append(phrase)
+
+    def before(self, a: int) -> tuple[int, int]:
+        """Bounds of text[:a] once stripped and cleaned of trailing $()[]."""
+        text, lo, hi = self.text, self.lead, a
+        while hi > lo and text[hi - 1].isspace():
+            hi -= 1
+        while hi > lo and text[hi - 1] in "$()[]":
+            hi -= 1
+        return lo, hi
+
+    def label(self, a: int, b: int, prev: "_LabelContext | None" = None) -> str | None:
+        """
+        Label for the blank at text[a:b]. Priority:
+          1) Last quoted phrase before (e.g., “Purchase Amount”)
+          2) Phrase in the sentence before that contains key tokens
+          3) Quoted phrase right after
+          4) Money/date token nearby
+        `prev` (the previous paragraph) stands in for the text before a blank that starts
+        the paragraph.
+        """
+        ctx, (lo, hi) = self, self.before(a)
+        if lo == hi and prev is not None:
+            ctx, (lo, hi) = prev, prev.before(len(prev.text))
+
+        # 1️⃣ Last quoted phrase before placeholder (matches ending before hi)
+        i = bisect_right(ctx.quote_ends, hi) - 1
+        if i >= 0:
+            return ctx.quotes[i]
+
+        # 2️⃣ Key-token phrase in the last sentence chunk before
+        tail = _BRACKETISH.sub("", ctx.text[max(lo, hi - 160):hi])
+        cand = _SENTENCE_SPLIT.split(tail)[-1].strip()
         l = cand.lower()
-        if any(t in l for t in MONEY_HINT_TOKENS + DATE_HINT_TOKENS + COMPANY_HINT_TOKENS + INVESTOR_HINT_TOKENS):
+        if any(t in l for t in _HINT_TOKENS):
             cand = re.sub(r"\s+", " ", cand).strip(" -:")
             # Normalize casing
             words = cand.split()
@@ -49,30 +84,32 @@ def _titleish_phrases_around(text_before: str, text_after: str) -> str | None:
                 cand = words[0].capitalize()
             return cand
 
-    # 3️⃣ Check for label right after
-    head = text_after[:120]
-    head = re.sub(r"[\[\]\(\)\$]+", "", head)
-    for qm in QUOTE_PAT.finditer(head):
-        phrase = qm.group(1).strip()
-        if 2 <= len(phrase) <= 60 and not any(ch in phrase for ch in "[]"):
-            return phrase
+        # 3️⃣ Check for label right after
+        head = _BRACKETISH.sub("", self.text[b:b + 120])
+        for qm in QUOTE_PAT.finditer(head):
+            phrase = qm.group(1).strip()
+            if _usable_phrase(phrase):
+                return phrase
 
-    # 4️⃣ If pattern like “the Purchase Amount” appears nearby
-    combo = (text_before[-200:] + text_after[:200]).lower()
-    for token in MONEY_HINT_TOKENS + DATE_HINT_TOKENS:
-        if token in combo:
-            return token.title()
+        # 4️⃣ If pattern like “the Purchase Amount” appears nearby
+        combo = (ctx.text[max(lo, hi - 200):hi] + self.text[b:b + 200]).lower()
+        for token in MONEY_HINT_TOKENS + DATE_HINT_TOKENS:
+            if token in combo:
+                return token.title()
 
-    return None
+        return None
 
-def _rename_generic_placeholder_in_text(text: str) -> tuple[str, list[str]]:
+def placeholder_spans(text: str, prev_text: str | None = None) -> list[tuple[int, int, str]]:
     """
-    Replace generic [____] placeholders with context-based names when possible, otherwise enumerate.
-    Returns (new_text, keys_found)
+    All placeholders in a paragraph as (start, end, key), in order. Named placeholders keep
+    their text as key; generic [____] ones get a context-based name, otherwise enumerated.
+    prev_text (the preceding paragraph) labels blanks that start the paragraph, e.g. a
+    "Purchase Amount:" line above "[_____]"; it is ignored if it holds placeholders itself.
     """
-    keys = []
-    out = []
-    i = 0
+    spans = []
+    ctx, prev = _LabelContext(text), None
+    if prev_text and not BRACKETED_NAMED.search(prev_text):
+        prev = _LabelContext(prev_text.rstrip().rstrip(":"))
     dup_counts = defaultdict(int)
 
     # Find all matches (both named and generic) with spans
@@ -88,23 +125,15 @@ def _rename_generic_placeholder_in_text(text: str) -> tuple[str, list[str]]:
 
     matches.sort(key=lambda t: t[1][0])
 
-    last = 0
     for kind, (a, b) in matches:
-        # Append text before match
-        before = text[last:a]
-        frag = text[a:b]
-        last = b
-
         if kind == "NAM":
             # Already-named placeholder; keep as-is
-            out.append(before)
-            out.append(frag)
-            keys.append(frag)
+            spans.append((a, b, text[a:b]))
             continue
 
         # kind == GEN
         # Find a label near the placeholder
-        label = _titleish_phrases_around(text[:a], text[b:])
+        label = ctx.label(a, b, prev)
         if label:
             key = f"[{label}]"
         else:
@@ -114,15 +143,28 @@ def _rename_generic_placeholder_in_text(text: str) -> tuple[str, list[str]]:
         dup_counts[key] += 1
         if dup_counts[key] > 1:
             key = f"{key}#{dup_counts[key]}"
+        spans.append((a, b, key))
+    return spans
 
-        out.append(before)
+def _rename_generic_placeholder_in_text(text: str, prev_text: str | None = None) -> tuple[str, list[str]]:
+    """
+    Replace generic [____] placeholders with context-based names when possible, otherwise enumerate.
+    Returns (new_text, keys_found)
+    """
+    keys = []
+    out = []
+    last = 0
+    for a, b, key in placeholder_spans(text, prev_text):
+        out.append(text[last:a])
         out.append(key)
         keys.append(key)
+        last = b
 
     # trailing text
     out.append(text[last:])
     return "".join(out), keys
 
+@timed("find_placeholders")
 def find_placeholders(docx_path: str) -> list[str]:
     """
     Load DOCX, rename generic placeholders to semantic keys when possible by
@@ -130,6 +172,23 @@ def find_placeholders(docx_path: str) -> list[str]:
     Save the modified doc back to docx_path, and return unique placeholder keys in reading order.
     """
     doc = Document(docx_path)
+    unique = rename_placeholders(doc)
+
+    # Save patched doc (so fill_placeholders can replace by new keys)
+    with stage("docx_save"):
+        doc.save(docx_path)
+    return unique
+
+def _previous_text(p) -> str | None:
+    """Text of the paragraph right before p in the same container (body or cell), if any."""
+    prev = p._p.getprevious()
+    return Paragraph(prev, p._parent).text if prev is not None and prev.tag == qn("w:p") else None
+
+def rename_placeholders(doc) -> list[str]:
+    """
+    In-memory half of find_placeholders: rename generic placeholders on an already
+    loaded python-docx Document and return unique keys in reading order.
+    """
     found_keys = []
 
     # We will rebuild paragraph text (formatting may be slightly simplified).
@@ -137,7 +196,7 @@ def find_placeholders(docx_path: str) -> list[str]:
         text = p.text
         if "[" not in text or "]" not in text:
             continue
-        new_text, keys = _rename_generic_placeholder_in_text(text)
+        new_text, keys = _rename_generic_placeholder_in_text(text, _previous_text(p))
         if keys:
             # replace paragraph runs with single run
             p.clear()
@@ -152,15 +211,12 @@ def find_placeholders(docx_path: str) -> list[str]:
                     text = p.text
                     if "[" not in text or "]" not in text:
                         continue
-                    new_text, keys = _rename_generic_placeholder_in_text(text)
+                    new_text, keys = _rename_generic_placeholder_in_text(text, _previous_text(p))
                     if keys:
                         p.clear()
                         p.add_run(new_text)
                         found_keys.extend(keys)
 
-    # Save patched doc (so fill_placeholders can replace by new keys)
-    doc.save(docx_path)
-
     # Return unique keys in order of first appearance
     unique = []
     seen = set()
@@ -170,17 +226,14 @@ def find_placeholders(docx_path: str) -> list[str]:
             unique.append(k)
     return unique
 
+@timed("fill_placeholders")
 def fill_placeholders(original_docx_path: str, working_docx_path: str, mapping: dict[str, str]):
     """
     Simple text replace in the working docx for each [Key] -> value.
     We operate on the working copy in paragraphs + tables.
     """
     doc = Document(working_docx_path)
-
-    def apply_on_text(t: str) -> str:
-        for k, v in mapping.items():
-            t = t.replace(k, str(v))
-        return t
+    apply_on_text = compile_replacer(mapping)  # built once, one scan per paragraph
 
     for p in doc.paragraphs:
         txt = p.text
@@ -197,4 +250,8 @@ def fill_placeholders(original_docx_path: str, working_docx_path: str, mapping:
                         p.clear()
                         p.add_run(apply_on_text(txt))
 
-    doc.save(working_docx_path)
+    # temp file + rename: a concurrent reader (download) never sees a half-written copy
+    tmp = f"{working_docx_path}.{os.getpid()}.tmp"
+    with stage("docx_save"):
+        doc.save(tmp)
+    os.replace(tmp, working_docx_path)
@@ -0,0 +1,80 @@
+# backend/docx_zip.py
+"""
+Zip-level DOCX rewriting: regenerate only the parts that changed (normally
+word/document.xml) and copy every other entry (images, fonts, styles.xml, ...) as its
+already-compressed bytes, with no inflate/deflate round trip.
+"""
+import io, posixpath, re, struct, zipfile, zlib
+
+_LOCAL = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+_END = struct.Struct("<4s4H2LH")
+_DESCRIPTOR_FLAG = 0x08
+_UTF8_FLAG = 0x800
+_OFFICE_DOC = re.compile(rb'<Relationship[^>]*Type="[^"]*/officeDocument"[^>]*Target="([^"]+)"'
+                         rb'|<Relationship[^>]*Target="([^"]+)"[^>]*Type="[^"]*/officeDocument"')
+
+def _open(src) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(src) if isinstance(src, (bytes, bytearray)) else src)
+
+def main_part_name(src) -> str:
+    """Name of the main document part (word/document.xml unless _rels/.rels says otherwise)."""
+    with _open(src) as zf:
+        return main_part_from_rels(zf.read("_rels/.rels"))
+
+def main_part_from_rels(rels: bytes) -> str:
+    m = _OFFICE_DOC.search(rels)
+    return posixpath.normpath((m.group(1) or m.group(2)).decode().lstrip("/")) if m else "word/document.xml"
+
+def read_part(src, name: str) -> bytes:
+    with _open(src) as zf:
+        return zf.read(name)
+
+def _dos_datetime(dt) -> tuple[int, int]:
+    y, mo, d, h, mi, s = dt
+    return (h << 11) | (mi << 5) | (s // 2), ((y - 1980) << 9) | (mo << 5) | d
+
+def rewrite_parts(src, replacements: dict[str, bytes]) -> bytes:
+    """
+    New package bytes where each name in `replacements` gets the given content (deflated)
+    and every other entry is copied raw from `src` (a path or bytes). Entry order,
+    timestamps and attributes are preserved.
+    """
+    out = io.BytesIO()
+    central = []
+    raw = src if isinstance(src, (bytes, bytearray)) else open(src, "rb").read()
+    with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+        infos = zf.infolist()
+    if len(infos) >= 0xFFFF or len(raw) >= 0xFFFFFFFF:
+        raise ValueError("ZIP64 packages are not supported")
+
+    for info in infos:
+        name = info.filename.encode("utf-8")
+        flags = (info.flag_bits & ~_DESCRIPTOR_FLAG) | (_UTF8_FLAG if not name.isascii() else 0)
+        if info.filename in replacements:
+            content = replacements[info.filename]
+            c = zlib.compressobj(6, zlib.DEFLATED, -15)
+            data = c.compress(content) + c.flush()
+            method, crc, usize = zipfile.ZIP_DEFLATED, zlib.crc32(content), len(content)
+        else:
+            # Raw copy: skip the source local header, take the compressed bytes as-is
+            *_, name_len, extra_len = _LOCAL.unpack_from(raw, info.header_offset)
+            start = info.header_offset + _LOCAL.size + name_len + extra_len
+            data = raw[start:start + info.compress_size]
+            method, crc, usize = info.compress_type, info.CRC, info.file_size
+        t, d = _dos_datetime(info.date_time)
+        offset = out.tell()
+        out.write(_LOCAL.pack(b"PK\x03\x04", info.extract_version, info.reserved, flags, method, t, d,
+                              crc, len(data), usize, len(name), 0))
+        out.write(name)
+        out.write(data)
+        central.append(_CENTRAL.pack(b"PK\x01\x02", info.create_version, info.create_system,
+                                     info.extract_version, info.reserved, flags, method, t, d, crc, len(data),
+                                     usize, len(name), 0, len(info.comment), 0, info.internal_attr,
+                                     info.external_attr, offset) + name + info.comment)
+
+    cd_offset = out.tell()
+    for entry in central:
+        out.write(entry)
+    out.write(_END.pack(b"PK\x05\x06", 0, 0, len(central), len(central), out.tell() - cd_offset, cd_offset, 0))
+    return out.getvalue()
@@ -0,0 +1,246 @@
+# backend/extraction.py
+"""
+Deterministic value extraction for /api/chat, run before (and often instead of) the LLM.
+
+- Module-level precompiled patterns; normalize_money / normalize_date_phrase are the
+  polishers the chat path applies to model output as well.
+- tokenize() finds money, dates, company names and person names in one regex pass.
+- extract() maps tokens and explicit `[Key]: value` pairs onto pending placeholders.
+  It reports `ambiguous` whenever the message holds something it could not place
+  (unassigned values, ties between same-typed keys, unknown capitalized words or
+  digits, a mentioned key left empty); the caller then asks the LLM.
+- extract_json_object() pulls the first JSON object out of a model reply, recovering
+  the completed pairs of a truncated one.
+"""
+import json, re
+from collections import namedtuple
+from datetime import date
+
+from json_stream import ObjectStream
+
+MONTHS = {
+    "jan": "January", "feb": "February", "mar": "March", "apr": "April", "may": "May", "jun": "June",
+    "jul": "July", "aug": "August", "sep": "September", "oct": "October", "nov": "November", "dec": "December"
+}
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+_ORD = r"(?:st|nd|rd|th)?"
+_SCALE = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9, "billion": 1e9}
+_SCALE_PAT = r"(?:k|mm|m|bn|b|thousand|million|billion)"
+
+# ---------- normalization ----------
+MONEY_TRAILING_DOLLAR = re.compile(r"^(\d[\d,\.]*)\s*\$$")
+MONEY_CORE = re.compile(rf"(\d[\d,\.]*)(?:\s*({_SCALE_PAT})\b)?", re.I)
+DATE_DAY_MONTH = re.compile(rf"(\d{{1,2}}){_ORD}\s+(?:of\s+)?({_MONTH})\b\.?(?:,?\s+(\d{{4}}))?")
+DATE_MONTH_DAY = re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}}){_ORD}\b(?:,?\s+(\d{{4}}))?")
+DATE_ISO = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+DATE_NUMERIC = re.compile(r"\b(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?\b")
+
+def normalize_money(raw: str) -> str:
+    """"4000 $", "$4,000", "4k", "10 million" -> "$4,000" / "$10,000,000" (unparseable input is returned as-is)."""
+    s = MONEY_TRAILING_DOLLAR.sub(r"$\1", raw.strip())
+    m = MONEY_CORE.search(s)
+    if not m:
+        return raw
+    try:
+        val = float(m.group(1).replace(",", "")) * _SCALE.get((m.group(2) or "").lower(), 1)
+        return f"${val:,.0f}" if val.is_integer() else f"${val:,.2f}"
+    except ValueError:
+        return f"${m.group(1)}"
+
+def normalize_date_phrase(text: str, today: date | None = None) -> str:
+    """Month D, YYYY for "1 jan", "March 3, 2025", "2025-03-01", "1/2" ...; honors this/last/next year."""
+    t = text.lower().strip()
+    year = (today or date.today()).year
+    if "last year" in t:
+        year -= 1
+        t = t.replace("last year", "")
+    elif "next year" in t:
+        year += 1
+        t = t.replace("next year", "")
+    else:
+        t = t.replace("this year", "").replace("current year", "")
+
+    m = DATE_DAY_MONTH.search(t)
+    if m:
+        return f"{MONTHS[m.group(2)[:3]]} {int(m.group(1))}, {m.group(3) or year}"
+    m = DATE_MONTH_DAY.search(t)
+    if m:
+        return f"{MONTHS[m.group(1)[:3]]} {int(m.group(2))}, {m.group(3) or year}"
+    m = DATE_ISO.search(t)
+    if m and 1 <= int(m.group(2)) <= 12:
+        return f"{list(MONTHS.values())[int(m.group(2)) - 1]} {int(m.group(3))}, {m.group(1)}"
+    m = DATE_NUMERIC.search(t)
+    if m:
+        m1, d1, y = int(m.group(1)), int(m.group(2)), m.group(3)
+        y = int(y) if y else year
+        if y < 100:
+            y += 2000
+        month_name = list(MONTHS.values())[m1 - 1] if 1 <= m1 <= 12 else "January"
+        return f"{month_name} {d1}, {y}"
+    return text
+
+def polish(kind: str, value: str) -> str:
+    """Type-specific formatting, matching what the LLM is asked to produce."""
+    value = value.strip().rstrip(",;").strip()
+    if kind == "COMPANY":
+        return value.upper()   # keeps "INC."
+    value = value.rstrip(".").strip()
+    if kind == "MONEY":
+        return normalize_money(value)
+    if kind == "DATE":
+        return normalize_date_phrase(value)
+    if kind == "PERSON":
+        return " ".join(w[:1].upper() + w[1:] for w in value.split())
+    return value
+
+# ---------- tokenizer ----------
+Token = namedtuple("Token", "kind text start end")
+
+TOKEN_RE = re.compile(
+    rf"(?P<DATE>(?i:\b{_MONTH}\.?\s+\d{{1,2}}{_ORD}\b|\b\d{{1,2}}{_ORD}\s+(?:of\s+)?{_MONTH}\b\.?)"
+    rf"(?i:,?\s+\d{{4}}\b|,?\s+(?:of\s+)?(?:this|last|next|current)\s+year\b)?"
+    r"|\b\d{4}-\d{1,2}-\d{1,2}\b|\b\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?\b)"
+    rf"|(?P<MONEY>(?i:(?:\$|\busd)\s*\d[\d,]*(?:\.\d+)?(?:\s*{_SCALE_PAT}\b)?"
+    rf"|\b\d[\d,]*(?:\.\d+)?\s*(?:{_SCALE_PAT}\s*)?(?:\$|usd\b|dollars?\b)"
+    rf"|\b\d[\d,]*(?:\.\d+)?\s*{_SCALE_PAT}\b))"
+    r"|(?P<COMPANY>\b(?:[A-Z][\w&'-]*\.?\s+){0,5}[A-Z][\w&'-]*,?\s+"
+    r"(?:Inc|LLC|L\.L\.C|Ltd|Limited|Corp|Corporation|Co|PLC|GmbH|LP|L\.P)\b\.?)"
+    r"|(?P<PERSON>\b[A-Z][a-z'’-]+(?:\s+[A-Z]\.)?(?:\s+[A-Z][a-z'’-]+){1,3}\b)"
+    r"|(?P<NUMBER>\b\d[\d,]*(?:\.\d+)?\b)"
+)
+_WORD = re.compile(r"[a-z0-9]+")
+_CAP_WORD = re.compile(r"\b[A-Z][\w&'’-]*")
+_DIGIT = re.compile(r"\d")
+_NONSPACE = re.compile(r"\S+")
+# Capitalized words that are not values by themselves
+_COMMON = {"the", "a", "an", "my", "our", "his", "her", "their", "its", "it", "i", "we", "you", "he", "she", "they",
+           "and", "or", "also", "please", "set", "use", "put", "fill", "make", "is", "are", "was", "be", "as", "of",
+           "for", "to", "in", "on", "at", "by", "with", "that", "this", "these", "those", "yes", "no", "ok", "okay",
+           "thanks", "thank", "hi", "hello", "dear", "mr", "mrs", "ms", "dr", "name", "date", "amount", "value",
+           "company", "investor", "purchaser", "buyer", "holder", "lender", "signer", "signatory", "title", "safe",
+           "agreement", "price", "purchase", "cap", "valuation", "state", "address", "effective", "closing", "usd"}
+_FILLER_KEY_WORDS = {"of", "the", "a", "an", "and", "blank"}
+_GENERIC_KEY_WORDS = _FILLER_KEY_WORDS | {"name", "date", "amount", "value"}
+_FITS = {"MONEY": ("MONEY",), "NUMBER": ("MONEY",), "DATE": ("DATE",), "COMPANY": ("COMPANY",), "PERSON": ("PERSON",)}
+LABELED = re.compile(r"\[([^\[\]\n]+)\](#\d+)?\s*(?::|=|\bis\b)\s*([^\n;]+)")
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+def tokenize(message: str) -> list[Token]:
+    """Money / date / company / person / bare-number tokens, in one left-to-right pass."""
+    out = []
+    for m in TOKEN_RE.finditer(message):
+        kind, text, start = m.lastgroup, m.group(), m.start()
+        if kind == "PERSON":
+            # Trim leading/trailing common words ("My Investor Jane Doe" -> "Jane Doe")
+            words = list(_NONSPACE.finditer(text))
+            while words and words[0].group().lower().strip("'’") in _COMMON:
+                words.pop(0)
+            while words and words[-1].group().lower().strip("'’") in _COMMON:
+                words.pop()
+            if len(words) < 2:
+                continue
+            start, text = m.start() + words[0].start(), text[words[0].start():words[-1].end()]
+        out.append(Token(kind, text, start, start + len(text)))
+    return out
+
+# ---------- assignment ----------
+Extraction = namedtuple("Extraction", "values ambiguous")
+
+def extract(message: str, pending_list: list[dict]) -> Extraction:
+    """
+    Values for pending placeholders ({"key", "type", ...}) found in the message, and
+    whether anything in it was left unexplained (then the LLM should decide).
+    """
+    types = {p["key"]: p["type"] for p in pending_list}
+    key_words = {k: _words(k) - _FILLER_KEY_WORDS for k in types}
+    distinct = {k: w - _GENERIC_KEY_WORDS or w for k, w in key_words.items()}
+    vocabulary = set().union(*key_words.values()) if key_words else set()
+    values, ambiguous, covered = {}, False, []
+
+    for m in LABELED.finditer(message):
+        key = f"[{m.group(1).strip()}]{m.group(2) or ''}"
+        if key in types:
+            values[key] = polish(types[key], m.group(3))
+            covered.append(m.span())
+
+    prev_end = 0
+    for tok in tokenize(message):
+        if any(a <= tok.start < b for a, b in covered):
+            continue
+        covered.append((tok.start, tok.end))
+        window = _words(message[max(prev_end, tok.start - 60):tok.start])
+        prev_end = tok.end
+        fits = [k for k, t in types.items() if t in _FITS[tok.kind] and k not in values]
+        scores = {k: len(key_words[k] & window) for k in fits}
+        best = max(scores.values(), default=0)
+        top = [k for k in fits if scores[k] == best]
+        if best == 0 and tok.kind == "NUMBER":
+            ambiguous = ambiguous or bool(fits)   # a bare number only counts when labeled
+            continue
+        if len(top) != 1:
+            ambiguous = True
+            continue
+        values[top[0]] = polish(types[top[0]], tok.text)
+
+    # Anything value-like the tokens didn't account for?
+    rest = list(message)
+    for a, b in covered:
+        rest[a:b] = " " * (b - a)
+    rest = "".join(rest)
+    if _DIGIT.search(rest):
+        ambiguous = True
+    for w in _CAP_WORD.findall(rest):
+        lw = w.lower().strip("'’")
+        if lw not in _COMMON and lw not in vocabulary:
+            ambiguous = True
+            break
+    # A placeholder the message talks about but we could not fill
+    msg_words = _words(rest)
+    if any(k not in values and distinct[k] & msg_words for k in types):
+        ambiguous = True
+    return Extraction(values, ambiguous or not values)
+
+# ---------- legacy regex fallbacks (used when the LLM returned nothing) ----------
+FALLBACK_MONEY = re.compile(r"(\$\s*\d[\d,\.]*|\d[\d,\.]*\s*\$|\b\d[\d,\.]*\b)")
+_MONEY_KEY_TOKENS = ["purchase", "price", "amount", "consideration", "principal", "cap", "valuation"]
+
+def fallback_values(message: str, pending_list: list[dict]) -> dict:
+    """First number for the most money-like pending key, date phrase for the first pending date key."""
+    found = {}
+    money = [p for p in pending_list if p["type"] == "MONEY"]
+    m = FALLBACK_MONEY.search(message) if money else None
+    if m:
+        def score(p):
+            lk, hk = p["key"].lower(), p["hint"].lower()
+            return sum(t in lk for t in _MONEY_KEY_TOKENS) + sum(t in hk for t in _MONEY_KEY_TOKENS)
+        found[max(money, key=score)["key"]] = normalize_money(m.group(1))
+    dates = [p for p in pending_list if p["type"] == "DATE"]
+    if dates:
+        out = normalize_date_phrase(message)
+        if out != message:
+            found[dates[0]["key"]] = out
+    return found
+
+# ---------- model output ----------
+_DECODER = json.JSONDecoder()
+
+def extract_json_object(text: str) -> dict:
+    """First JSON object in a model reply (bare, in prose or ``` fences); completed pairs if truncated."""
+    try:
+        obj = json.loads(text)
+        return obj if isinstance(obj, dict) else {}
+    except ValueError:
+        pass
+    i = text.find("{")
+    if i == -1:
+        return {}
+    try:
+        obj, _ = _DECODER.raw_decode(text, i)
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+    return dict(ObjectStream().feed(text[i:]))
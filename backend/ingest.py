@@ -0,0 +1,70 @@
+# backend/ingest.py
+import hashlib, io, time
+from contextlib import contextmanager
+from collections import Counter
+from ooxml_engine import compile_parts, load_parts, preview_keys, rename_parts, save_parts
+from render_service import compile_preview, docx_to_html, render_preview_slots
+from template_index import index_path_for, save_index
+import metrics
+
+CHUNK = 1 << 16
+
+@contextmanager
+def _stage(timings: dict, name: str):
+    t0 = time.perf_counter()
+    try: yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        timings[name] = round(elapsed * 1000, 2)
+        if metrics.ENABLED: metrics.record(f"ingest_{name}", elapsed)
+
+def attach_preview(index: dict, preview: dict) -> dict:
+    # Only trust the slots if they line up with the fillable occurrences in the rendered parts
+    if Counter(preview["slots"]) == preview_keys(index):
+        index["preview"] = preview
+    return index
+
+def ingest_upload(source, original_path: str, working_path: str, sha256: str | None = None) -> dict:
+    """
+    One-parse upload pipeline over the upload's bytes, or a binary file object:
+      read   – write the original copy; a file object is streamed once, hashed as it is
+               read (bytes come with the sha256 their reader computed the same way)
+      parse  – parse each story part's XML a single time (ooxml_engine, no python-docx)
+      scan   – rename generic placeholders and collect keys on those trees
+      index  – compile the template index on the same trees
+      save   – zip-rewrite only the modified parts into the working copy
+      preview– mammoth on the in-memory working bytes, cut into slots
+    Returns keys, the compiled index, the initial HTML preview, the sha256 of the upload
+    and per-stage timings (ms).
+    """
+    timings = {}
+    with _stage(timings, "read"):
+        with open(original_path, "wb") as f:
+            if isinstance(source, (bytes, bytearray)):
+                raw = source
+                f.write(raw)
+            else:
+                h, chunks = hashlib.sha256(), []
+                for chunk in iter(lambda: source.read(CHUNK), b""):
+                    h.update(chunk); chunks.append(chunk); f.write(chunk)
+                raw, sha256 = b"".join(chunks), h.hexdigest()
+        if sha256 is None:
+            sha256 = hashlib.sha256(raw).hexdigest()
+
+    with _stage(timings, "parse"):
+        pkg = load_parts(raw)
+    with _stage(timings, "scan"):
+        keys = rename_parts(pkg)
+    with _stage(timings, "index"):
+        index = compile_parts(pkg, keys)
+    with _stage(timings, "save"):
+        working = save_parts(raw, pkg)
+        with open(working_path, "wb") as f:
+            f.write(working)
+    with _stage(timings, "preview"):
+        attach_preview(index, compile_preview(io.BytesIO(working), keys))
+        save_index(index_path_for(working_path), index)
+        html, slots = render_preview_slots(index["preview"], {}) if "preview" in index else (docx_to_html(working_path), None)
+
+    timings["total"] = round(sum(timings.values()), 2)
+    return {"keys": keys, "index": index, "html": html, "slots": slots, "sha256": sha256, "size": len(raw), "timings": timings}
@@ -0,0 +1,99 @@
+# backend/json_stream.py
+"""
+Incremental parser for the first top-level JSON object in streamed model output, so
+each `"key": value` pair can be acted on as soon as its value closes instead of after
+the whole completion. Text before the opening brace (prose, ```json fences) is skipped.
+"""
+import json
+
+_WS = " \t\r\n"
+
+class ObjectStream:
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._state = "seek"      # seek -> key -> colon -> value -> after -> key ... -> done
+        self._start = None        # start offset of the key / value being read
+        self._key = None
+        self._depth = 0
+        self._in_str = self._esc = False
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        """Append text; return the (key, value) pairs it completed, in order."""
+        self.text += chunk
+        out, text, n = [], self.text, len(self.text)
+        i = self._pos
+        while i < n and not self.done:
+            c = text[i]
+            st = self._state
+            if st == "seek":
+                if c == "{":
+                    self._state = "key"
+            elif st == "key":
+                if self._start is None:
+                    if c == '"':
+                        self._start, self._in_str, self._esc = i, True, False
+                    elif c == "}":
+                        self.done = True
+                elif self._string_char(c):
+                    try:
+                        self._key = json.loads(text[self._start:i + 1])
+                    except ValueError:
+                        self._key = None
+                    self._start, self._state = None, "colon"
+            elif st == "colon":
+                if c == ":":
+                    self._state = "value"
+            elif st == "value":
+                if self._start is None:
+                    if c in _WS:
+                        i += 1
+                        continue
+                    self._start, self._depth = i, 0
+                    self._in_str, self._esc = c == '"', False
+                    if c in "{[":
+                        self._depth = 1
+                elif self._in_str:
+                    if self._string_char(c) and self._depth == 0:
+                        self._emit(out, i + 1)
+                elif c == '"':
+                    self._in_str, self._esc = True, False
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "}]" and self._depth > 0:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._emit(out, i + 1)
+                elif self._depth == 0 and c in ",}":
+                    self._emit(out, i)
+                    continue   # the delimiter is handled in state "after"
+            elif st == "after":
+                if c == ",":
+                    self._state = "key"
+                elif c == "}":
+                    self.done = True
+            i += 1
+        self._pos = i
+        return out
+
+    def _string_char(self, c: str) -> bool:
+        """Advance string state by one char; True if it closed the string."""
+        if self._esc:
+            self._esc = False
+        elif c == "\\":
+            self._esc = True
+        elif c == '"':
+            self._in_str = False
+            return True
+        return False
+
+    def _emit(self, out: list, end: int):
+        raw = self.text[self._start:end].strip()
+        self._start, self._state = None, "after"
+        if self._key is None:
+            return
+        try:
+            out.append((self._key, json.loads(raw)))
+        except ValueError:
+            pass
@@ -0,0 +1,195 @@
+# backend/llm_client.py
+"""
+Async chat-completions client for /api/chat, talking to any OpenAI-compatible endpoint
+(Groq by default; llm_stub.py for tests and load benchmarks).
+
+One shared client keeps pooled keep-alive connections, a semaphore caps
+in-flight upstream calls, and every call has an overall deadline plus a small retry
+budget for connection errors, 429 and 5xx.
+
+    LLM_BASE_URL         default https://api.groq.com/openai/v1
+    LLM_API_KEY          default $GROQ_API_KEY
+    LLM_MODEL            default llama-3.3-70b-versatile
+    LLM_TIMEOUT          seconds per call, including queueing and retries (default 30)
+    LLM_MAX_CONCURRENCY  in-flight upstream calls per process (default 64)
+    LLM_RETRIES          extra attempts on transient errors (default 1)
+
+Without a key and with the default base URL the client is disabled (get_client() is None).
+"""
+import asyncio, contextlib, itertools, json, os
+import httpx
+from metrics import timed, LLM_ERRORS, LLM_RETRIES
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+_POOL_CONNECTIONS = 16
+
+class ClientDisconnected(Exception):
+    """The HTTP caller went away while we were waiting on the model."""
+
+class LLMClient:
+    def __init__(self, base_url: str, api_key: str | None = None, model: str = DEFAULT_MODEL,
+                 timeout: float = 30.0, max_concurrency: int = 64, retries: int = 1, transport=None):
+        self.model, self.timeout, self.retries = model, timeout, retries
+        self.max_concurrency = max_concurrency
+        self._sem = asyncio.Semaphore(max_concurrency)
+        # httpcore scans every pooled connection on each request and release, which goes
+        # quadratic past a few dozen connections; several small pools keep that flat.
+        per_pool = min(max_concurrency, _POOL_CONNECTIONS)
+        self._pools = [httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=per_pool, max_keepalive_connections=per_pool),
+            transport=transport,
+        ) for _ in range(-(-max_concurrency // per_pool))]
+        self._next_pool = itertools.cycle(self._pools)
+        self.calls = self.errors = 0
+
+    @timed("llm")
+    async def complete(self, messages: list[dict], **params) -> str:
+        """Assistant text for a chat completion. Raises on timeout / upstream failure."""
+        body = {"model": self.model, "messages": messages, **params}
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self._sem:
+                    self.calls += 1
+                    for attempt in range(self.retries + 1):
+                        res = None
+                        try:
+                            res = await next(self._next_pool).post("/chat/completions", json=body)
+                        except httpx.TransportError:
+                            if attempt == self.retries:
+                                self._failed("complete", "transport")
+                                raise
+                        else:
+                            if res.status_code not in _RETRY_STATUS or attempt == self.retries:
+                                if res.is_error:
+                                    self._failed("complete", str(res.status_code))
+                                res.raise_for_status()
+                                return (res.json()["choices"][0]["message"]["content"] or "").strip()
+                        LLM_RETRIES.inc(1, str(res.status_code) if res is not None else "transport")
+                        await asyncio.sleep(_backoff(res, attempt))
+        except TimeoutError:
+            self._failed("complete", "timeout")
+            raise
+
+    @timed("llm_stream")
+    async def stream(self, messages: list[dict], **params):
+        """
+        Assistant text deltas as the model produces them (OpenAI-style SSE). No retries:
+        once tokens have been handed out a restart would duplicate them. The whole stream
+        shares the per-call deadline; each wait on the upstream is bounded by what is
+        left of it (a timeout spanning the yields would fire in the consumer's code).
+        """
+        body = {"model": self.model, "messages": messages, "stream": True, **params}
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        try:
+            async with asyncio.timeout_at(deadline):
+                await self._sem.acquire()
+        except TimeoutError:
+            self._failed("stream", "timeout")
+            raise
+        try:
+            self.calls += 1
+            async with contextlib.AsyncExitStack() as stack:
+                async with asyncio.timeout_at(deadline):
+                    res = await stack.enter_async_context(
+                        next(self._next_pool).stream("POST", "/chat/completions", json=body))
+                res.raise_for_status()
+                lines = res.aiter_lines()
+                stack.push_async_callback(lines.aclose)
+                while True:
+                    async with asyncio.timeout_at(deadline):
+                        line = await anext(lines, None)
+                    if line is None:
+                        break
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = (json.loads(data)["choices"][0].get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+        except TimeoutError:
+            self._failed("stream", "timeout")
+            raise
+        except httpx.HTTPStatusError as e:
+            self._failed("stream", str(e.response.status_code))
+            raise
+        except httpx.HTTPError:
+            self._failed("stream", "transport")
+            raise
+        except (ValueError, KeyError, IndexError):
+            self._failed("stream", "bad_response")
+            raise
+        finally:
+            self._sem.release()
+
+    def _failed(self, call: str, reason: str):
+        self.errors += 1
+        LLM_ERRORS.inc(1, call, reason)
+
+    async def aclose(self):
+        for pool in self._pools:
+            await pool.aclose()
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors, "max_concurrency": self.max_concurrency}
+
+def _backoff(res, attempt: int) -> float:
+    retry_after = res.headers.get("retry-after") if res is not None else None
+    try:
+        return min(float(retry_after), 2.0)
+    except (TypeError, ValueError):
+        return 0.25 * 2 ** attempt
+
+_client: LLMClient | None = None
+
+def get_client() -> LLMClient | None:
+    """Process-wide client built from the environment (None when no backend is configured)."""
+    global _client
+    if _client is None:
+        base_url = os.getenv("LLM_BASE_URL")
+        api_key = os.getenv("LLM_API_KEY") or os.getenv("GROQ_API_KEY")
+        if not base_url and not api_key:
+            return None
+        _client = LLMClient(
+            base_url or GROQ_BASE_URL, api_key,
+            model=os.getenv("LLM_MODEL", DEFAULT_MODEL),
+            timeout=float(os.getenv("LLM_TIMEOUT", "30")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "64")),
+            retries=int(os.getenv("LLM_RETRIES", "1")),
+        )
+    return _client
+
+def set_client(client: LLMClient | None):
+    """Swap the backend (tests, benchmarks)."""
+    global _client
+    _client = client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def unless_disconnected(coro, is_disconnected, poll: float = 0.25):
+    """
+    Await coro, cancelling it if is_disconnected() (e.g. Request.is_disconnected) turns
+    true first. Raises ClientDisconnected in that case.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll)
+            if done:
+                return task.result()
+            if await is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
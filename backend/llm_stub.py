@@ -0,0 +1,54 @@
+# backend/llm_stub.py
+"""
+Minimal OpenAI-compatible chat-completions server standing in for Groq in tests and load
+benchmarks. It "extracts" `[Key]: value` (or `[Key] = value`) pairs from the user
+message and answers with them as a JSON object, after LEXSY_STUB_DELAY seconds. With
+"stream": true the answer goes out as SSE chunks of a few characters, one every
+LEXSY_STUB_TOKEN_DELAY seconds.
+
+    LLM_BASE_URL=http://127.0.0.1:8001/v1 ...
+    uvicorn llm_stub:app --port 8001
+"""
+import asyncio, json, os, re, time
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+PAIR = re.compile(r"(\[[^\[\]\n]+\](?:#\d+)?)\s*[:=]\s*([^\n;]+)")
+
+def stub_reply(messages: list[dict]) -> str:
+    user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    message = user.split("User message:", 1)[-1]
+    return json.dumps({k: v.strip() for k, v in PAIR.findall(message)})
+
+def create_app(delay: float | None = None, token_delay: float | None = None) -> FastAPI:
+    stub = FastAPI(title="LLM stub")
+    wait = float(os.getenv("LEXSY_STUB_DELAY", "0")) if delay is None else delay
+    per_token = float(os.getenv("LEXSY_STUB_TOKEN_DELAY", "0")) if token_delay is None else token_delay
+
+    @stub.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        if wait:
+            await asyncio.sleep(wait)
+        reply = stub_reply(body.get("messages", []))
+        if body.get("stream"):
+            async def chunks():
+                for i in range(0, len(reply), 4):
+                    if per_token and i:
+                        await asyncio.sleep(per_token)
+                    delta = {"choices": [{"index": 0, "delta": {"content": reply[i:i + 4]}}]}
+                    yield f"data: {json.dumps(delta)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+        if per_token:   # a full completion takes as long as streaming all of it
+            await asyncio.sleep(per_token * max(0, -(-len(reply) // 4) - 1))
+        return {
+            "id": f"stub-{time.time_ns()}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": reply}}],
+        }
+
+    return stub
+
+app = create_app()
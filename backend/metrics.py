@@ -0,0 +1,185 @@
+# backend/metrics.py
+"""
+Stage timings per request and a Prometheus text endpoint, without prometheus_client.
+
+stage("name") times a block and @timed("name") a function (sync, async or async
+generator). Each measurement goes to the lexsy_stage_seconds histogram and to the
+current request's record, which TimingMiddleware turns into a Server-Timing header
+and a lexsy_request_seconds observation per route. Work in the process pool is timed
+in the worker and handed back with the result (collected / merge).
+
+LEXSY_METRICS=0 turns it off: timed() returns the function itself, stage() a shared
+no-op context and counters return at once, so the instrumented code costs nothing.
+"""
+import bisect, contextvars, functools, inspect, os, threading, time
+from contextlib import nullcontext
+from starlette.datastructures import MutableHeaders
+
+ENABLED = os.getenv("LEXSY_METRICS", "1").lower() not in ("0", "false", "no", "off")
+BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+_registry: list = []
+# (stage, seconds) pairs measured for the current request
+_current: contextvars.ContextVar[list | None] = contextvars.ContextVar("lexsy_stages", default=None)
+
+def _labels(names: tuple, values: tuple) -> str:
+    esc = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{n}="{v}"' for n, v in zip(names, esc))
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels, self.values = name, help, labels, {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, *label_values):
+        if not ENABLED: return
+        with _lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for lv, v in sorted(self.values.items()):
+            out.append(f"{self.name}{{{_labels(self.labels, lv)}}} {v}" if lv else f"{self.name} {v}")
+        return out
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self.series = {}   # label values -> [per-bucket counts (+Inf last), sum, count]
+        _registry.append(self)
+
+    def observe(self, value: float, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            s = self.series.get(label_values)
+            if s is None:
+                s = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1; s[1] += value; s[2] += 1
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for lv, (counts, total, n) in sorted(self.series.items()):
+            base = _labels(self.labels, lv)
+            sep = "," if base else ""
+            acc = 0
+            for le, c in zip((*self.buckets, "+Inf"), counts):
+                acc += c
+                out.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {acc}')
+            out.append(f"{self.name}_sum{{{base}}} {total}" if base else f"{self.name}_sum {total}")
+            out.append(f"{self.name}_count{{{base}}} {n}" if base else f"{self.name}_count {n}")
+        return out
+
+STAGE_SECONDS = Histogram("lexsy_stage_seconds", "Time spent per pipeline stage", ("stage",))
+REQUEST_SECONDS = Histogram("lexsy_request_seconds", "Request latency per route", ("method", "route", "status"))
+DOCUMENTS = Counter("lexsy_documents_total", "Documents uploaded")
+DOCUMENT_BYTES = Counter("lexsy_document_bytes_total", "Bytes of uploaded DOCX files")
+PLACEHOLDERS = Counter("lexsy_placeholders_total", "Placeholders found in uploaded documents")
+WRITE_BEHIND_ERRORS = Counter("lexsy_write_behind_errors_total", "Background write-behind jobs that raised")
+LLM_ERRORS = Counter("lexsy_llm_errors_total", "Failed LLM calls", ("call", "reason"))
+LLM_RETRIES = Counter("lexsy_llm_retries_total", "LLM attempts retried after a transient error", ("reason",))
+
+def record(name: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, name)
+    stages = _current.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.t0)
+
+_OFF = nullcontext()
+
+def stage(name: str):
+    """Context manager timing a block as `name`."""
+    return _Stage(name) if ENABLED else _OFF
+
+def timed(name: str):
+    """Decorator timing every call (or, for an async generator, the whole iteration) as `name`."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def agen(*args, **kw):
+                t0, gen = time.perf_counter(), fn(*args, **kw)
+                try:
+                    async for item in gen:
+                        yield item
+                finally:
+                    await gen.aclose()
+                    record(name, time.perf_counter() - t0)
+            return agen
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def coro(*args, **kw):
+                t0 = time.perf_counter()
+                try: return await fn(*args, **kw)
+                finally: record(name, time.perf_counter() - t0)
+            return coro
+
+        @functools.wraps(fn)
+        def call(*args, **kw):
+            t0 = time.perf_counter()
+            try: return fn(*args, **kw)
+            finally: record(name, time.perf_counter() - t0)
+        return call
+    return wrap
+
+def collected(fn, *args):
+    """Run fn(*args) (in a pool worker) with its own stage record: returns (result, [(stage, seconds), ...])."""
+    stages = []
+    token = _current.set(stages)
+    try:
+        return fn(*args), stages
+    finally:
+        _current.reset(token)
+
+def merge(stages: list):
+    """Record stages measured in another process."""
+    for name, seconds in stages:
+        record(name, seconds)
+
+def server_timing(stages: list, total: float) -> str:
+    """Server-Timing value: stages summed by name, in ms, in first-seen order, then the total."""
+    sums = {}
+    for name, seconds in stages:
+        sums[name] = sums.get(name, 0.0) + seconds
+    return ", ".join(f"{n};dur={s * 1000:.2f}" for n, s in (*sums.items(), ("total", total)))
+
+def exposition() -> str:
+    with _lock:
+        return "\n".join(line for m in _registry for line in m.render()) + "\n"
+
+class TimingMiddleware:
+    """ASGI middleware: per-request stage record, Server-Timing header, route latency histogram."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not ENABLED or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stages, t0, status = [], time.perf_counter(), [500]
+        token = _current.set(stages)
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", server_timing(stages, time.perf_counter() - t0))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")   # the template, not the raw path
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, scope["method"], route, str(status[0]))
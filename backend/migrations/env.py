@@ -0,0 +1,37 @@
+# backend/migrations/env.py
+import os, sys
+from logging.config import fileConfig
+from alembic import context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import Base, engine
+import models  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+if config.config_file_name and not config.attributes.get("connection"):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+def run_offline():
+    context.configure(url=str(engine.url), target_metadata=Base.metadata, literal_binds=True,
+                      render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_online():
+    # db.migrate() hands over a connection; the alembic CLI uses the app's engine
+    conn = config.attributes.get("connection")
+    if conn is None:
+        with engine.connect() as conn:
+            _run(conn)
+    else:
+        _run(conn)
+
+def _run(conn):
+    context.configure(connection=conn, target_metadata=Base.metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_offline()
+else:
+    run_online()
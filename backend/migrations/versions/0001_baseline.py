@@ -0,0 +1,51 @@
+"""baseline: schema as created by Base.metadata.create_all before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table("sessions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("original_filename", sa.String()),
+        sa.Column("status", sa.String()))
+    op.create_table("documents",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("session_id", sa.String(), sa.ForeignKey("sessions.id")),
+        sa.Column("original_docx_path", sa.String()),
+        sa.Column("working_docx_path", sa.String()),
+        sa.Column("html_preview", sa.Text()))
+    op.create_index("ix_documents_session_id", "documents", ["session_id"])
+    op.create_table("placeholders",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("session_id", sa.String(), sa.ForeignKey("sessions.id")),
+        sa.Column("key", sa.String()),
+        sa.Column("normalized_key", sa.String()),
+        sa.Column("is_filled", sa.Boolean()),
+        sa.Column("value", sa.Text(), nullable=True))
+    op.create_index("ix_placeholders_session_id", "placeholders", ["session_id"])
+    op.create_table("messages",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("session_id", sa.String(), sa.ForeignKey("sessions.id")),
+        sa.Column("role", sa.String()),
+        sa.Column("content", sa.Text()))
+    op.create_index("ix_messages_session_id", "messages", ["session_id"])
+    op.create_table("suggestions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("session_id", sa.String()),
+        sa.Column("key", sa.String()),
+        sa.Column("value", sa.Text()),
+        sa.Column("status", sa.String()))
+    op.create_index("ix_suggestions_session_id", "suggestions", ["session_id"])
+
+def downgrade():
+    for table in ("suggestions", "messages", "placeholders", "documents", "sessions"):
+        op.drop_table(table)
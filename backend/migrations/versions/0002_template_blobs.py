@@ -0,0 +1,28 @@
+"""template_blobs: content-addressed template store refcounts
+
+Databases that create_all() already gave this table are left alone.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("template_blobs"):
+        return
+    op.create_table("template_blobs",
+        sa.Column("sha256", sa.String(), primary_key=True),
+        sa.Column("size", sa.Integer()),
+        sa.Column("refcount", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("released_at", sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_table("template_blobs")
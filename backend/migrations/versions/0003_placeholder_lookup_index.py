@@ -0,0 +1,23 @@
+"""placeholder lookup by (session_id, normalized_key)
+
+The composite index serves both the per-session scans and the fill lookups, so the
+single-column session_id index is dropped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index("ix_placeholders_session_normalized", "placeholders", ["session_id", "normalized_key"])
+    op.drop_index("ix_placeholders_session_id", table_name="placeholders")
+
+def downgrade():
+    op.create_index("ix_placeholders_session_id", "placeholders", ["session_id"])
+    op.drop_index("ix_placeholders_session_normalized", table_name="placeholders")
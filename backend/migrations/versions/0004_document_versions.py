@@ -0,0 +1,26 @@
+"""documents.version / rendered_version for optimistic concurrency
+
+version goes up by one with every change to the session's values; rendered_version is
+the version html_preview was rendered from.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("rendered_version", sa.Integer(), nullable=False, server_default="0"))
+
+def downgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("rendered_version")
+        batch.drop_column("version")
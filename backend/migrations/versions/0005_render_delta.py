@@ -0,0 +1,29 @@
+"""placeholders.version / documents.preview_slots for delta preview sync
+
+placeholders.version is the document version that last set the value, so the keys
+changed since a revision are one query; preview_slots records where each slot sits in
+html_preview.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table("placeholders") as batch:
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("preview_slots", sa.Text(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("preview_slots")
+    with op.batch_alter_table("placeholders") as batch:
+        batch.drop_column("version")
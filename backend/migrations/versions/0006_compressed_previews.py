@@ -0,0 +1,49 @@
+"""documents.preview_gz replaces html_preview / preview_slots
+
+The preview is stored as the gzip'd JSON body of /api/render (render_service.pack_preview)
+and served without re-encoding. Existing rows are converted in place; VACUUM afterwards
+to give the space back.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+import gzip, json
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+documents = sa.table("documents", sa.column("id", sa.String), sa.column("html_preview", sa.Text),
+                     sa.column("preview_slots", sa.Text), sa.column("rendered_version", sa.Integer),
+                     sa.column("preview_gz", sa.LargeBinary))
+
+def upgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("preview_gz", sa.LargeBinary(), nullable=True))
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(documents.c.id, documents.c.html_preview, documents.c.preview_slots,
+                                  documents.c.rendered_version)).all()
+    for id_, html, slots, version in rows:
+        body = json.dumps({"html": html or "", "version": version,
+                           "slots": json.loads(slots) if slots else None}, ensure_ascii=False)
+        conn.execute(documents.update().where(documents.c.id == id_)
+                     .values(preview_gz=gzip.compress(body.encode(), mtime=0)))
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("preview_slots")
+        batch.drop_column("html_preview")
+
+def downgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("html_preview", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("preview_slots", sa.Text(), nullable=True))
+    conn = op.get_bind()
+    for id_, blob in conn.execute(sa.select(documents.c.id, documents.c.preview_gz)).all():
+        body = json.loads(gzip.decompress(blob)) if blob else {"html": "", "slots": None}
+        conn.execute(documents.update().where(documents.c.id == id_).values(
+            html_preview=body["html"], preview_slots=None if body["slots"] is None else json.dumps(body["slots"])))
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("preview_gz")
@@ -0,0 +1,44 @@
+"""documents.filename / position / keys for multi-document sessions
+
+A session holds a bundle of documents sharing one placeholder namespace. Each document
+records its own keys, so a fill only re-renders the documents containing the key.
+Existing sessions have a single document: it gets the session's keys and filename.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+documents = sa.table("documents", sa.column("id", sa.String), sa.column("session_id", sa.String),
+                     sa.column("filename", sa.String), sa.column("keys", sa.Text))
+placeholders = sa.table("placeholders", sa.column("session_id", sa.String), sa.column("key", sa.String))
+sessions = sa.table("sessions", sa.column("id", sa.String), sa.column("original_filename", sa.String))
+
+def upgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("filename", sa.String(), nullable=True))
+        batch.add_column(sa.Column("position", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("keys", sa.Text(), nullable=True))
+    conn = op.get_bind()
+    keys = {}
+    for sid, key in conn.execute(sa.select(placeholders.c.session_id, placeholders.c.key)):
+        keys.setdefault(sid, []).append(key)
+    rows = conn.execute(sa.select(documents.c.id, documents.c.session_id, sessions.c.original_filename)
+                        .select_from(documents.outerjoin(sessions, sessions.c.id == documents.c.session_id))).all()
+    for id_, sid, filename in rows:
+        conn.execute(documents.update().where(documents.c.id == id_)
+                     .values(filename=filename, keys=json.dumps(keys.get(sid, []))))
+
+def downgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("keys")
+        batch.drop_column("position")
+        batch.drop_column("filename")
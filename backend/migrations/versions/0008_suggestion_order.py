@@ -0,0 +1,21 @@
+"""suggestions.created_at so accepting all pending suggestions picks the latest per key
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table("suggestions") as batch:
+        batch.add_column(sa.Column("created_at", sa.DateTime(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table("suggestions") as batch:
+        batch.drop_column("created_at")
@@ -1,9 +1,10 @@
 # backend/models.py
-from sqlalchemy import Column, String, Text, Boolean, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, ForeignKey, DateTime, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import Integer
 from db import Base
 import uuid
+from datetime import datetime
 
 def uuid4str():
     return str(uuid.uuid4())
@@ -20,17 +21,25 @@ class Document(Base):
     session_id = Column(String, ForeignKey("sessions.id"), index=True)
     original_docx_path = Column(String)  # disk path
     working_docx_path = Column(String)   # disk path
-    html_preview = Column(Text, default="")
+    filename = Column(String)            # as uploaded; names the member in bundle downloads
+    position = Column(Integer, nullable=False, default=0, server_default="0")   # order within the session's bundle
+    keys = Column(Text)                  # JSON list of this document's placeholder keys
+    preview_gz = Column(LargeBinary, nullable=True)   # gzip'd /api/render body {"html", "version", "slots"} (render_service.pack_preview)
+    version = Column(Integer, nullable=False, default=0, server_default="0")           # +1 per change to the session's values
+    rendered_version = Column(Integer, nullable=False, default=0, server_default="0")  # version preview_gz shows
     session = relationship("Session")
 
 class Placeholder(Base):
     __tablename__ = "placeholders"
+    # fills look rows up by normalized key within a session
+    __table_args__ = (Index("ix_placeholders_session_normalized", "session_id", "normalized_key"),)
     id = Column(String, primary_key=True, default=uuid4str)
-    session_id = Column(String, ForeignKey("sessions.id"), index=True)
+    session_id = Column(String, ForeignKey("sessions.id"))
     key = Column(String)                 # e.g., [Company Name]
     normalized_key = Column(String)      # lower/slugged
     is_filled = Column(Boolean, default=False)
     value = Column(Text, nullable=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")   # document version that last set it
 
 class Message(Base):
     __tablename__ = "messages"
@@ -46,3 +55,12 @@ class Suggestion(Base):
     key = Column(String)                   # exact placeholder key
     value = Column(Text)                   # proposed value
     status = Column(String, default="pending")  # pending|accepted|rejected
+    created_at = Column(DateTime, default=datetime.utcnow)   # the latest pending one per key wins on accept
+
+class TemplateBlob(Base):
+    __tablename__ = "template_blobs"
+    sha256 = Column(String, primary_key=True)   # hash of the uploaded bytes; data/blobs/{sha256}/
+    size = Column(Integer)
+    refcount = Column(Integer, default=0)       # sessions pointing at this blob
+    created_at = Column(DateTime, default=datetime.utcnow)
+    released_at = Column(DateTime, nullable=True)  # when refcount last dropped; GC grace starts here
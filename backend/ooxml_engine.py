@@ -0,0 +1,202 @@
+# backend/ooxml_engine.py
+"""
+Placeholder scan and fill straight on the WordprocessingML XML with lxml, bypassing
+python-docx's object model.
+
+- Covers every story part: main document, headers, footers, footnotes, endnotes.
+- Paragraph text is read from w:t / w:tab / w:br / w:cr, so placeholders split across
+  runs are found. Each occurrence is then moved into a single w:t (the run it starts in
+  keeps its formatting), instead of collapsing the whole paragraph into one plain run.
+- The compiled index (version 2) addresses those w:t nodes: {"part", "t", "text",
+  "slots"}. Fills parse only the parts holding the keys and zip-rewrite the package.
+"""
+import io, posixpath, re, zipfile
+from bisect import bisect_right
+from collections import Counter
+from lxml import etree
+
+import template_index
+from docx_parser import placeholder_spans
+from docx_zip import main_part_from_rels, rewrite_parts
+from placeholder_engine import compile_key_pattern
+from template_index import render_paragraph
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+W_P, W_T, W_TAB, W_BR, W_CR = (f"{{{W}}}{t}" for t in ("p", "t", "tab", "br", "cr"))
+STORY_TYPES = ("/header", "/footer", "/footnotes", "/endnotes")
+RENDERED_TYPES = ("/footnotes", "/endnotes")   # parts mammoth includes in the HTML preview
+INDEX_VERSION = 2
+
+_PARSER = etree.XMLParser(resolve_entities=False, huge_tree=True)
+_BREAKS = re.compile(r"([\t\r\n])")
+
+# ---------- package ----------
+def story_parts(zf: zipfile.ZipFile) -> tuple[list[str], list[str]]:
+    """(all story part names, the subset mammoth renders), main document first."""
+    main = main_part_from_rels(zf.read("_rels/.rels"))
+    names, rendered = [main], [main]
+    rels_name = posixpath.join(posixpath.dirname(main), "_rels", posixpath.basename(main) + ".rels")
+    if rels_name in zf.namelist():
+        for rel in etree.fromstring(zf.read(rels_name), _PARSER):
+            rtype, target = rel.get("Type", ""), rel.get("Target", "")
+            if rel.get("TargetMode") == "External" or not rtype.endswith(STORY_TYPES):
+                continue
+            name = posixpath.normpath(posixpath.join(posixpath.dirname(main), target))
+            if name in zf.namelist() and name not in names:
+                names.append(name)
+                if rtype.endswith(RENDERED_TYPES):
+                    rendered.append(name)
+    return names, rendered
+
+def load_parts(raw: bytes) -> dict:
+    """Parse every story part once: {"parts": {name: root}, "rendered": [...], "changed": set()}."""
+    with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+        names, rendered = story_parts(zf)
+        parts = {n: etree.fromstring(zf.read(n), _PARSER) for n in names}
+    return {"parts": parts, "rendered": rendered, "changed": set()}
+
+def serialize(root) -> bytes:
+    return etree.tostring(root, encoding="UTF-8", standalone=True)
+
+def save_parts(raw: bytes, pkg: dict) -> bytes:
+    """Package bytes with only the modified story parts regenerated."""
+    return rewrite_parts(raw, {n: serialize(pkg["parts"][n]) for n in pkg["changed"]})
+
+# ---------- scan / rename ----------
+def _owner(el):
+    p = el.getparent()
+    while p is not None and p.tag != W_P:
+        p = p.getparent()
+    return p
+
+def _pieces(p) -> list[list]:
+    """[[element, text, editable], ...] for the paragraph's own text (nested paragraphs excluded)."""
+    out = []
+    for el in p.iter(W_T, W_TAB, W_BR, W_CR):
+        if _owner(el) is not p:
+            continue
+        if el.tag == W_T:
+            out.append([el, el.text or "", True])
+        else:
+            out.append([el, "\t" if el.tag == W_TAB else "\n", False])
+    return out
+
+def _splice(pieces, starts, a: int, b: int, key: str) -> bool | None:
+    """
+    Replace text[a:b] with key so that it sits inside one w:t (the one where it starts).
+    Returns whether the XML changed, or None if the span crosses a tab/break.
+    Spans must be spliced right-to-left so `starts` (original offsets) stay valid.
+    """
+    i = bisect_right(starts, a) - 1
+    j = bisect_right(starts, b - 1) - 1
+    if not all(pc[2] for pc in pieces[i:j + 1]):
+        return None
+    ia, jb = a - starts[i], b - starts[j]
+    new = [pc[1] for pc in pieces[i:j + 1]]
+    if i == j:
+        new[0] = new[0][:ia] + key + new[0][jb:]
+    else:
+        new[0] = new[0][:ia] + key
+        new[-1] = new[-1][jb:]
+        new[1:-1] = [""] * (j - i - 1)
+    modified = False
+    for pc, text in zip(pieces[i:j + 1], new):
+        if text != pc[1]:
+            pc[1] = pc[0].text = text
+            pc[0].set(XML_SPACE, "preserve")
+            modified = True
+    return modified
+
+def rename_parts(pkg: dict) -> list[str]:
+    """
+    Rename generic placeholders and make every occurrence contiguous within one w:t, in
+    all story parts. Returns unique keys in reading order (main document first).
+    """
+    found = []
+    for name, root in pkg["parts"].items():
+        for p in root.iter(W_P):
+            pieces = _pieces(p)
+            text = "".join(pc[1] for pc in pieces)
+            if "[" not in text or "]" not in text:
+                continue
+            starts, off = [], 0
+            for pc in pieces:
+                starts.append(off); off += len(pc[1])
+            prev = p.getprevious()
+            prev_text = "".join(pc[1] for pc in _pieces(prev)) if prev is not None and prev.tag == W_P else None
+            keys = []
+            for a, b, key in reversed(placeholder_spans(text, prev_text)):
+                modified = _splice(pieces, starts, a, b, key)
+                if modified is None:
+                    continue  # can't be addressed as one text node; leave it alone
+                if modified:
+                    pkg["changed"].add(name)
+                keys.append(key)
+            found.extend(reversed(keys))
+    return list(dict.fromkeys(found))
+
+def compile_parts(pkg: dict, keys: list[str]) -> dict:
+    """Compiled template (version 2): one entry per w:t holding placeholder keys."""
+    pat = compile_key_pattern(keys)
+    nodes, by_key = [], {}
+    for name, root in pkg["parts"].items():
+        if pat is None:
+            break
+        for i, t in enumerate(root.iter(W_T)):
+            text = t.text
+            if not text or "[" not in text:
+                continue
+            slots = [[m.start(), m.end(), m.group(0)] for m in pat.finditer(text)]
+            if not slots:
+                continue
+            for k in dict.fromkeys(s[2] for s in slots):
+                by_key.setdefault(k, []).append(len(nodes))
+            nodes.append({"part": name, "t": i, "text": text, "slots": slots})
+    return {"version": INDEX_VERSION, "nodes": nodes, "keys": by_key, "rendered_parts": pkg["rendered"]}
+
+def preview_keys(index: dict) -> Counter:
+    """Key occurrences the HTML preview should contain, for checking the slot template."""
+    if index.get("version", 1) < INDEX_VERSION:
+        return Counter(k for e in index["paragraphs"] for _, _, k in e["slots"])
+    rendered = set(index["rendered_parts"])
+    return Counter(k for e in index["nodes"] if e["part"] in rendered for _, _, k in e["slots"])
+
+# ---------- fill ----------
+def _set_text(t, text: str):
+    """Put text into a w:t; tabs and line breaks become sibling w:tab / w:br in the same run."""
+    chunks = _BREAKS.split(text)
+    t.text = chunks[0]
+    t.set(XML_SPACE, "preserve")
+    anchor = t
+    for sep, chunk in zip(chunks[1::2], chunks[2::2]):
+        el = t.makeelement(W_TAB if sep == "\t" else W_BR)
+        anchor.addnext(el); anchor = el
+        if chunk:
+            nt = t.makeelement(W_T)
+            nt.text = chunk
+            nt.set(XML_SPACE, "preserve")
+            anchor.addnext(nt); anchor = nt
+
+def fill_package(src, index: dict, mapping: dict[str, str]) -> bytes:
+    """
+    Filled DOCX bytes for a template (path or bytes). Only story parts containing a filled
+    key are parsed and re-serialized; every other ZIP entry is copied compressed.
+    """
+    if index.get("version", 1) < INDEX_VERSION:
+        return template_index.fill_package(src, index, mapping)
+    raw = src if isinstance(src, (bytes, bytearray)) else open(src, "rb").read()
+    by_part = {}
+    for k in mapping:
+        for j in index["keys"].get(k, ()):
+            e = index["nodes"][j]
+            by_part.setdefault(e["part"], {})[j] = e
+    replacements = {}
+    with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+        for part, entries in by_part.items():
+            root = etree.fromstring(zf.read(part), _PARSER)
+            ts = list(root.iter(W_T))
+            for e in entries.values():
+                _set_text(ts[e["t"]], render_paragraph(e, mapping))
+            replacements[part] = serialize(root)
+    return rewrite_parts(raw, replacements)
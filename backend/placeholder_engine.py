@@ -8,3 +8,25 @@ def normalize_key(key: str) -> str:
     Do NOT remove symbols like $ or underscores.
     """
     return key.strip().strip("[]").strip()
+
+def compile_key_pattern(keys) -> re.Pattern | None:
+    """
+    One alternation regex over all keys. Longest keys come first, so at any position
+    the longest key wins ("[Company Name]#2" before "[Company Name]").
+    """
+    ordered = sorted(set(keys), key=len, reverse=True)
+    if not ordered:
+        return None
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
+def compile_replacer(mapping: dict[str, str]):
+    """
+    Build a text -> text function that replaces every mapping key in a single
+    left-to-right scan. Replaced values are never rescanned, so the result does
+    not depend on dict order.
+    """
+    pat = compile_key_pattern(mapping)
+    if pat is None:
+        return lambda t: t
+    values = {k: str(v) for k, v in mapping.items()}
+    return lambda t: pat.sub(lambda m: values[m.group(0)], t)
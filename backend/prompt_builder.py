@@ -0,0 +1,106 @@
+# backend/prompt_builder.py
+"""
+Compact extraction prompts for /api/chat.
+
+Pending placeholders go out as a `key | type | hint` table with each distinct hint sent
+once, and only the placeholders the message plausibly answers are included: candidates
+are ranked lexically (key/hint words shared with the message, money/date/name/company
+signals matching the placeholder type) and added until the token budget
+(LEXSY_PROMPT_TOKEN_BUDGET) is spent. If nothing in the message points anywhere, every
+pending placeholder is offered, still within the budget.
+
+count_tokens() uses tiktoken when it is installed, otherwise a BPE-like approximation.
+"""
+import os, re
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:   # not installed, or no encoding files offline
+    _ENCODING = None
+
+TOKEN_BUDGET = int(os.getenv("LEXSY_PROMPT_TOKEN_BUDGET", "1200"))
+
+SYSTEM_PROMPT = (
+    "You are a legal placeholder extraction assistant for Future equity investment agreement document.\n"
+    "You must return ONLY a JSON object.\n"
+    "You may ONLY include keys from the pending placeholder table provided (rows are key | type | hint id).\n"
+    "For each key, use its hint to decide if the user message provides that value.\n"
+    "If the user message does not clearly provide a value for a placeholder, return null for that key, or omit it.\n"
+    "NEVER invent data. NEVER output extra keys. No explanations.\n"
+    "Formatting:\n"
+    "- COMPANY → UPPERCASE (add ', INC.' ONLY if explicitly stated)\n"
+    "- PERSON → Proper Case (Jane Doe)\n"
+    "- DATE → Month D, YYYY (honor 'this year', 'last year', 'current year')\n"
+    "- MONEY → $X,XXX or $X,XXX,XXX (prefix with $)\n"
+)
+
+_APPROX_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP = {"the", "of", "a", "an", "and", "or", "to", "in", "for", "on", "by", "is", "this", "that", "be", "as",
+         "at", "it", "its", "with", "from", "e", "g", "x", "name", "value", "placeholder", "relevant", "document"}
+
+MONEY_SIGNAL = re.compile(r"\$\s*\d|\d[\d,.]*\s*(?:\$|usd\b|dollars?\b|k\b|m\b|million\b|thousand\b)|\b\d{1,3}(?:,\d{3})+\b", re.I)
+DATE_SIGNAL = re.compile(r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d|\b\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"
+                         r"|\b\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?\b|\b(?:today|tomorrow|yesterday|this year|last year|next year)\b", re.I)
+COMPANY_SIGNAL = re.compile(r"\b(?:inc|llc|ltd|corp|corporation|company|co|plc|gmbh)\b\.?|\b[A-Z]{2,}(?:\s+[A-Z]{2,})*\b")
+PERSON_SIGNAL = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z]\.?)?\s+[A-Z][a-z]+\b")
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(_APPROX_TOKEN.findall(text))
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower())) - _STOP
+
+def signals(message: str) -> set[str]:
+    """Placeholder types the message looks like it carries a value for."""
+    found = set()
+    if MONEY_SIGNAL.search(message): found.add("MONEY")
+    if DATE_SIGNAL.search(message): found.add("DATE")
+    if COMPANY_SIGNAL.search(message): found.add("COMPANY")
+    if PERSON_SIGNAL.search(message): found.add("PERSON")
+    return found
+
+def rank_pending(pending_list: list[dict], message: str) -> list[tuple[int, dict]]:
+    """(score, placeholder) for placeholders with any lexical evidence, best first (stable)."""
+    msg_words, types = _words(message), signals(message)
+    scored = []
+    for p in pending_list:
+        s = 2 * len(_words(p["key"]) & msg_words) + len(_words(p["hint"]) & msg_words)
+        if p["type"] in types:
+            s += 3
+        if s:
+            scored.append((s, p))
+    scored.sort(key=lambda t: -t[0])
+    return scored
+
+def build_prompt(pending_list: list[dict], message: str, budget: int = TOKEN_BUDGET) -> tuple[str, str, dict]:
+    """(system, user, meta) where meta = {"tokens", "candidates", "pending"}."""
+    ranked = [p for _, p in rank_pending(pending_list, message)] or pending_list
+    hint_ids, rows, hint_lines, used = {}, [], [], 0
+    for p in ranked:
+        row = f"{p['key']} | {p['type']} | "
+        new_hint = p["hint"] not in hint_ids
+        hid = hint_ids.get(p["hint"]) or f"h{len(hint_ids) + 1}"
+        cost = count_tokens(row + hid) + (count_tokens(f"{hid}: {p['hint']}") if new_hint else 0)
+        if rows and used + cost > budget:
+            break
+        if new_hint:
+            hint_ids[p["hint"]] = hid
+            hint_lines.append(f"{hid}: {p['hint']}")
+        rows.append((p, row + hid))
+        used += cost
+    order = {p["key"]: i for i, p in enumerate(pending_list)}
+    rows.sort(key=lambda r: order[r[0]["key"]])   # document order reads better for the model
+
+    user = (
+        "Hints:\n" + "\n".join(hint_lines) + "\n\n"
+        "Pending placeholders (key | type | hint):\n" + "\n".join(r for _, r in rows) + "\n\n"
+        f"User message:\n{message}\n\n"
+        "Return ONLY a JSON mapping for the pending keys where the message clearly provides the value.\n"
+        "If the message doesn't provide a value for a pending key, omit that key or set it to null."
+    )
+    meta = {"tokens": count_tokens(SYSTEM_PROMPT) + count_tokens(user), "candidates": len(rows), "pending": len(pending_list)}
+    return SYSTEM_PROMPT, user, meta
@@ -1,27 +1,107 @@
 # backend/render_service.py
-import re
+import gzip, json, os, re
 import mammoth
+from placeholder_engine import compile_key_pattern
+from metrics import stage, timed
 
 PLACEHOLDER_RE = re.compile(r"\[[^\[\]\n\r]+?\]")
+PREVIEW_GZIP_LEVEL = int(os.getenv("LEXSY_PREVIEW_GZIP_LEVEL", "6"))
 
-def docx_to_html(docx_path: str) -> str:
-    with open(docx_path, "rb") as f:
+@timed("docx_to_html")
+def docx_to_html(source) -> str:
+    """Full render of a DOCX path or binary file object."""
+    html = _mammoth_html(source)
+    with stage("highlight"):
+        return _highlight_and_wrap(html)
+
+def compile_preview(source, keys: list[str]) -> dict:
+    """
+    Render the template (a path or a binary file object) once and cut mammoth's HTML at every placeholder occurrence:
+    {"segments": [html, html, ...], "slots": [key, ...]} with len(segments) == len(slots) + 1.
+    """
+    html = _mammoth_html(source)
+    escaped = {_escape_text(k): k for k in keys}
+    pat = compile_key_pattern(escaped)
+    segments, slots, last = [], [], 0
+    for m in (pat.finditer(html) if pat else ()):
+        segments.append(html[last:m.start()])
+        slots.append(escaped[m.group(0)])
+        last = m.end()
+    segments.append(html[last:])
+    return {"segments": segments, "slots": slots}
+
+@timed("render_preview")
+def render_preview_slots(preview: dict, mapping: dict[str, str]) -> tuple[str, list]:
+    """
+    Preview for the current mapping without touching the DOCX: each slot gets the value
+    escaped the way mammoth escapes run text, so the HTML is docx_to_html of the filled file.
+    Also returns where each slot landed: [[key, start, end], ...] offsets into the HTML, in
+    document order. A client holding both can splice in slot_html() fragments.
+    Offsets count UTF-16 code units, like JavaScript string indices.
+    """
+    segs = preview["segments"]
+    parts = [_PAGE_OPEN, _highlight(segs[0])]
+    pos, slots = _u16len(parts[0]) + _u16len(parts[1]), []
+    for key, seg in zip(preview["slots"], segs[1:]):
+        frag = slot_html(key, mapping.get(key))
+        n = _u16len(frag)
+        slots.append([key, pos, pos + n])
+        seg = _highlight(seg)
+        parts += (frag, seg)
+        pos += n + _u16len(seg)
+    parts.append(_PAGE_CLOSE)
+    return "".join(parts), slots
+
+def _u16len(s: str) -> int:
+    """len() in UTF-16 code units: characters outside the BMP count twice."""
+    return len(s) if s.isascii() else len(s.encode("utf-16-le")) // 2
+
+def slot_html(key: str, value: str | None) -> str:
+    """What one slot renders as: the escaped value, or the highlighted key while unfilled."""
+    return _highlight(_escape_text(str(value) if value else key))
+
+def pack_preview(html: str, version: int, slots: list | None) -> bytes:
+    """
+    The stored preview: the gzip'd JSON body of /api/render, so it can be sent as-is to
+    clients that accept gzip. mtime=0 keeps the bytes a function of the content.
+    """
+    body = json.dumps({"html": html, "version": version, "slots": slots}, ensure_ascii=False)
+    return gzip.compress(body.encode(), compresslevel=PREVIEW_GZIP_LEVEL, mtime=0)
+
+def unpack_preview(blob: bytes) -> dict:
+    return json.loads(gzip.decompress(blob))
+
+def restamp_preview(blob: bytes, version: int) -> bytes:
+    """The same stored preview marked as current for `version` (none of its slots changed)."""
+    body = unpack_preview(blob)
+    return pack_preview(body["html"], version, body["slots"])
+
+@timed("mammoth")
+def _mammoth_html(source) -> str:
+    if not isinstance(source, str):
+        return mammoth.convert_to_html(source, style_map=_style_map()).value
+    with open(source, "rb") as f:
         result = mammoth.convert_to_html(f, style_map=_style_map())
-    html = result.value
+    return result.value
+
+_PAGE_OPEN = """
+    <div class="docx-page">
+      """
+_PAGE_CLOSE = """
+    </div>
+    """
 
+def _highlight(html: str) -> str:
     # Highlight placeholders and add a data-key for click sync
     def repl(m):
         raw = m.group(0)
         data_key = raw  # keep exact; frontend uses it to map to field
         return f"<span class='ph' data-key='{_escape_attr(data_key)}'>{raw}</span>"
 
-    html = PLACEHOLDER_RE.sub(repl, html)
-    wrapped = f"""
-    <div class="docx-page">
-      {html}
-    </div>
-    """
-    return wrapped
+    return PLACEHOLDER_RE.sub(repl, html)
+
+def _highlight_and_wrap(html: str) -> str:
+    return _PAGE_OPEN + _highlight(html) + _PAGE_CLOSE
 
 def _style_map():
     return """
@@ -29,5 +109,12 @@ def _style_map():
     table => table.table
     """
 
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;",
+                               "\n": "<br />", "\r": "<br />"})
+
+def _escape_text(s: str) -> str:
+    # Matches mammoth's text escaping; add_run turns \n / \r into <w:br/>, which mammoth emits as <br />
+    return s.translate(_TEXT_ESCAPES)
+
 def _escape_attr(s: str) -> str:
     return s.replace('"', '&quot;').replace("'", "&#39;")
@@ -0,0 +1,130 @@
+# backend/session_lock.py
+"""
+Per-session lock that holds across uvicorn workers: an exclusive lock on
+data/locks/{session_id}.lock (flock, or msvcrt on Windows), taken non-blocking and
+polled so a waiting request never parks a thread. Coroutines of one process queue on
+an asyncio.Lock first, so only one of them polls the file.
+
+file_lock() is the blocking variant for one-off startup work such as migrations;
+remove_lock() deletes a deleted session's lock file.
+"""
+import asyncio, os, time, weakref
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import fcntl
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+except ImportError:   # Windows
+    import msvcrt
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+LOCK_DIR = os.path.join("data", "locks")
+LOCK_TIMEOUT = float(os.getenv("LEXSY_SESSION_LOCK_TIMEOUT", "30"))
+_POLL = 0.005
+_local: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def lock_path(session_id: str) -> str:
+    return os.path.join(LOCK_DIR, f"{os.path.basename(session_id)}.lock")
+
+def _open(path: str) -> int:
+    return os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+def _attempt(fd: int, path: str) -> tuple[int, bool]:
+    """
+    One non-blocking try: (fd, True) once fd is locked and still the file at `path`. If
+    remove_lock() unlinked it while we waited, the lock is on a dead inode that a fresh
+    opener would not see; drop it and return a new fd on the current file to retry with.
+    """
+    if not _try_lock(fd):
+        return fd, False
+    try:
+        if os.path.samestat(os.fstat(fd), os.stat(path)):
+            return fd, True
+    except FileNotFoundError:
+        pass
+    _unlock(fd)
+    os.close(fd)
+    return _open(path), False
+
+@contextmanager
+def file_lock(name: str, timeout: float = LOCK_TIMEOUT):
+    """Exclusive lock on data/locks/{name}.lock for synchronous code; TimeoutError after `timeout` seconds."""
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    path = lock_path(name)
+    fd = _open(path)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            fd, locked = _attempt(fd, path)
+            if locked: break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{name} is locked")
+            time.sleep(_POLL)
+        try:
+            yield
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
+
+def remove_lock(session_id: str, timeout: float = LOCK_TIMEOUT):
+    """
+    Delete the session's lock file while holding its lock, so nobody is inside the section;
+    waiters that locked the unlinked file notice (_attempt) and move to a fresh one. A later
+    session_lock() for the id (a stray render of the deleted session) recreates it.
+    """
+    if not os.path.exists(lock_path(session_id)):
+        return
+    with file_lock(session_id, timeout):
+        try:
+            os.remove(lock_path(session_id))   # still locked: released only after the unlink
+        except OSError:   # gone already, or open elsewhere on Windows
+            pass
+
+@asynccontextmanager
+async def session_lock(session_id: str, timeout: float = LOCK_TIMEOUT):
+    """Exclusive section for one session across processes; TimeoutError after `timeout` seconds."""
+    local = _local.get(session_id)
+    if local is None:
+        local = _local[session_id] = asyncio.Lock()
+    deadline = time.monotonic() + timeout
+    async with asyncio.timeout(timeout):
+        await local.acquire()
+    try:
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        path = lock_path(session_id)
+        fd = _open(path)
+        try:
+            while True:
+                fd, locked = _attempt(fd, path)
+                if locked: break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"session {session_id} is locked")
+                await asyncio.sleep(_POLL)
+            try:
+                yield
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
+    finally:
+        local.release()
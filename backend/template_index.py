@@ -0,0 +1,79 @@
+# backend/template_index.py
+"""
+Compiled-template sidecar files (data/blobs/{sha}/template.index.json) and the reader
+for version 1 indexes: paragraph-level slots in word/document.xml, written by releases
+before ooxml_engine. Templates compiled since are version 2 and filled by ooxml_engine;
+the version 1 compiler lives on in benchmarks/legacy_v1.py.
+"""
+import json, os
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from cache import LRUCache
+from docx_zip import main_part_name, read_part, rewrite_parts
+
+W_P = qn("w:p")
+
+def index_path_for(docx_path: str) -> str:
+    """Sidecar file holding the compiled template, e.g. data/{id}_work.index.json"""
+    return os.path.splitext(docx_path)[0] + ".index.json"
+
+def render_paragraph(entry: dict, mapping: dict[str, str]) -> str:
+    """Template text of one indexed paragraph with every filled slot substituted."""
+    text, out, last = entry["text"], [], 0
+    for a, b, k in entry["slots"]:
+        v = mapping.get(k)
+        out.append(text[last:a])
+        out.append(str(v) if v else k)
+        last = b
+    out.append(text[last:])
+    return "".join(out)
+
+def fill_element(root, index: dict, mapping: dict[str, str], changed=None):
+    """Rewrite the affected w:p elements under a w:document root (python-docx oxml tree)."""
+    keys = mapping.keys() if changed is None else changed
+    targets = sorted({j for k in keys for j in index["keys"].get(k, [])})
+    if not targets:
+        return
+    elems = list(root.iter(W_P))
+    for j in targets:
+        entry = index["paragraphs"][j]
+        p = Paragraph(elems[entry["p"]], None)
+        p.clear()
+        p.add_run(render_paragraph(entry, mapping))
+
+def fill_package(src, index: dict, mapping: dict[str, str]) -> bytes:
+    """
+    Filled DOCX bytes for a template (path or bytes) without python-docx's package model:
+    only the main document part is parsed and re-serialized; every other ZIP entry is
+    copied compressed, byte for byte.
+    """
+    name = main_part_name(src)
+    root = parse_xml(read_part(src, name))
+    fill_element(root, index, mapping, index["keys"].keys())
+    return rewrite_parts(src, {name: serialize_part_xml(root)})
+
+def save_index(path: str, index: dict):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+
+def load_index(path: str) -> dict | None:
+    # Sessions created before compiled templates existed have no sidecar
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+_INDEXES = LRUCache(max_items=256)
+
+def cached_index(path: str) -> dict | None:
+    """load_index for hot paths; a compiled template never changes once written. Do not mutate."""
+    index = _INDEXES.get(path)
+    if index is None:
+        index = load_index(path)
+        if index is not None:
+            _INDEXES.set(path, index)
+    return index
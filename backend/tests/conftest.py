@@ -0,0 +1,46 @@
+import os, sys, tempfile
+import pytest
+from docx import Document
+
+# app.py uses ./app.db and ./data relative to the cwd; keep test runs out of the repo copies
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.chdir(tempfile.mkdtemp(prefix="lexsy-tests-"))
+
+@pytest.fixture
+def make_docx(tmp_path):
+    """Write a small DOCX with the given body paragraphs and optional table rows."""
+    def _make(paragraphs, table=None, name="t.docx"):
+        d = Document()
+        for t in paragraphs:
+            d.add_paragraph(t)
+        if table:
+            tbl = d.add_table(rows=len(table), cols=len(table[0]))
+            for r, row in enumerate(table):
+                for c, t in enumerate(row):
+                    tbl.cell(r, c).text = t
+        path = tmp_path / name
+        d.save(path)
+        return str(path)
+    return _make
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app import app
+    return TestClient(app)
+
+@pytest.fixture
+def upload(client):
+    """
+    POST a DOCX path to /api/upload and return the JSON body. client= posts through another
+    TestClient (one entered with `with`, so background renders run); session_id= adds the
+    document to that session's bundle; response=True returns the response itself.
+    """
+    def _upload(path, session_id=None, filename="t.docx", client=client, response=False):
+        with open(path, "rb") as f:
+            res = client.post("/api/upload", files={"file": (filename, f.read(), "application/octet-stream")},
+                              data={"session_id": session_id} if session_id else {})
+        assert res.status_code == 200, res.text
+        return res if response else res.json()
+    return _upload
@@ -1,6 +1,7 @@
 # backend/tests/test_api.py
+import json
 from fastapi.testclient import TestClient
-from app import app
+from app import app, placeholder_type_guess
 
 client = TestClient(app)
 
@@ -8,3 +9,142 @@ def test_upload_rejects_non_docx():
     res = client.post("/api/upload", files={"file": ("x.txt", b"hi", "text/plain")})
     assert res.status_code == 400
     assert res.json()["detail"] == "Only .docx supported"
+
+def test_type_guess_matches_whole_words():
+    types = {k: placeholder_type_guess(k) for k in ["[Purchase Amount]", "[Valuation Cap]", "[Date of Safe]", "[Company Name]",
+                                                    "[State of Incorporation]", "[Principal Office Address]", "[Capital Stock]"]}
+    assert types == {"[Purchase Amount]": "MONEY", "[Valuation Cap]": "MONEY", "[Date of Safe]": "DATE",
+                     "[Company Name]": "COMPANY", "[State of Incorporation]": "TEXT",
+                     "[Principal Office Address]": "TEXT", "[Capital Stock]": "TEXT"}
+
+def test_upload_fill_and_refill(make_docx, upload):
+    up = upload(make_docx(["Between [Company Name] and [Investor Name].", "Signed: [Investor Name]"]))
+    sid = up["session_id"]
+    assert [p["key"] for p in up["placeholders"]] == ["[Company Name]", "[Investor Name]"]
+    assert set(up["timings"]) == {"read", "parse", "scan", "index", "save", "preview", "total"}
+
+    assert client.post("/api/fill", data={"session_id": sid, "key": "[Investor Name]", "value": "Jane Doe"}).json() == {"ok": True}
+    client.post("/api/fill", data={"session_id": sid, "key": "Investor Name", "value": "John Roe"})
+    html = client.get("/api/render", params={"session_id": sid}).json()["html"]
+    assert "Signed: John Roe" in html and "Jane Doe" not in html
+    assert "data-key='[Company Name]'" in html
+
+def test_fill_bulk_matches_exact_and_normalized_keys(make_docx, upload):
+    sid = upload(make_docx(["[Company Name] / [Investor Name] / [Purchase Amount]"]))["session_id"]
+    mapping = {"Company Name": "ACME", "[Investor Name]": "Jane Doe", "[Unknown]": "x"}
+    assert client.post("/api/fill-bulk", data={"session_id": sid, "mapping_json": json.dumps(mapping)}).json() == {"ok": True}
+    rows = {p["key"]: p["value"] for p in client.get("/api/placeholders", params={"session_id": sid}).json()}
+    assert rows == {"[Company Name]": "ACME", "[Investor Name]": "Jane Doe", "[Purchase Amount]": None}
+    assert client.post("/api/fill", data={"session_id": sid, "key": "[Unknown]", "value": "x"}).status_code == 404
+
+def test_background_upload_job(make_docx):
+    import time
+    with open(make_docx(["Dear [Investor Name],"]), "rb") as f:
+        raw = f.read()
+    with TestClient(app) as c:  # keep one event loop alive for the background task
+        res = c.post("/api/upload?background=true", files={"file": ("t.docx", raw, "application/octet-stream")})
+        assert res.status_code == 202
+        job_id, sid = res.json()["job_id"], res.json()["session_id"]
+        for _ in range(200):
+            job = c.get(f"/api/jobs/{job_id}").json()
+            if job["status"] in ("done", "error"): break
+            time.sleep(0.05)
+    assert job["status"] == "done" and job["result"]["session_id"] == sid
+    assert [p["key"] for p in client.get("/api/placeholders", params={"session_id": sid}).json()] == ["[Investor Name]"]
+
+def test_job_registry_is_capped(monkeypatch):
+    import pytest, workers
+    monkeypatch.setattr(workers, "JOBS", {})
+    monkeypatch.setattr(workers, "MAX_JOBS", 10)
+    jobs = [workers.new_job("t") for _ in range(10)]
+    with pytest.raises(workers.JobsFull):   # all queued: nothing to evict
+        workers.new_job("t")
+    jobs[0]["status"] = "done"
+    workers.new_job("t")
+    assert len(workers.JOBS) == 10 and jobs[0]["id"] not in workers.JOBS
+
+def test_download_materializes_filled_docx_in_memory(make_docx, upload):
+    import io
+    from docx import Document
+    from app import DOWNLOAD_CACHE
+    sid = upload(make_docx(["Purchaser: [Purchaser Name]", "Again [Purchaser Name]"]))["session_id"]
+    client.post("/api/fill", data={"session_id": sid, "key": "[Purchaser Name]", "value": "Jane Doe"})
+
+    hits = DOWNLOAD_CACHE.hits
+    first = client.get("/api/download", params={"session_id": sid})
+    second = client.get("/api/download", params={"session_id": sid})
+    assert first.content == second.content and DOWNLOAD_CACHE.hits == hits + 1
+    assert [p.text for p in Document(io.BytesIO(first.content)).paragraphs] == ["Purchaser: Jane Doe", "Again Jane Doe"]
+
+def test_fills_coalesce_into_one_render_and_accept_all(make_docx, upload):
+    from app import RENDERS
+    from models import Suggestion
+    from db import SessionLocal
+    with TestClient(app) as c:   # one event loop, so the debounced job runs in the background
+        sid = upload(make_docx(["[Company Name] / [Investor Name] / [Purchase Amount]"]), client=c)["session_id"]
+        runs = RENDERS.runs
+        for v in ("A", "AC", "ACM", "ACME"):
+            c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": v})
+        assert "ACME /" in c.get("/api/render", params={"session_id": sid}).json()["html"]
+        assert RENDERS.runs == runs + 1 and not RENDERS.pending(sid)
+
+        with SessionLocal() as db:
+            db.add_all([Suggestion(session_id=sid, key="[Investor Name]", value="Jane Doe"),
+                        Suggestion(session_id=sid, key="[Purchase Amount]", value="$5,000")])
+            db.commit()
+        res = c.post("/api/accept-suggestions", data={"session_id": sid}).json()
+        assert res["accepted"] == {"[Investor Name]": "Jane Doe", "[Purchase Amount]": "$5,000"}
+        assert "Jane Doe / $5,000" in c.get("/api/render", params={"session_id": sid}).json()["html"]
+        assert RENDERS.runs == runs + 2
+
+def test_accept_suggestions_takes_the_latest_and_skips_no_ops(make_docx, upload):
+    from datetime import datetime, timedelta
+    from models import Suggestion
+    from db import SessionLocal
+    with TestClient(app) as c:
+        sid = upload(make_docx(["[Investor Name] signs."]), client=c)["session_id"]
+        now = datetime.utcnow()
+        with SessionLocal() as db:   # ids are random: only the timestamps say which came last
+            db.add_all([Suggestion(id=f"z{sid}", session_id=sid, key="[Investor Name]", value="Old", created_at=now),
+                        Suggestion(id=f"a{sid}", session_id=sid, key="[Investor Name]", value="New", created_at=now + timedelta(seconds=1))])
+            db.commit()
+        res = c.post("/api/accept-suggestions", data={"session_id": sid})
+        assert res.json()["accepted"] == {"[Investor Name]": "New"} and res.headers["ETag"] == '"1"'
+        again = c.post("/api/accept-suggestions", data={"session_id": sid})
+        assert again.json()["accepted"] == {} and again.headers["ETag"] == '"1"'
+        assert c.post("/api/accept-suggestions", data={"session_id": sid}, headers={"If-Match": '"0"'}).status_code == 412
+
+def test_write_behind_runs_latest_state_once_per_burst():
+    import asyncio
+    from cache import WriteBehind
+    state, seen = {"v": 0}, []
+    async def job(key):
+        seen.append(state["v"])
+    async def go():
+        wb = WriteBehind(job, delay=0.02)
+        for i in range(1, 6):
+            state["v"] = i; wb.mark("s")
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.05)
+        state["v"] = 9; wb.mark("s")
+        await wb.flush("s")
+        return wb
+    wb = asyncio.run(go())
+    assert seen == [5, 9] and wb.runs == 2 and wb.marks == 6
+
+def test_write_behind_logs_and_counts_failed_jobs(caplog):
+    import asyncio, metrics
+    from cache import WriteBehind
+    async def job(key):
+        raise RuntimeError("boom")
+    async def go():
+        wb = WriteBehind(job, delay=0)
+        wb.mark("s")
+        await wb.flush("s")
+        return wb
+    before = metrics.WRITE_BEHIND_ERRORS.values.get((), 0)
+    wb = asyncio.run(go())
+    assert wb.errors == 1
+    if metrics.ENABLED:   # LEXSY_METRICS=0 leaves the counters empty
+        assert metrics.WRITE_BEHIND_ERRORS.values[()] == before + 1
+    assert "write-behind job failed for s" in caplog.text and "boom" in caplog.text
@@ -0,0 +1,42 @@
+import io, zipfile
+from docx import Document
+
+def test_batch_streams_one_docx_per_row(make_docx, client, upload):
+    sid = upload(make_docx(["[Company Name] issues a SAFE to [Investor Name]."]))["session_id"]
+    client.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"})
+    rows = "Investor Name,filename\nJane Doe,jane\nJohn Roe,\n"
+    res = client.post("/api/batch", data={"session_id": sid}, files={"rows": ("rows.csv", rows.encode(), "text/csv")})
+    assert res.status_code == 200 and res.headers["content-type"] == "application/zip"
+
+    zf = zipfile.ZipFile(io.BytesIO(res.content))
+    assert zf.namelist() == ["jane.docx", "document_002.docx"]
+    texts = [Document(io.BytesIO(zf.read(n))).paragraphs[0].text for n in zf.namelist()]
+    assert texts == ["ACME issues a SAFE to Jane Doe.", "ACME issues a SAFE to John Roe."]
+
+def test_batch_fills_every_bundle_document_per_row(make_docx, client, upload):
+    sid = upload(make_docx(["[Company Name] issues a SAFE to [Investor Name]."]))["session_id"]
+    upload(make_docx(["Side letter for [Investor Name]."], name="letter.docx"), session_id=sid, filename="letter.docx")
+    client.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"})
+    rows = '{"Investor Name": "Jane Doe", "filename": "jane"}\n'
+    res = client.post("/api/batch", data={"session_id": sid}, files={"rows": ("rows.jsonl", rows.encode(), "application/json")})
+
+    zf = zipfile.ZipFile(io.BytesIO(res.content))
+    assert zf.namelist() == ["t/jane.docx", "letter/jane.docx"]
+    texts = [Document(io.BytesIO(zf.read(n))).paragraphs[0].text for n in zf.namelist()]
+    assert texts == ["ACME issues a SAFE to Jane Doe.", "Side letter for Jane Doe."]
+
+def test_batch_rows_ship_the_template_path_not_its_bytes(make_docx, client, upload, monkeypatch):
+    import app, workers
+    sid = upload(make_docx(["Dear [Investor Name],", "ship-path"]))["session_id"]
+    sent = []
+    real = app.run_cpu
+    async def spy(fn, *args):
+        sent.append(args)
+        return await real(fn, *args)
+    monkeypatch.setattr(app, "run_cpu", spy)
+    rows = "Investor Name\nA\nB\n"
+    res = client.post("/api/batch", data={"session_id": sid}, files={"rows": ("rows.csv", rows.encode(), "text/csv")})
+    assert len(zipfile.ZipFile(io.BytesIO(res.content)).namelist()) == 2
+    assert len(sent) == 2 and all(isinstance(a[0], str) and not isinstance(a[1], bytes) for a in sent)
+    path = sent[0][0]
+    assert workers.template_bytes(path) is workers.template_bytes(path)   # read once per worker
@@ -0,0 +1,22 @@
+# backend/tests/test_bench_suite.py
+import io
+from docx import Document
+from benchmarks.corpus import make_docx, named_keys, variant
+from benchmarks.suite import compare
+from docx_parser import find_placeholders
+
+def test_corpus_documents_have_the_requested_shape(tmp_path):
+    raw = make_docx(paragraphs=30, named=12, blanks=3, tables=2, images=2, seed=7)
+    assert raw == make_docx(paragraphs=30, named=12, blanks=3, tables=2, images=2, seed=7)   # seeded
+    d = Document(io.BytesIO(raw))
+    assert len(d.tables) == 2 and len(d.inline_shapes) == 2
+    assert 'gridSpan' in d.tables[0]._tbl.xml and 'vMerge' in d.tables[0]._tbl.xml   # merged cells
+    path = tmp_path / "c.docx"
+    path.write_bytes(variant(raw, 1))
+    keys = find_placeholders(str(path))
+    assert set(named_keys(12)) <= set(keys) and len(keys) > 12
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"a": 100.0, "b": 1.0, "c": 10.0}
+    results = {"a": 130.0, "b": 1.9, "c": 11.0, "d": 50.0}
+    assert compare(results, baseline, threshold=0.25, floor=2.0) == ["a"]
@@ -0,0 +1,41 @@
+import os
+from datetime import timedelta
+import blob_store
+from db import SessionLocal
+
+def test_repeat_upload_shares_blob(make_docx, client, upload):
+    path = make_docx(["Hello [Investor Name] from [Company Name]."])
+    a, b = upload(path), upload(path)
+    assert b["cached"] and b["placeholders"] == a["placeholders"]
+
+    client.post("/api/fill", data={"session_id": a["session_id"], "key": "[Investor Name]", "value": "Jane"})
+    html_a = client.get("/api/render", params={"session_id": a["session_id"]}).json()["html"]
+    html_b = client.get("/api/render", params={"session_id": b["session_id"]}).json()["html"]
+    assert "Hello Jane" in html_a and "Jane" not in html_b
+    assert not any(n.endswith("_work.docx") for n in os.listdir("data"))
+
+def test_blob_collected_when_last_session_is_deleted(make_docx, client, upload):
+    sid = upload(make_docx(["Only [Secret Key] here."]))["session_id"]
+    db = SessionLocal()
+    from models import Document
+    sha = blob_store.sha_for_path(db.query(Document).filter(Document.session_id == sid).one().original_docx_path)
+    assert client.delete("/api/session", params={"session_id": sid}).json() == {"ok": True}
+    assert os.path.isdir(blob_store.blob_dir(sha))  # still inside the grace period
+    assert blob_store.collect_garbage(db, grace=timedelta(0)) == [sha]
+    assert not os.path.exists(blob_store.blob_dir(sha))
+    db.close()
+
+def test_startup_gc_collects_blobs_released_long_ago(make_docx, client, upload, monkeypatch):
+    import asyncio, app
+    from datetime import datetime
+    from models import Document, TemplateBlob
+    sid = upload(make_docx(["Lonely [Orphan Key] here."]))["session_id"]
+    with SessionLocal() as db:
+        sha = blob_store.sha_for_path(db.query(Document).filter(Document.session_id == sid).one().original_docx_path)
+    client.delete("/api/session", params={"session_id": sid})
+    with SessionLocal() as db:   # released two hours ago, and no deletion since
+        db.query(TemplateBlob).filter(TemplateBlob.sha256 == sha).update({TemplateBlob.released_at: datetime.utcnow() - timedelta(hours=2)})
+        db.commit()
+    monkeypatch.setattr(blob_store, "GC_INTERVAL", 0)   # one pass, as on startup
+    asyncio.run(app.collect_blobs())
+    assert not os.path.exists(blob_store.blob_dir(sha))
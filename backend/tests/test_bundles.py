@@ -0,0 +1,55 @@
+# backend/tests/test_bundles.py
+import io, uuid, zipfile
+from fastapi.testclient import TestClient
+from docx import Document
+from app import app
+
+def _doc(make_docx, paragraphs):
+    return make_docx(paragraphs + [uuid.uuid4().hex])   # unique bytes: no upload cache hit
+
+def _text(data: bytes) -> str:
+    return "\n".join(p.text for p in Document(io.BytesIO(data)).paragraphs)
+
+def test_bundle_shares_placeholders_across_documents(make_docx, upload):
+    with TestClient(app) as c:
+        safe = upload(_doc(make_docx, ["[Company Name] issues to [Investor Name]."]), filename="safe.docx", client=c)
+        sid = safe["session_id"]
+        c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"})
+        letter = upload(_doc(make_docx, ["Side letter from [Company Name] on [Date]."]), session_id=sid, filename="letter.docx", client=c)
+        other = upload(_doc(make_docx, ["Board consent for [Investor Name]."]), session_id=sid, filename="consent.docx", client=c)
+        assert letter["shared"] == ["[Company Name]"] and other["shared"] == ["[Investor Name]"]
+
+        docs = c.get("/api/documents", params={"session_id": sid}).json()
+        assert [d["filename"] for d in docs] == ["safe.docx", "letter.docx", "consent.docx"]
+        rows = {p["key"]: p for p in c.get("/api/placeholders", params={"session_id": sid}).json()}
+        assert set(rows) == {"[Company Name]", "[Investor Name]", "[Date]"}
+        assert rows["[Investor Name]"]["documents"] == [docs[0]["id"], docs[2]["id"]]
+
+        # joined after the fill: rendered with the session's values
+        assert "ACME" in c.get("/api/render", params={"session_id": sid, "document_id": letter["document_id"]}).json()["html"]
+        c.post("/api/fill", data={"session_id": sid, "key": "[Investor Name]", "value": "Jane Doe"})
+        previews = [c.get("/api/render", params={"session_id": sid, "document_id": d["id"]}).json() for d in docs]
+        assert "Jane Doe" in previews[0]["html"] and "Jane Doe" in previews[2]["html"]
+        assert "Jane Doe" not in previews[1]["html"] and "ACME" in previews[1]["html"]
+        assert len({p["version"] for p in previews}) == 1   # the bundle moves in lockstep
+
+        delta = c.get("/api/render/delta", params={"session_id": sid, "since": 0, "document_id": letter["document_id"]}).json()
+        assert set(delta["changes"]) == {"[Company Name]"}
+
+def test_download_streams_the_bundle_as_a_zip(make_docx, upload):
+    with TestClient(app) as c:
+        sid = upload(_doc(make_docx, ["[Company Name] and [Investor Name]."]), filename="safe.docx", client=c)["session_id"]
+        letter = upload(_doc(make_docx, ["Letter to [Investor Name]."]), session_id=sid, filename="safe.docx", client=c)
+        c.post("/api/fill-bulk", data={"session_id": sid, "mapping_json": '{"[Company Name]": "ACME", "[Investor Name]": "Jane"}'})
+
+        res = c.get("/api/download", params={"session_id": sid})
+        assert res.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(res.content)) as z:
+            assert z.namelist() == ["safe.docx", "safe_2.docx"]
+            assert "ACME and Jane." in _text(z.read("safe.docx")) and "Letter to Jane." in _text(z.read("safe_2.docx"))
+
+        one = c.get("/api/download", params={"session_id": sid, "document_id": letter["document_id"]})
+        assert "Letter to Jane." in _text(one.content)
+        assert c.get("/api/download", params={"session_id": sid, "document_id": "nope"}).status_code == 404
+        assert c.post("/api/upload", files={"file": ("x.docx", b"x", "application/octet-stream")},
+                      data={"session_id": "nope"}).status_code == 404
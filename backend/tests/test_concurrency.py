@@ -0,0 +1,132 @@
+# backend/tests/test_concurrency.py
+import asyncio, multiprocessing, os, time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from app import app
+
+def test_if_match_guards_against_stale_writes(make_docx, upload):
+    with TestClient(app) as c:
+        sid = upload(make_docx(["[Company Name]"]), client=c)["session_id"]
+        res = c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"}, headers={"If-Match": '"0"'})
+        assert res.status_code == 200 and res.headers["ETag"] == '"1"'
+        stale = c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "OTHER"}, headers={"If-Match": '"0"'})
+        assert stale.status_code == 412
+        page = c.get("/api/render", params={"session_id": sid}).json()
+        assert page["version"] == 1 and "ACME" in page["html"] and "OTHER" not in page["html"]
+
+def test_parallel_fills_lose_no_updates(make_docx, upload, monkeypatch):
+    import app as app_module
+    keys = [f"[Field {i}]" for i in range(16)]
+    active, peak, bump = [0], [0], app_module.bump_version
+
+    def counting_bump(*args):
+        # fills only race if their transactions really overlap in the database
+        active[0] += 1; peak[0] = max(peak[0], active[0])
+        try: return bump(*args)
+        finally: active[0] -= 1
+    monkeypatch.setattr(app_module, "bump_version", counting_bump)
+
+    with TestClient(app) as c:
+        sid = upload(make_docx([" / ".join(keys)]), client=c)["session_id"]
+
+        def writer(n: int) -> int:
+            """Four rounds over this writer's two keys; odd writers use If-Match and retry on 412."""
+            writes = 0
+            for r in range(4):
+                for key in keys[2 * n:2 * n + 2]:
+                    data = {"session_id": sid, "key": key, "value": f"{key[1:-1]} r{r}"}
+                    while True:
+                        headers = {}
+                        if n % 2:
+                            headers["If-Match"] = str(c.get("/api/render", params={"session_id": sid}).json()["version"])
+                        res = c.post("/api/fill", data=data, headers=headers)
+                        if res.status_code != 412:
+                            assert res.status_code == 200
+                            writes += 1
+                            break
+            return writes
+
+        with ThreadPoolExecutor(8) as pool:
+            total = sum(pool.map(writer, range(8)))
+        page = c.get("/api/render", params={"session_id": sid}).json()
+        values = {p["key"]: p["value"] for p in c.get("/api/placeholders", params={"session_id": sid}).json()}
+    assert peak[0] > 1
+    assert total == 64 and page["version"] == 64
+    assert values == {k: f"{k[1:-1]} r3" for k in keys}
+    assert all(f"{k[1:-1]} r3" in page["html"] for k in keys)
+
+def test_locked_database_does_not_stall_the_loop_and_maps_to_503(make_docx, upload):
+    import sqlite3, threading, db
+    busy, db.SQLITE_BUSY_TIMEOUT_MS = db.SQLITE_BUSY_TIMEOUT_MS, 1000
+    db.engine.dispose()   # new connections pick up the shorter busy_timeout
+    try:
+        with TestClient(app) as c:
+            sid = upload(make_docx(["[Company Name]"]), client=c)["session_id"]
+            holder = sqlite3.connect("app.db", isolation_level=None)
+            holder.execute("BEGIN IMMEDIATE")   # another writer holds the lock
+            res = {}
+            t = threading.Thread(target=lambda: res.update(
+                fill=c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"})))
+            t.start()
+            try:
+                time.sleep(0.2)
+                t0 = time.perf_counter()
+                assert c.get("/api/jobs/none").status_code == 404
+                assert time.perf_counter() - t0 < 0.5   # served while the fill waits on the lock
+            finally:
+                t.join()
+                holder.rollback(); holder.close()
+            assert res["fill"].status_code == 503 and res["fill"].headers["Retry-After"] == "1"
+            assert c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"}).status_code == 200
+    finally:
+        db.SQLITE_BUSY_TIMEOUT_MS = busy
+        db.engine.dispose()
+
+def _hold(session_id: str, data_dir: str, ready, seconds: float):
+    os.chdir(data_dir)
+    from session_lock import session_lock
+    async def go():
+        async with session_lock(session_id):
+            ready.set()
+            await asyncio.sleep(seconds)
+    asyncio.run(go())
+
+def test_session_lock_excludes_other_processes():
+    from session_lock import session_lock
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Event()
+    proc = ctx.Process(target=_hold, args=("s-lock", os.getcwd(), ready, 0.5))
+    proc.start()
+    assert ready.wait(30)
+    async def contend():
+        t0 = time.perf_counter()
+        async with session_lock("s-lock", timeout=10):
+            return time.perf_counter() - t0
+    waited = asyncio.run(contend())
+    proc.join()
+    assert waited > 0.2
+
+def test_delete_session_removes_its_lock_file(make_docx, upload, client):
+    from session_lock import lock_path
+    sid = upload(make_docx(["Dear [Investor Name],"]))["session_id"]
+    client.post("/api/fill", data={"session_id": sid, "key": "[Investor Name]", "value": "Jane"})
+    client.get("/api/render", params={"session_id": sid})
+    assert os.path.exists(lock_path(sid))
+    client.delete("/api/session", params={"session_id": sid})
+    assert not os.path.exists(lock_path(sid))
+
+def test_waiter_on_an_unlinked_lock_file_moves_to_the_new_one():
+    import session_lock
+    from session_lock import file_lock, remove_lock, lock_path, _attempt
+    with file_lock("s-unlink"):
+        pass
+    stale = os.open(lock_path("s-unlink"), os.O_RDWR)   # opened just before the unlink
+    remove_lock("s-unlink")
+    with file_lock("s-unlink"):   # a fresh opener holds the new file
+        fd, locked = _attempt(stale, lock_path("s-unlink"))
+        assert not locked and os.path.samestat(os.fstat(fd), os.stat(lock_path("s-unlink")))   # reopened
+        fd, locked = _attempt(fd, lock_path("s-unlink"))
+        assert not locked   # the live file is held
+    fd, locked = _attempt(fd, lock_path("s-unlink"))
+    assert locked
+    session_lock._unlock(fd); os.close(fd)
@@ -0,0 +1,45 @@
+# backend/tests/test_db.py
+from sqlalchemy import inspect, text
+from db import make_engine, migrate
+from render_service import unpack_preview
+
+def test_sqlite_engine_uses_wal_and_pragmas(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/t.db")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1   # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+    engine.dispose()
+
+def test_request_sessions_return_connections(client, upload, make_docx):
+    from db import engine
+    sid = upload(make_docx(["[Company Name] and [Investor Name]"]))["session_id"]
+    for _ in range(3):
+        assert client.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"}).status_code == 200
+        assert client.get("/api/placeholders", params={"session_id": sid}).status_code == 200
+    assert engine.pool.checkedout() == 0
+
+def test_migrate_upgrades_a_pre_migration_database(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as conn:   # what create_all produced before migrations / template_blobs
+        conn.execute(text("CREATE TABLE sessions (id VARCHAR PRIMARY KEY, original_filename VARCHAR, status VARCHAR)"))
+        conn.execute(text("CREATE TABLE placeholders (id VARCHAR PRIMARY KEY, session_id VARCHAR, key VARCHAR, "
+                          "normalized_key VARCHAR, is_filled BOOLEAN, value TEXT)"))
+        conn.execute(text("CREATE INDEX ix_placeholders_session_id ON placeholders (session_id)"))
+        conn.execute(text("CREATE TABLE suggestions (id VARCHAR PRIMARY KEY, session_id VARCHAR, key VARCHAR, value TEXT, status VARCHAR)"))
+        conn.execute(text("CREATE TABLE documents (id VARCHAR PRIMARY KEY, session_id VARCHAR, original_docx_path VARCHAR, "
+                          "working_docx_path VARCHAR, html_preview TEXT)"))
+        conn.execute(text("INSERT INTO documents (id, session_id, html_preview) VALUES ('d', 's', '<p>[Name]</p>')"))
+        conn.execute(text("INSERT INTO sessions (id, original_filename) VALUES ('s', 'safe.docx')"))
+        conn.execute(text("INSERT INTO placeholders (id, session_id, key, normalized_key) VALUES ('p', 's', '[Name]', 'name')"))
+    migrate(engine)
+    insp = inspect(engine)
+    columns = [c["name"] for c in insp.get_columns("documents")]
+    assert insp.has_table("template_blobs") and "version" in columns and "html_preview" not in columns
+    with engine.connect() as conn:
+        blob = conn.execute(text("SELECT preview_gz FROM documents")).scalar()
+    assert unpack_preview(blob) == {"html": "<p>[Name]</p>", "version": 0, "slots": None}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT filename, position, keys FROM documents")).one() == ("safe.docx", 0, '["[Name]"]')
+    assert [i["name"] for i in insp.get_indexes("placeholders")] == ["ix_placeholders_session_normalized"]
+    engine.dispose()
@@ -0,0 +1,40 @@
+# backend/tests/test_extraction.py
+from datetime import date
+from extraction import extract, extract_json_object, fallback_values, normalize_date_phrase, normalize_money
+
+PENDING = [{"key": "[Company Name]", "type": "COMPANY", "hint": ""},
+           {"key": "[Investor Name]", "type": "PERSON", "hint": ""},
+           {"key": "[Purchase Amount]", "type": "MONEY", "hint": "purchase amount"},
+           {"key": "[Post-Money Valuation Cap]", "type": "MONEY", "hint": "valuation cap"},
+           {"key": "[Date of Safe]", "type": "DATE", "hint": ""},
+           {"key": "[State of Incorporation]", "type": "TEXT", "hint": ""}]
+
+def test_normalizers():
+    assert [normalize_money(s) for s in ("4000 $", "$4,000.50", "4k", "10 million")] == \
+        ["$4,000", "$4,000.50", "$4,000", "$10,000,000"]
+    today = date(2025, 6, 1)
+    assert normalize_date_phrase("1st jan last year", today) == "January 1, 2024"
+    assert normalize_date_phrase("March 3, 2023", today) == "March 3, 2023"
+    assert normalize_date_phrase("2025-02-01", today) == "February 1, 2025"
+    assert normalize_date_phrase("nothing here", today) == "nothing here"
+
+def test_one_message_fills_several_placeholders():
+    values, ambiguous = extract("Acme Robotics, Inc. and investor Jane Doe: purchase amount $50k, "
+                                "valuation cap 10M, signed March 3, 2025", PENDING)
+    assert not ambiguous
+    assert values == {"[Company Name]": "ACME ROBOTICS, INC.", "[Investor Name]": "Jane Doe",
+                      "[Purchase Amount]": "$50,000", "[Post-Money Valuation Cap]": "$10,000,000",
+                      "[Date of Safe]": "March 3, 2025"}
+    assert extract("[State of Incorporation]: Delaware", PENDING) == ({"[State of Incorporation]": "Delaware"}, False)
+
+def test_unplaceable_content_is_ambiguous():
+    assert extract("$5,000", PENDING).ambiguous                        # two money keys, no label
+    assert extract("State of incorporation is Delaware", PENDING).ambiguous
+    values, ambiguous = extract("investor Jane Doe, company is acme", PENDING)
+    assert values == {"[Investor Name]": "Jane Doe"} and ambiguous     # company mentioned, not found
+    assert fallback_values("$5,000", PENDING) == {"[Purchase Amount]": "$5,000"}
+
+def test_extract_json_object():
+    assert extract_json_object('Sure:\n```json\n{"a": {"b": 1}, "c": "}"}\n```') == {"a": {"b": 1}, "c": "}"}
+    assert extract_json_object('{"a": "1", "b": "trunc') == {"a": "1"}
+    assert extract_json_object("[1, 2]") == {} and extract_json_object("no json") == {}
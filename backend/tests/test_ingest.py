@@ -0,0 +1,18 @@
+import hashlib
+from docx import Document
+from docx_parser import find_placeholders
+from ingest import ingest_upload
+from template_index import index_path_for, load_index
+
+def test_ingest_matches_multi_pass_upload(make_docx, tmp_path):
+    src = make_docx(["Pay $[_____] (the “Purchase Amount”) to [Company Name]."], table=[["[Investor Name]", ""]])
+    raw = open(src, "rb").read()
+    orig, work = str(tmp_path / "s_orig.docx"), str(tmp_path / "s_work.docx")
+    with open(src, "rb") as f:
+        ing = ingest_upload(f, orig, work)
+
+    assert ing["sha256"] == hashlib.sha256(raw).hexdigest() and ing["size"] == len(raw)
+    assert open(orig, "rb").read() == raw
+    assert ing["keys"] == find_placeholders(src) == ["[Purchase Amount]", "[Company Name]", "[Investor Name]"]
+    assert Document(work).paragraphs[0].text == "Pay $[Purchase Amount] (the “Purchase Amount”) to [Company Name]."
+    assert load_index(index_path_for(work))["preview"]["slots"] == ing["keys"]
@@ -0,0 +1,142 @@
+# backend/tests/test_llm_client.py
+import asyncio, json
+import httpx, pytest
+import llm_client, llm_stub, metrics
+from llm_client import LLMClient, ClientDisconnected, unless_disconnected
+
+def stub_client(**kw):
+    return LLMClient("http://stub/v1", transport=httpx.ASGITransport(app=llm_stub.create_app(delay=0)), **kw)
+
+@pytest.fixture
+def stub_backend():
+    llm_client.set_client(stub_client())
+    yield
+    llm_client.set_client(None)
+
+def test_complete_against_stub():
+    async def go():
+        c = stub_client()
+        try:
+            return await c.complete([{"role": "user", "content": "User message:\n[Company Name]: Acme Labs"}])
+        finally:
+            await c.aclose()
+    assert json.loads(asyncio.run(go())) == {"[Company Name]": "Acme Labs"}
+
+def test_retries_transient_status_then_succeeds():
+    seen = []
+    def handler(request):
+        seen.append(request)
+        if len(seen) == 1:
+            return httpx.Response(503, headers={"retry-after": "0"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": " {} "}}]})
+    async def go():
+        c = LLMClient("http://x/v1", transport=httpx.MockTransport(handler), retries=1)
+        try:
+            return await c.complete([])
+        finally:
+            await c.aclose()
+    assert asyncio.run(go()) == "{}" and len(seen) == 2
+
+def test_failed_calls_and_retries_are_counted():
+    c = LLMClient("http://x/v1", transport=httpx.MockTransport(lambda r: httpx.Response(502, headers={"retry-after": "0"})), retries=1)
+    async def go():
+        try:
+            await c.complete([])
+        finally:
+            await c.aclose()
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(go())
+    assert c.errors == 1
+    if metrics.ENABLED:   # LEXSY_METRICS=0 leaves the counters empty
+        text = metrics.exposition()
+        assert 'lexsy_llm_errors_total{call="complete",reason="502"}' in text
+        assert 'lexsy_llm_retries_total{reason="502"}' in text
+
+def test_stream_is_bounded_by_the_call_deadline():
+    c = LLMClient("http://stub/v1", transport=httpx.ASGITransport(app=llm_stub.create_app(delay=0, token_delay=0.05)), timeout=0.2)
+    async def go():
+        got = []
+        try:
+            async for delta in c.stream([{"role": "user", "content": "User message:\n[Company Name]: " + "Acme " * 40}]):
+                got.append(delta)
+        finally:
+            await c.aclose()
+        return got
+    with pytest.raises(TimeoutError):
+        asyncio.run(go())
+    assert c.errors == 1 and c._sem._value == c.max_concurrency
+
+def test_disconnect_cancels_upstream_call():
+    cancelled = asyncio.Event()
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set(); raise
+    async def gone():
+        return True
+    async def go():
+        with pytest.raises(ClientDisconnected):
+            await unless_disconnected(slow(), gone, poll=0.01)
+        await asyncio.sleep(0)
+        return cancelled.is_set()
+    assert asyncio.run(go())
+
+def test_chat_uses_pluggable_backend(make_docx, upload, stub_backend):
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as c:
+        sid = upload(make_docx(["Between [Company Name] and [Investor Name]."]), client=c)["session_id"]
+        res = c.post("/api/chat", data={"session_id": sid, "message": "[Investor Name]: Jane Doe\nSee Side Letter"}).json()
+    assert res["suggestions"] == {"[Investor Name]": "Jane Doe"}
+
+def test_single_flight_coalesces_and_survives_one_waiter_leaving():
+    from cache import SingleFlight
+    calls = []
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+    async def go():
+        sf = SingleFlight()
+        a = asyncio.ensure_future(sf.do("k", work))
+        b = asyncio.ensure_future(sf.do("k", work))
+        await asyncio.sleep(0.01)
+        a.cancel()
+        return await b, sf.coalesced
+    assert asyncio.run(go()) == ({"ok": True}, 1) and len(calls) == 1
+
+def test_repeated_chat_is_served_from_extraction_cache(make_docx, upload, stub_backend):
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as c:
+        sid = upload(make_docx(["Signed by [Signer Title]."]), client=c)["session_id"]
+        before = c.get("/api/chat/stats").json()
+        # "Board" can't be placed deterministically, so these go to the model
+        for msg in ("[Signer Title]: CEO\nper the Board", "  [Signer Title]:   CEO \n per the  Board"):
+            assert c.post("/api/chat", data={"session_id": sid, "message": msg}).json()["suggestions"] == {"[Signer Title]": "CEO"}
+        after = c.get("/api/chat/stats").json()
+    assert after["hits"] == before["hits"] + 1 and after["saved_seconds"] >= before["saved_seconds"]
+
+def test_object_stream_emits_pairs_as_values_close():
+    from json_stream import ObjectStream
+    p = ObjectStream()
+    assert p.feed('Here you go: {"[A]": "x, \\"y\\"", "[B]": 12') == [("[A]", 'x, "y"')]
+    assert p.feed('50, "[C]": null}') == [("[B]", 1250), ("[C]", None)] and p.done
+
+def test_chat_stream_sends_tokens_suggestions_then_done(make_docx, upload, stub_backend):
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as c:
+        sid = upload(make_docx(["[Investor Name] pays [Company Name]."]), client=c)["session_id"]
+        msg = "[Investor Name]: Jane Doe\n[Company Name]: ACME\nas agreed with Counsel"
+        with c.stream("POST", "/api/chat/stream", data={"session_id": sid, "message": msg}) as res:
+            assert res.headers["content-type"].startswith("text/event-stream")
+            events = [(e.split("\n")[0][7:], json.loads(e.split("\n")[1][6:]))
+                      for e in res.read().decode().split("\n\n") if e]
+    kinds = [k for k, _ in events]
+    assert kinds[0] == "token" and kinds[-1] == "done"
+    assert [d for k, d in events if k == "suggestion"] == [{"key": "[Investor Name]", "value": "Jane Doe"},
+                                                           {"key": "[Company Name]", "value": "ACME"}]
+    assert kinds.index("suggestion") < max(i for i, k in enumerate(kinds) if k == "token")  # before the model finished
+    assert events[-1][1]["suggestions"] == {"[Investor Name]": "Jane Doe", "[Company Name]": "ACME"}
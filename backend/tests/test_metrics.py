@@ -0,0 +1,29 @@
+# backend/tests/test_metrics.py
+import re, uuid
+import pytest
+from fastapi.testclient import TestClient
+import metrics
+from app import app
+
+@pytest.mark.skipif(not metrics.ENABLED, reason="LEXSY_METRICS=0")
+def test_server_timing_and_prometheus_metrics(make_docx, upload):
+    with TestClient(app) as c:
+        res = upload(make_docx(["Between [Company Name] and [Investor Name].", uuid.uuid4().hex]),   # not a cached blob
+                     client=c, response=True)
+        stages = dict(re.findall(r"(\w+);dur=([\d.]+)", res.headers["Server-Timing"]))
+        assert {"ingest_task", "ingest_parse", "db_query", "db_commit", "total"} <= set(stages)
+        sid = res.json()["session_id"]
+        c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"})
+        assert "render_preview" in c.get("/api/render", params={"session_id": sid}).headers["Server-Timing"]
+
+        text = c.get("/metrics").text
+    assert 'lexsy_request_seconds_bucket{method="GET",route="/api/render",status="200",le="+Inf"}' in text
+    assert 'lexsy_stage_seconds_count{stage="ingest_parse"}' in text
+    assert re.search(r"^lexsy_placeholders_total [1-9]", text, re.M)
+
+def test_disabled_metrics_leave_functions_untouched(monkeypatch):
+    def f(): return 1
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    assert metrics.timed("x")(f) is f and metrics.stage("x") is metrics.stage("y")
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    assert metrics.timed("x")(f) is not f and metrics.timed("x")(f)() == 1
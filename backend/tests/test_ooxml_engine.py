@@ -0,0 +1,53 @@
+import io, shutil
+from docx import Document
+from docx_parser import find_placeholders
+from ooxml_engine import compile_parts, fill_package, load_parts, rename_parts, save_parts
+from render_service import compile_preview, docx_to_html, render_preview_slots
+
+def _scan(path):
+    raw = open(path, "rb").read()
+    pkg = load_parts(raw)
+    keys = rename_parts(pkg)
+    working = save_parts(raw, pkg)
+    return keys, compile_parts(pkg, keys), working
+
+def test_scan_parity_with_python_docx_path(make_docx, tmp_path):
+    path = make_docx(["Pay $[_____] (the “Purchase Amount”) to [Company Name].", "[___] and [___]", "Nothing here"],
+                     table=[["[Investor Name]", "$[____] (the “Valuation Cap”)"]])
+    keys, _, working = _scan(path)
+    old = str(tmp_path / "old.docx"); shutil.copy(path, old)
+    assert keys == find_placeholders(old)
+
+    texts = lambda d: [p.text for p in d.paragraphs] + [c.text for r in d.tables[0].rows for c in r.cells]
+    assert texts(Document(io.BytesIO(working))) == texts(Document(old))
+
+def test_split_runs_and_headers_are_filled_with_formatting_kept(make_docx):
+    path = make_docx([])
+    d = Document(path)
+    p = d.add_paragraph("Company: ")
+    p.add_run("[Company").bold = True
+    p.add_run(" Name] signs.")
+    d.sections[0].header.paragraphs[0].text = "Confidential – [Company Name]"
+    d.save(path)
+
+    keys, index, working = _scan(path)
+    assert keys == ["[Company Name]"]
+    assert {e["part"] for e in index["nodes"]} == {"word/document.xml", "word/header1.xml"}
+
+    out = Document(io.BytesIO(fill_package(working, index, {"[Company Name]": "ACME"})))
+    runs = out.paragraphs[0].runs
+    assert out.paragraphs[0].text == "Company: ACME signs." and runs[1].text == "ACME" and runs[1].bold
+    assert out.sections[0].header.paragraphs[0].text == "Confidential – ACME"
+
+def test_slot_preview_matches_render_of_filled_package(make_docx):
+    path = make_docx([])
+    d = Document(path)
+    p = d.add_paragraph("Investor: ")
+    p.add_run("[Investor").italic = True
+    p.add_run(" Name]")
+    d.add_paragraph("Amount $[____] (the “Purchase Amount”)")
+    d.save(path)
+    keys, index, working = _scan(path)
+    preview = compile_preview(io.BytesIO(working), keys)
+    for mapping in ({}, {"[Investor Name]": "Jane <Doe>\nLine 2\tTabbed", "[Purchase Amount]": "$1,000"}):
+        assert render_preview_slots(preview, mapping)[0] == docx_to_html(io.BytesIO(fill_package(working, index, mapping)))
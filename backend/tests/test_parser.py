@@ -5,3 +5,26 @@ def test_placeholder_regex_basic(tmp_path):
     # You can add a small generated .docx here if time permits;
     # for now, ensure function runs (smoke test).
     assert callable(find_placeholders)
+
+def test_replacer_prefers_longest_key_regardless_of_order():
+    from placeholder_engine import compile_replacer
+    mapping = {"[Company Name]": "ACME", "[Company Name]#2": "BETA", "[Amount]": "[Company Name]"}
+    out = compile_replacer(mapping)("[Company Name]#2 / [Company Name] / [Amount]")
+    assert out == "BETA / ACME / [Company Name]"
+
+def test_generic_labels_use_quotes_tokens_and_previous_paragraph():
+    from docx_parser import placeholder_spans
+    keys = [k for _, _, k in placeholder_spans("Pay $[_____] (the “Purchase Amount”); then [____] and [____].")]
+    assert keys == ["[Purchase Amount]", "[Purchase Amount]#2", "[Purchase Amount]#3"]
+    assert [k for _, _, k in placeholder_spans("[_____]", "Company Address:")] == ["[Company Address]"]
+    # a previous paragraph with its own placeholders already spent its context
+    assert [k for _, _, k in placeholder_spans("[_____]", "Name: [Company Name]")] == ["[Blank]"]
+
+def test_neighbour_context_matches_between_engines(make_docx):
+    from ooxml_engine import load_parts, rename_parts
+    path = make_docx(["Date of Safe:", "[______]", "Investor", "[____] signs below."])
+    with open(path, "rb") as f:
+        raw = f.read()
+    keys = rename_parts(load_parts(raw))
+    assert keys == ["[Date Of Safe]", "[Investor]"]
+    assert find_placeholders(path) == keys
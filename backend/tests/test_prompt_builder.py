@@ -0,0 +1,24 @@
+# backend/tests/test_prompt_builder.py
+from placeholder_hints import generate_hint
+from prompt_builder import build_prompt
+
+def pending(keys):
+    from app import placeholder_type_guess
+    return [{"key": k, "type": placeholder_type_guess(k), "hint": generate_hint(k)} for k in keys]
+
+KEYS = ["[Company Name]", "[Investor Name]", "[Purchase Amount]", "[Valuation Cap]", "[Date of Safe]",
+        "[State of Incorporation]", "[Signer Title]"] + [f"[Blank]#{i}" for i in range(2, 60)]
+
+def test_money_message_keeps_money_candidates_in_document_order():
+    _, user, meta = build_prompt(pending(KEYS), "The purchase amount is $250,000")
+    rows = user.split("(key | type | hint):\n")[1].split("\n\n")[0].splitlines()
+    assert [r.split(" | ")[0] for r in rows] == ["[Purchase Amount]", "[Valuation Cap]"]
+    assert meta == {"tokens": meta["tokens"], "candidates": 2, "pending": len(KEYS)}
+
+def test_hints_sent_once_and_budget_respected():
+    _, user, meta = build_prompt(pending(KEYS), "hello there", budget=150)
+    hints = user.split("Hints:\n")[1].split("\n\n")[0].splitlines()
+    assert len(hints) == len(set(h.split(": ", 1)[1] for h in hints))
+    full = build_prompt(pending(KEYS), "hello there", budget=10**6)[2]
+    assert 0 < meta["candidates"] < full["candidates"] == len(KEYS)
+    assert meta["tokens"] < full["tokens"]
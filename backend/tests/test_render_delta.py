@@ -0,0 +1,56 @@
+# backend/tests/test_render_delta.py
+import gzip, json
+from fastapi.testclient import TestClient
+from app import app
+
+AGREEMENT = ["Between [Company Name] and [Investor Name].", "Signed: [Investor Name]", "Amount: [Purchase Amount]"]
+
+def _patch(page: dict, changes: dict) -> str:
+    """What the frontend does with a delta: splice fragments right to left, at UTF-16 indices like String.slice."""
+    html = page["html"].encode("utf-16-le")
+    for key, start, end in reversed(page["slots"]):
+        if key in changes:
+            html = html[:2 * start] + changes[key].encode("utf-16-le") + html[2 * end:]
+    return html.decode("utf-16-le")
+
+def test_render_answers_if_none_match_with_304(make_docx, upload):
+    with TestClient(app) as c:
+        sid = upload(make_docx(AGREEMENT), client=c)["session_id"]
+        first = c.get("/api/render", params={"session_id": sid})
+        assert first.headers["ETag"] == '"0"'
+        assert c.get("/api/render", params={"session_id": sid}, headers={"If-None-Match": '"0"'}).status_code == 304
+        c.post("/api/fill", data={"session_id": sid, "key": "[Company Name]", "value": "ACME"})
+        again = c.get("/api/render", params={"session_id": sid}, headers={"If-None-Match": 'W/"0"'})
+        assert again.status_code == 200 and again.headers["ETag"] == '"1"' and "ACME" in again.json()["html"]
+
+def test_delta_patches_to_the_full_render(make_docx, upload):
+    with TestClient(app) as c:
+        sid = upload(make_docx(AGREEMENT), client=c)["session_id"]
+        page = c.get("/api/render", params={"session_id": sid}).json()
+        for mapping in ({"[Investor Name]": "Jane <Doe>"}, {"[Company Name]": "[ACME]", "[Purchase Amount]": "$5"},
+                        {"[Investor Name]": ""}, {"[Company Name]": "ACME 🚀"}, {"[Investor Name]": "Jane"}):
+            c.post("/api/fill-bulk", data={"session_id": sid, "mapping_json": json.dumps(mapping)})
+            delta = c.get("/api/render/delta", params={"session_id": sid, "since": page["version"]}).json()
+            assert set(delta["changes"]) == set(mapping)
+            full = c.get("/api/render", params={"session_id": sid}).json()
+            assert delta["version"] == full["version"] and _patch(page, delta["changes"]) == full["html"]
+            page = full
+
+        current = c.get("/api/render/delta", params={"session_id": sid, "since": page["version"]}).json()
+        assert current == {"version": page["version"], "changes": {}}
+        stale = c.get("/api/render/delta", params={"session_id": sid, "since": page["version"] + 5}).json()
+        assert "changes" not in stale and stale["html"] == page["html"]
+
+def test_stored_preview_is_sent_without_recompressing(make_docx, upload):
+    with TestClient(app) as c:
+        sid = upload(make_docx(AGREEMENT), client=c)["session_id"]
+        with c.stream("GET", "/api/render", params={"session_id": sid}, headers={"Accept-Encoding": "gzip"}) as res:
+            assert res.headers["Content-Encoding"] == "gzip"
+            raw = b"".join(res.iter_raw())
+        plain = c.get("/api/render", params={"session_id": sid}, headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in plain.headers
+        assert gzip.decompress(raw) == plain.content and plain.json()["version"] == 0
+
+        big = upload(make_docx([f"[Field {i}]" for i in range(60)]), client=c)["session_id"]   # a list big enough to compress
+        res = c.get("/api/placeholders", params={"session_id": big}, headers={"Accept-Encoding": "gzip"})
+        assert res.headers["Content-Encoding"] == "gzip" and len(res.json()) == 60
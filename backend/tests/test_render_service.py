@@ -0,0 +1,20 @@
+import io
+from ooxml_engine import compile_parts, fill_package, load_parts, rename_parts, save_parts
+from render_service import compile_preview, docx_to_html, render_preview_slots
+
+def test_slot_preview_matches_full_rerender(make_docx):
+    path = make_docx(["Between [Company Name] and [Investor Name].", "Amount: $[____] (the “Purchase Amount”)"],
+                     table=[["[Investor Name]", "[Company Name]"]])
+    raw = open(path, "rb").read()
+    pkg = load_parts(raw)
+    keys = rename_parts(pkg)
+    working = save_parts(raw, pkg)
+    index = compile_parts(pkg, keys)
+    preview = compile_preview(io.BytesIO(working), keys)
+    assert render_preview_slots(preview, {})[0] == docx_to_html(io.BytesIO(working))
+
+    for mapping in ({"[Investor Name]": "Jane <Doe> & \"Co\"'s"},
+                    {"[Investor Name]": "line one\nline two", "[Company Name]": "[ACME]"},
+                    {"[Purchase Amount]": "$1,000", "[Company Name]": "ACME"}):
+        filled = fill_package(working, index, mapping)
+        assert render_preview_slots(preview, mapping)[0] == docx_to_html(io.BytesIO(filled))
@@ -0,0 +1,27 @@
+import io, zipfile
+from docx import Document
+from benchmarks.legacy_v1 import compile_template
+from docx_parser import find_placeholders
+from ooxml_engine import fill_package
+
+def _texts(path):
+    d = Document(path)
+    return [p.text for p in d.paragraphs] + [c.text for row in d.tables[0].rows for c in row.cells]
+
+def test_v1_index_is_filled_by_the_engine_and_other_parts_are_copied(make_docx):
+    # templates compiled before ooxml_engine keep their paragraph-level (version 1) index
+    path = make_docx(["Pay [Company Name].", "By [Investor Name]"], table=[["[Investor Name]", "x"]])
+    index = compile_template(path, find_placeholders(path))
+    assert "version" not in index and index["keys"]["[Investor Name]"] == [1, 2]
+
+    out = fill_package(path, index, {"[Investor Name]": "Jane\tDoe", "[Company Name]": "ACME & Co"})
+    assert _texts(io.BytesIO(out)) == ["Pay ACME & Co.", "By Jane\tDoe", "Jane\tDoe", "x"]
+    # re-filling works because paragraphs are rendered from the template text
+    out = fill_package(path, index, {"[Investor Name]": "John Roe"})
+    assert _texts(io.BytesIO(out)) == ["Pay [Company Name].", "By John Roe", "John Roe", "x"]
+
+    src, new = zipfile.ZipFile(path), zipfile.ZipFile(io.BytesIO(out))
+    assert new.testzip() is None and src.namelist() == new.namelist()
+    for a, b in zip(src.infolist(), new.infolist()):
+        if a.filename != "word/document.xml":
+            assert (a.CRC, a.compress_size, a.compress_type) == (b.CRC, b.compress_size, b.compress_type)
@@ -0,0 +1,119 @@
+# backend/workers.py
+"""
+CPU-bound DOCX work (parse, fill, mammoth render, save) runs in a bounded process
+pool so it neither holds the GIL nor ties up Starlette's request threadpool.
+
+LEXSY_WORKERS sets the pool size (default: CPU count). LEXSY_WORKERS=0 runs the same
+tasks in a thread instead, which is handy for debugging.
+"""
+import asyncio, io, multiprocessing, os, time, uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from docx_parser import fill_placeholders
+from ingest import ingest_upload
+from render_service import docx_to_html
+from ooxml_engine import fill_package
+from template_index import cached_index, index_path_for
+from cache import LRUCache
+import metrics
+
+_pool: ProcessPoolExecutor | None = None
+
+def pool_size() -> int:
+    return int(os.getenv("LEXSY_WORKERS", os.cpu_count() or 1))
+
+def get_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if _pool is None and pool_size() > 0:
+        # spawn: children never inherit the event loop / DB connections of the API process
+        _pool = ProcessPoolExecutor(max_workers=pool_size(), mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+async def run_cpu(fn, *args):
+    """
+    Await fn(*args) in the process pool (fn and args must be picklable). The stages the
+    worker timed come back with the result and count for the calling request.
+    """
+    pool = get_pool()
+    with metrics.stage(fn.__name__):   # includes queueing for a free worker
+        if pool is None:
+            return await asyncio.to_thread(fn, *args)
+        if not metrics.ENABLED:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        result, stages = await asyncio.get_running_loop().run_in_executor(pool, metrics.collected, fn, *args)
+    metrics.merge(stages)
+    return result
+
+# ---------- pool tasks (top-level so they pickle) ----------
+def ingest_task(raw: bytes, sha256: str, original_path: str, working_path: str) -> dict:
+    return ingest_upload(raw, original_path, working_path, sha256)
+
+def fill_task(original_path: str, working_path: str, mapping: dict) -> str:
+    """Sessions without a compiled template: rewrite the working copy, return the new preview."""
+    fill_placeholders(original_path, working_path, mapping)
+    return docx_to_html(working_path)
+
+# compiled templates are read-only, so each worker keeps the bytes of the ones it has filled
+_TEMPLATES = LRUCache(max_items=32, max_bytes=int(os.getenv("LEXSY_WORKER_TEMPLATE_CACHE_BYTES", 64 << 20)))
+
+def template_bytes(path: str) -> bytes:
+    data = _TEMPLATES.get(path)
+    if data is None:
+        with open(path, "rb") as f: data = f.read()
+        _TEMPLATES.set(path, data, size=len(data))
+    return data
+
+def materialize_task(template_path: str, mapping: dict) -> bytes:
+    """
+    Filled DOCX built in memory from the template + mapping; nothing is written to disk.
+    Only the path and the mapping cross the process boundary (also per /api/batch row).
+    """
+    return fill_package(template_bytes(template_path), cached_index(index_path_for(template_path)), mapping)
+
+def preview_task(template_path: str, mapping: dict) -> str:
+    """Full mammoth render of the materialized document, for templates without preview slots."""
+    return docx_to_html(io.BytesIO(materialize_task(template_path, mapping)))
+
+# ---------- background jobs ----------
+# In-memory registry, scoped to this API process: {job_id: {"status", "stage", ...}}
+JOBS: dict[str, dict] = {}
+_tasks: set[asyncio.Task] = set()
+MAX_JOBS = 1000
+
+class JobsFull(RuntimeError):
+    """MAX_JOBS jobs are queued or running; nothing finished is left to evict."""
+
+def jobs_full() -> bool:
+    """Whether new_job() would fail; drops the oldest finished jobs first when at the cap."""
+    if len(JOBS) >= MAX_JOBS:
+        for jid in [j for j, v in JOBS.items() if v["status"] in ("done", "error")][: MAX_JOBS // 10]:
+            JOBS.pop(jid, None)
+    return len(JOBS) >= MAX_JOBS
+
+def new_job(kind: str, **info) -> dict:
+    if jobs_full():
+        raise JobsFull(f"{MAX_JOBS} background jobs in progress")
+    job = {"id": str(uuid.uuid4()), "kind": kind, "status": "queued", "stage": "queued",
+           "created_at": time.time(), "result": None, "error": None, **info}
+    JOBS[job["id"]] = job
+    return job
+
+def start_job(job: dict, coro):
+    """Run coro in the background, recording done/error on the job."""
+    async def runner():
+        job["status"] = "running"
+        try:
+            job["result"] = await coro
+            job["status"] = job["stage"] = "done"
+        except Exception as e:
+            job["status"], job["error"] = "error", str(e)
+        job["finished_at"] = time.time()
+    task = asyncio.create_task(runner())
+    _tasks.add(task); task.add_done_callback(_tasks.discard)
+    return job
@@ -2,9 +2,10 @@
 import axios from "axios";
 const API = import.meta.env.VITE_API_URL;
 
-export async function uploadDoc(file: File) {
+export async function uploadDoc(file: File, sessionId?: string) {
   const fd = new FormData();
   fd.append("file", file);
+  if (sessionId) fd.append("session_id", sessionId);
   const res = await axios.post(`${API}/api/upload`, fd, {
     headers: { "Content-Type": "multipart/form-data" },
   });
@@ -18,9 +19,45 @@ export async function getPlaceholders(sessionId: string) {
   return res.data;
 }
 
+export async function getDocuments(sessionId: string) {
+  const res = await axios.get(`${API}/api/documents?session_id=${sessionId}`);
+  return res.data;
+}
+
+export type Preview = {
+  html: string;
+  version: number;
+  slots: [string, number, number][] | null;
+};
+
 export async function render(sessionId: string) {
   const res = await axios.get(`${API}/api/render?session_id=${sessionId}`);
-  return res.data;
+  return res.data as Preview;
+}
+
+// Bring a preview up to date with only the slots changed since its version
+export async function renderSince(sessionId: string, prev: Preview) {
+  if (!prev.slots) return render(sessionId);
+  const res = await axios.get(
+    `${API}/api/render/delta?session_id=${sessionId}&since=${prev.version}`
+  );
+  const d = res.data;
+  if (d.changes === undefined) return d as Preview;
+  let html = prev.html;
+  const slots = prev.slots.map((s) => [...s] as [string, number, number]);
+  for (let i = slots.length - 1; i >= 0; i--) {
+    const [key, start, end] = slots[i];
+    const frag = d.changes[key];
+    if (frag === undefined) continue;
+    html = html.slice(0, start) + frag + html.slice(end);
+    const shift = frag.length - (end - start);
+    slots[i][2] += shift;
+    for (let j = i + 1; j < slots.length; j++) {
+      slots[j][1] += shift;
+      slots[j][2] += shift;
+    }
+  }
+  return { html, version: d.version, slots } as Preview;
 }
 
 export async function fillOne(sessionId: string, key: string, value: string) {
@@ -69,6 +106,13 @@ export async function applySuggestion(
   return res.data;
 }
 
+export async function acceptAllSuggestions(sessionId: string) {
+  const fd = new FormData();
+  fd.append("session_id", sessionId);
+  const res = await axios.post(`${API}/api/accept-suggestions`, fd);
+  return res.data as { ok: boolean; accepted: Record<string, string> };
+}
+
 export async function rejectSuggestion(
   sessionId: string,
   key: string,
@@ -1,7 +1,8 @@
 // src/pages/Editor.tsx
 import { useEffect, useMemo, useRef, useState } from "react";
 import { useParams } from "react-router-dom";
-import { getPlaceholders, fillBulk, render, download, fillOne } from "../api";
+import { getPlaceholders, fillBulk, renderSince, render, download, fillOne } from "../api";
+import type { Preview } from "../api";
 import ChatPanel from "../components/ChatPanel";
 
 type PH = {
@@ -17,6 +18,7 @@ export default function Editor() {
   const [values, setValues] = useState<Record<string, string>>({});
   const [html, setHtml] = useState("");
   const previewRef = useRef<HTMLDivElement>(null);
+  const lastPreview = useRef<Preview | null>(null);
 
   async function refresh() {
     if (!sessionId) return;
@@ -27,10 +29,13 @@ export default function Editor() {
       if (p.value) current[p.key] = p.value;
     });
     setValues(current);
-    const r = await render(sessionId);
+    const prev = lastPreview.current;
+    const r = prev ? await renderSince(sessionId, prev) : await render(sessionId);
+    lastPreview.current = r;
     setHtml(r.html);
   }
   useEffect(() => {
+    lastPreview.current = null;
     refresh();
   }, [sessionId]);
 